@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""原子文件改写：先写同目录临时文件，再 rename 覆盖目标文件。
+
+未改动的正文不经过 Python 字符串，而是按字节区间从源文件直接拷贝
+（优先 os.copy_file_range，其次 os.sendfile，最后退回普通读写）。
+目录的 fsync 在 flush() 时按目录批量执行，一次运行每个目录只需一次。
+
+写入内容由若干片段组成，每个片段是：
+- bytes：直接写入的新内容（例如新的 front matter）
+- (offset, length)：从源文件拷贝的字节区间，length 为 None 表示拷贝到文件末尾
+"""
+
+from __future__ import annotations
+
+import errno
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional, Tuple, Union
+
+from instrumentation import recorder
+
+Part = Union[bytes, Tuple[int, Optional[int]]]
+
+COPY_CHUNK = 1 << 20
+
+
+def _copy_range(src_fd: int, dst_fd: int, offset: int, length: int) -> None:
+    """把源文件 [offset, offset + length) 追加写到目标文件当前位置"""
+    remaining = length
+    for copier in (_copy_file_range, _sendfile):
+        try:
+            while remaining > 0:
+                copied = copier(src_fd, dst_fd, offset + (length - remaining), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+            if remaining == 0:
+                return
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF, errno.ENOTSOCK):
+                raise
+        except AttributeError:
+            pass
+
+    # 兜底：普通读写
+    position = offset + (length - remaining)
+    while remaining > 0:
+        chunk = os.pread(src_fd, min(COPY_CHUNK, remaining), position)
+        if not chunk:
+            break
+        _write_all(dst_fd, chunk)
+        position += len(chunk)
+        remaining -= len(chunk)
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    return os.copy_file_range(src_fd, dst_fd, count, offset_src=offset)
+
+
+def _sendfile(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    return os.sendfile(dst_fd, src_fd, offset, count)
+
+
+def _existing_mode(*paths: Path) -> int:
+    for path in paths:
+        try:
+            return os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            continue
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+class AtomicWriter:
+    def __init__(self, durable: bool = True):
+        self.durable = durable
+        self.pending_dirs: set[Path] = set()
+        self.bytes_written = 0
+
+    def write(self, target: Path, parts: Iterable[Part], *, source: Optional[Path] = None,
+              remove_source: bool = False) -> Path:
+        """把 parts 写入 target；区间片段从 source（默认 target 自身）拷贝。
+
+        remove_source 为 True 且 source 与 target 不同时，新文件落盘后再删除源文件，
+        中途崩溃最多留下新旧两个文件，不会丢失内容。
+        """
+        target = Path(target)
+        source = Path(source) if source is not None else target
+        directory = target.parent
+
+        with recorder.span('write', path=target.name):
+            self._write_replace(target, source, parts)
+        if remove_source and source != target:
+            source.unlink()
+        self.pending_dirs.add(directory)
+        return target
+
+    def _write_replace(self, target: Path, source: Path, parts: Iterable[Part]) -> None:
+        written = 0
+        src_fd = None
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=f'.{target.name}.', suffix='.tmp')
+        try:
+            for part in parts:
+                if isinstance(part, bytes):
+                    _write_all(fd, part)
+                    written += len(part)
+                    continue
+                if src_fd is None:
+                    src_fd = os.open(source, os.O_RDONLY)
+                offset, length = part
+                if length is None:
+                    length = os.fstat(src_fd).st_size - offset
+                _copy_range(src_fd, fd, offset, length)
+                written += length
+
+            # mkstemp 创建的文件权限是 0600，沿用原文件的权限
+            os.fchmod(fd, _existing_mode(target, source))
+            if self.durable:
+                os.fsync(fd)
+        except BaseException:
+            os.close(fd)
+            os.unlink(tmp_name)
+            raise
+        finally:
+            if src_fd is not None:
+                os.close(src_fd)
+        os.close(fd)
+
+        os.replace(tmp_name, target)
+        self.bytes_written += written
+        recorder.count('bytes_written', written)
+
+    def write_text(self, target: Path, text: str) -> Path:
+        return self.write(target, [text.encode('utf-8')])
+
+    def insert(self, target: Path, offset: int, data: bytes) -> Path:
+        """在 target 的 offset 处插入 data，其余内容原样拷贝"""
+        return self.write(target, [(0, offset), data, (offset, None)])
+
+    def mark_dirty(self, directory: Path) -> None:
+        """登记由其他进程写入过的目录，在 flush() 时一并 fsync"""
+        self.pending_dirs.add(Path(directory))
+
+    def flush(self) -> None:
+        """对本次运行中写入过的每个目录执行一次 fsync，使 rename 持久化"""
+        if self.durable:
+            for directory in self.pending_dirs:
+                recorder.count('dir_fsync')
+                try:
+                    dir_fd = os.open(directory, os.O_RDONLY)
+                except OSError:
+                    continue
+                try:
+                    os.fsync(dir_fd)
+                except OSError:
+                    pass
+                finally:
+                    os.close(dir_fd)
+        self.pending_dirs.clear()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""生成用于基准测试的合成语料：中英文混排的 blog 和 diary 文件。
+
+语料按固定的随机种子生成，同样的参数每次得到完全相同的文件，包含：
+- blog：没有 front matter 的新文章、已有 front matter 的文章、CRLF/BOM 变体、格式错误的文件
+- diary：已有 date、缺少 date、没有 front matter、格式错误的文件
+
+使用方法：
+python3 scripts/bench_corpus.py /tmp/corpus --size 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+from collections import Counter
+from pathlib import Path
+
+CHINESE_WORDS = [
+    '强化学习', '策略梯度', '深度学习', '训练', '模型', '论文', '实验', '数据集', '服务器', '显卡',
+    '优化器', '学习率', '损失函数', '推理', '部署', '笔记', '总结', '思考', '周末', '实验室',
+    '加班', '熬夜', '咖啡', '跑步', '读书', '电影', '天气', '心情', '朋友', '家人',
+    '分布式', '并行', '缓存', '索引', '数据库', '前端', '后端', '编译器', '操作系统', '网络',
+    '评估', '基线', '消融实验', '超参数', '注意力机制', '预训练', '微调', '奖励模型', '采样', '收敛',
+]
+ENGLISH_WORDS = [
+    'PyTorch', 'CUDA', 'Transformer', 'RLHF', 'PPO', 'GRPO', 'SFT', 'LoRA', 'batch', 'token',
+    'checkpoint', 'gradient', 'kernel', 'throughput', 'latency', 'benchmark', 'pipeline', 'Astro', 'Python', 'Rust',
+]
+PUNCTUATION = ['，', '，', '，', '。', '。', '！', '？', '；']
+WEATHERS = ['☀️', '☁️', '🌧️', '❄️', '🌤️', '晴', '多云']
+MOODS = ['😊', '😕', '😭', '🙁', '😄', '期待', '平静']
+
+# 各类文件在 blog / diary 中的占比
+BLOG_RATIO = 0.3
+BLOG_KINDS = [('new', 0.5), ('front_matter', 0.35), ('variant', 0.1), ('malformed', 0.05)]
+DIARY_KINDS = [('dated', 0.4), ('undated', 0.4), ('bare', 0.15), ('malformed', 0.05)]
+
+
+def choose(rng: random.Random, kinds: list[tuple[str, float]]) -> str:
+    return rng.choices([kind for kind, _ in kinds], weights=[weight for _, weight in kinds])[0]
+
+
+def sentence(rng: random.Random) -> str:
+    words = []
+    for _ in range(rng.randint(4, 14)):
+        if rng.random() < 0.2:
+            words.append(f" {rng.choice(ENGLISH_WORDS)} ")
+        else:
+            words.append(rng.choice(CHINESE_WORDS))
+    return re.sub(r' {2,}', ' ', ''.join(words)).strip() + rng.choice(PUNCTUATION)
+
+
+def paragraph(rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.08:
+        return '```python\n' + '\n'.join(f"x_{i} = model(batch_{i})" for i in range(rng.randint(2, 12))) + '\n```'
+    if kind < 0.12:
+        return '$$\n\\nabla_\\theta J(\\theta) = \\mathbb{E}[\\nabla_\\theta \\log \\pi_\\theta(a|s) A(s, a)]\n$$'
+    if kind < 0.2:
+        return '\n'.join(f"- {sentence(rng)}" for _ in range(rng.randint(2, 5)))
+    return ''.join(sentence(rng) for _ in range(rng.randint(2, 8)))
+
+
+def body(rng: random.Random, min_paragraphs: int = 1, max_paragraphs: int = 8) -> str:
+    return '\n\n'.join(paragraph(rng) for _ in range(rng.randint(min_paragraphs, max_paragraphs))) + '\n'
+
+
+def title(rng: random.Random, index: int) -> str:
+    words = rng.sample(CHINESE_WORDS, rng.randint(2, 4))
+    if rng.random() < 0.3:
+        words.insert(rng.randint(0, len(words)), rng.choice(ENGLISH_WORDS))
+    return f"{''.join(words)} {index}"
+
+
+def date_string(rng: random.Random, with_time: bool = True) -> str:
+    month, day = rng.randint(1, 12), rng.randint(1, 28)
+    if not with_time:
+        return f"2025-{month:02d}-{day:02d}"
+    return f"2025-{month:02d}-{day:02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+
+
+def blog_file(rng: random.Random, index: int, kind: str) -> tuple[str, bytes]:
+    post_title = title(rng, index)
+    if kind == 'new':
+        return f"{post_title.replace(' ', '-')}.md", f"# {post_title}\n\n{body(rng)}".encode('utf-8')
+
+    tags = rng.sample(CHINESE_WORDS + ENGLISH_WORDS, rng.randint(1, 3))
+    front_matter = '\n'.join([
+        '---',
+        f"title: {json.dumps(post_title, ensure_ascii=False)}",
+        f"date: {date_string(rng, with_time=False)}",
+        f"summary: {json.dumps(sentence(rng)[:30], ensure_ascii=False)}",
+        f"tags: {json.dumps(tags, ensure_ascii=False)}",
+        f"weather: {json.dumps(rng.choice(WEATHERS), ensure_ascii=False)}",
+        f"rating: {rng.randint(1, 5)}",
+        '---',
+        '',
+    ])
+    text = front_matter + body(rng)
+    if kind == 'front_matter':
+        return f"post-{index:06d}.md", text.encode('utf-8')
+    if kind == 'variant':
+        if rng.random() < 0.5:
+            return f"post-{index:06d}-crlf.md", text.replace('\n', '\r\n').encode('utf-8')
+        return f"post-{index:06d}-bom.markdown", b'\xef\xbb\xbf' + text.encode('utf-8')
+
+    # 格式错误：front matter 未闭合、非 UTF-8 字节或空文件
+    choice = rng.randrange(3)
+    if choice == 0:
+        return f"broken-{index:06d}.md", front_matter.replace('---\n\n', '').encode('utf-8') + body(rng).encode('utf-8')
+    if choice == 1:
+        return f"broken-{index:06d}.md", f"# {post_title}\n\n".encode('utf-8') + b'\xff\xfe\x00bad bytes\n'
+    return f"broken-{index:06d}.md", b''
+
+
+def diary_file(rng: random.Random, index: int, kind: str) -> tuple[str, bytes]:
+    name = f"diary-{index:06d}.md" if rng.random() < 0.5 else f"{rng.choice(CHINESE_WORDS)}-{index:06d}.markdown"
+    fields = [
+        f"weather: {rng.choice(WEATHERS)}",
+        f"mood: {rng.choice(MOODS)}",
+        f"rating: {rng.randint(1, 5)}",
+    ]
+    if rng.random() < 0.4:
+        fields.append(f"title: {json.dumps(title(rng, index), ensure_ascii=False)}")
+    content = body(rng, max_paragraphs=3)
+
+    if kind == 'dated':
+        fields.insert(0, f"date: \"{date_string(rng)}\"")
+        return name, ('---\n' + '\n'.join(fields) + '\n---\n\n' + content).encode('utf-8')
+    if kind == 'undated':
+        return name, ('---\n' + '\n'.join(fields) + '\n---\n\n' + content).encode('utf-8')
+    if kind == 'bare':
+        return name, content.encode('utf-8')
+    return name, ('---\n' + '\n'.join(fields) + '\n' + content).encode('utf-8')
+
+
+def generate_corpus(root: Path, size: int, seed: int = 0) -> dict[str, int]:
+    """在 root/blog 和 root/diary 下生成 size 个文件，返回各类文件的数量"""
+    rng = random.Random(seed)
+    directories = {'blog': root / 'blog', 'diary': root / 'diary'}
+    for directory in directories.values():
+        directory.mkdir(parents=True, exist_ok=True)
+
+    counts: Counter = Counter()
+    for index in range(size):
+        if rng.random() < BLOG_RATIO:
+            kind = choose(rng, BLOG_KINDS)
+            name, data = blog_file(rng, index, kind)
+            content_type = 'blog'
+        else:
+            kind = choose(rng, DIARY_KINDS)
+            name, data = diary_file(rng, index, kind)
+            content_type = 'diary'
+        path = directories[content_type] / name
+        with open(path, 'wb') as f:
+            f.write(data)
+        # 修改时间分散在一年内，模拟真实的写作历史
+        timestamp = 1735689600 + rng.randrange(365 * 86400)
+        os.utime(path, (timestamp, timestamp))
+        counts[f"{content_type}.{kind}"] += 1
+    return dict(sorted(counts.items()))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='生成基准测试用的合成 blog/diary 语料')
+    parser.add_argument('output', help='输出目录（会在其中创建 blog/ 和 diary/）')
+    parser.add_argument('--size', type=int, default=1000, help='文件总数（默认 1000）')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子（默认 0）')
+    args = parser.parse_args(argv)
+
+    counts = generate_corpus(Path(args.output), args.size, args.seed)
+    print(f"✅ 已在 {args.output} 生成 {args.size} 个文件：")
+    for kind, count in counts.items():
+        print(f"  {kind:<20}{count:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""内容脚本的端到端基准：在合成语料上测量各处理流程的总耗时和分阶段耗时。
+
+每个语料规模都在临时目录中复制一份 scripts/，由 bench_corpus.py 生成语料，
+再以子进程运行本脚本的 worker 模式，保证各规模之间互不影响（清单、缓存、lru_cache 都是新的）。
+模型客户端替换为本地桩，不发出网络请求，可用 --model-latency 模拟模型延迟。
+
+测量的流程：
+- content_manager_blog / content_manager_diary：ContentManager.process_directory（自动模式），
+  冷启动（没有清单和缓存）与再次运行（清单全部命中）各一次
+- update_diary_dates：update_diary_dates.main，冷启动与再次运行各一次
+- create_entry_blog：连续调用 create_entry.write_blog_entry 创建中文标题的文章
+
+分阶段耗时为包含关系（例如 read 包含读取 front matter），并发时按所有线程累计。
+
+使用方法：
+python3 scripts/bench_pipelines.py                                  # 1k 文件
+python3 scripts/bench_pipelines.py --sizes 1000,10000,100000 -o bench.json
+python3 scripts/bench_pipelines.py -o new.json --compare bench.json  # 与上次结果对比，变慢时返回非零
+"""
+
+from __future__ import annotations
+
+import argparse
+import builtins
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = '1000'
+DEFAULT_THRESHOLD = 0.25
+_MISSING = object()
+
+
+class StubModelClient:
+    """替代 ModelClient 的本地桩：根据输入生成确定的翻译和 tags/summary"""
+
+    def __init__(self, latency: float = 0.0):
+        self.model = {'name': 'bench-stub'}
+        self.latency = latency
+        self.calls = 0
+
+    def chat(self, messages: list[dict], *, max_tokens: int, temperature: float = 0.3) -> Optional[str]:
+        import hashlib
+
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        prompt = messages[-1]['content']
+        digest = hashlib.blake2b(prompt.encode('utf-8'), digest_size=6).hexdigest()
+        if 'JSON' in messages[0]['content']:
+            return json.dumps({'tags': ['基准', 'bench'], 'summary': f"合成摘要 {digest}"}, ensure_ascii=False)
+        return f"Bench Post {digest}"
+
+    def close(self) -> None:
+        pass
+
+
+class StageTimer:
+    """临时替换对象上的函数，累计调用次数和耗时；退出时恢复原函数"""
+
+    def __init__(self):
+        self.stages: dict[str, list] = defaultdict(lambda: [0, 0.0])
+        self._patches: list[tuple[Any, str, Any]] = []
+
+    def wrap(self, owner: Any, name: str, stage: str) -> None:
+        original = getattr(owner, name)
+        record = self.stages[stage]
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                record[0] += 1
+                record[1] += time.perf_counter() - start
+
+        # 记录 owner 自身的属性（而不是 getattr 取到的绑定方法），实例上原本没有的属性恢复时删除即可
+        self._patches.append((owner, name, vars(owner).get(name, _MISSING)))
+        setattr(owner, name, timed)
+
+    def restore(self) -> None:
+        for owner, name, previous in reversed(self._patches):
+            if previous is _MISSING:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, previous)
+        self._patches.clear()
+
+    def report(self) -> dict[str, dict]:
+        return {stage: {'calls': calls, 'seconds': round(seconds, 6)}
+                for stage, (calls, seconds) in self.stages.items()}
+
+
+# ---- worker：在沙箱中运行，导入的是沙箱里的脚本副本 ----
+
+def reset_content(root: Path) -> None:
+    """用原始语料覆盖沙箱中的内容目录，清空清单、缓存和站点索引"""
+    for path in (root / 'src' / 'content', root / '.cache', root / 'src' / 'data'):
+        shutil.rmtree(path, ignore_errors=True)
+    for content_type in ('blog', 'diary'):
+        shutil.copytree(root / 'corpus' / content_type, root / 'src' / 'content' / content_type,
+                        copy_function=shutil.copy2)
+
+
+def bench_content_manager(content_type: str) -> Callable:
+    def run(timer: StageTimer, options: argparse.Namespace) -> int:
+        import content_manager
+        from content_manifest import ContentManifest
+
+        manager = content_manager.ContentManager(concurrency=options.concurrency, use_cache=not options.no_cache)
+        manager.__dict__['models_config'] = {}
+        manager.__dict__['model_client'] = StubModelClient(options.model_latency / 1000)
+
+        timer.wrap(ContentManifest, 'is_unchanged', 'scan')
+        timer.wrap(ContentManifest, 'save', 'manifest_save')
+        timer.wrap(manager.writer, 'flush', 'fsync_dirs')
+        timer.wrap(content_manager, 'refresh_site_index', 'site_index')
+        if content_type == 'blog':
+            timer.wrap(manager, 'read_blog_source', 'read')
+            timer.wrap(manager, 'translate_chinese_to_english', 'model_slug')
+            timer.wrap(manager, 'generate_tags_and_summary', 'model_tags_summary')
+            timer.wrap(manager, 'write_blog_file', 'write')
+        else:
+            timer.wrap(content_manager, 'read_front_matter', 'read')
+            timer.wrap(manager.writer, 'insert', 'write')
+
+        manager.process_directory(content_type, interactive=False)
+        return count_files(manager.project_root / 'src' / 'content' / content_type)
+    return run
+
+
+def bench_update_diary_dates(timer: StageTimer, options: argparse.Namespace) -> int:
+    import update_diary_dates
+    from atomic_write import AtomicWriter
+    from content_manifest import ContentManifest
+
+    timer.wrap(ContentManifest, 'is_unchanged', 'scan')
+    timer.wrap(ContentManifest, 'save', 'manifest_save')
+    timer.wrap(update_diary_dates, 'get_file_creation_time', 'stat')
+    timer.wrap(update_diary_dates, 'read_front_matter', 'read')
+    timer.wrap(AtomicWriter, 'insert', 'write')
+    timer.wrap(AtomicWriter, 'flush', 'fsync_dirs')
+    timer.wrap(update_diary_dates, 'refresh_site_index', 'site_index')
+
+    update_diary_dates.main([])
+    return count_files(Path(update_diary_dates.__file__).resolve().parents[1] / 'src' / 'content' / 'diary')
+
+
+def bench_create_entry(timer: StageTimer, options: argparse.Namespace) -> int:
+    import create_entry
+    from bench_corpus import CHINESE_WORDS
+
+    timer.wrap(create_entry, 'slugify', 'slugify')
+    original_input = builtins.input
+    builtins.input = lambda prompt='': ''  # 心情评分使用默认值
+    try:
+        for index in range(options.create_count):
+            words = [CHINESE_WORDS[(index * 7 + offset) % len(CHINESE_WORDS)] for offset in range(3)]
+            args = argparse.Namespace(
+                title=f"{''.join(words)}第{index}篇", summary='基准测试', tags='基准,bench',
+                weather='☀️', mood='😊', rating=3, filename=None, draft=False,
+            )
+            create_entry.write_blog_entry(args)
+    finally:
+        builtins.input = original_input
+    return options.create_count
+
+
+def count_files(directory: Path) -> int:
+    return sum(1 for entry in os.scandir(directory) if entry.is_file())
+
+
+# 流程名 -> (函数, 是否测量再次运行)
+PIPELINES: dict[str, tuple[Callable, bool]] = {
+    'content_manager_blog': (bench_content_manager('blog'), True),
+    'content_manager_diary': (bench_content_manager('diary'), True),
+    'update_diary_dates': (bench_update_diary_dates, True),
+    'create_entry_blog': (bench_create_entry, False),
+}
+
+
+def measure(run: Callable, options: argparse.Namespace) -> dict:
+    timer = StageTimer()
+    try:
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            files = run(timer, options)
+            elapsed = time.perf_counter() - start
+    finally:
+        timer.restore()
+    return {
+        'seconds': round(elapsed, 6),
+        'files': files,
+        'files_per_second': round(files / elapsed, 1) if elapsed else None,
+        'stages': timer.report(),
+    }
+
+
+def run_worker(options: argparse.Namespace) -> dict:
+    root = Path(options.worker)
+    results = {}
+    for name, (run, measure_warm) in PIPELINES.items():
+        if options.pipelines and name not in options.pipelines:
+            continue
+        reset_content(root)
+        results[f"{name}.cold"] = measure(run, options)
+        if measure_warm:
+            results[f"{name}.warm"] = measure(run, options)
+    return results
+
+
+# ---- 主进程：准备沙箱、汇总结果、与历史结果对比 ----
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).resolve().parent,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(size: int, options: argparse.Namespace) -> dict:
+    from bench_corpus import generate_corpus
+    from bench_startup import build_sandbox
+
+    with tempfile.TemporaryDirectory(prefix='bench-content-') as tmp:
+        root = Path(tmp)
+        cli = build_sandbox(root)
+        start = time.perf_counter()
+        corpus = generate_corpus(root / 'corpus', size, options.seed)
+        print(f"📦 {size} 个文件的语料已生成（{time.perf_counter() - start:.1f}s），开始测量...", file=sys.stderr)
+
+        argv = [sys.executable, str(cli.with_name('bench_pipelines.py')), '--worker', str(root),
+                '--concurrency', str(options.concurrency), '--model-latency', str(options.model_latency),
+                '--create-count', str(options.create_count)]
+        if options.no_cache:
+            argv.append('--no-cache')
+        for name in options.pipelines or []:
+            argv.extend(['--pipeline', name])
+        completed = subprocess.run(argv, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise SystemExit(f"❌ 规模 {size} 的基准运行失败：\n{completed.stderr}")
+        return {'corpus': corpus, 'pipelines': json.loads(completed.stdout)}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """返回比基线慢超过 threshold 的流程"""
+    regressions = []
+    for size, current in results['sizes'].items():
+        previous = baseline.get('sizes', {}).get(size)
+        if not previous:
+            continue
+        for name, stats in current['pipelines'].items():
+            old = previous['pipelines'].get(name)
+            if old and old['seconds'] > 0 and stats['seconds'] > old['seconds'] * (1 + threshold):
+                regressions.append(f"{size} 个文件 {name}: {old['seconds']:.3f}s → {stats['seconds']:.3f}s "
+                                   f"(+{stats['seconds'] / old['seconds'] - 1:.0%})")
+    return regressions
+
+
+def print_summary(results: dict) -> None:
+    for size, result in results['sizes'].items():
+        print(f"\n📊 {size} 个文件")
+        print(f"{'流程':<32}{'耗时(s)':>10}{'文件/s':>12}")
+        for name, stats in result['pipelines'].items():
+            rate = f"{stats['files_per_second']:.0f}" if stats['files_per_second'] else '-'
+            print(f"{name:<32}{stats['seconds']:>10.3f}{rate:>12}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='在合成语料上测量内容脚本各流程的耗时')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='逗号分隔的语料规模（默认 1000，可用 1000,10000,100000）')
+    parser.add_argument('--seed', type=int, default=0, help='语料的随机种子')
+    parser.add_argument('--pipeline', dest='pipelines', action='append', choices=list(PIPELINES),
+                        help='只测量指定流程（可重复）')
+    parser.add_argument('--concurrency', type=int, default=1, help='ContentManager 的模型并发数（默认 1）')
+    parser.add_argument('--model-latency', type=float, default=0.0, help='模拟的模型延迟，毫秒（默认 0）')
+    parser.add_argument('--no-cache', action='store_true', help='不使用模型响应缓存')
+    parser.add_argument('--create-count', type=int, default=100, help='create_entry 创建的文章数（默认 100）')
+    parser.add_argument('-o', '--output', help='把结果写入 JSON 文件（默认输出到标准输出）')
+    parser.add_argument('--compare', help='与之前保存的结果对比')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='判定为变慢的比例（默认 0.25，即慢 25%% 以上）')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.worker:
+        json.dump(run_worker(options), sys.stdout, ensure_ascii=False)
+        return
+
+    results = {
+        'version': RESULTS_VERSION,
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': {'seed': options.seed, 'concurrency': options.concurrency,
+                    'model_latency_ms': options.model_latency, 'cache': not options.no_cache,
+                    'create_count': options.create_count},
+        'sizes': {},
+    }
+    for size in (int(value) for value in options.sizes.split(',') if value.strip()):
+        results['sizes'][str(size)] = run_size(size, options)
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if options.output:
+        Path(options.output).write_text(text + '\n', encoding='utf-8')
+        print_summary(results)
+        print(f"\n✅ 结果已写入 {options.output}")
+    else:
+        print(text)
+
+    if options.compare:
+        with open(options.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), options.threshold)
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} 个流程比基线慢 {options.threshold:.0%} 以上：", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+        print(f"\n✅ 与 {options.compare} 相比没有明显变慢", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
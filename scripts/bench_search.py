@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""站内搜索索引的基准：索引体积、构建耗时和查询延迟。
+
+在临时目录中用 bench_corpus.py 生成合成语料，依次测量：
+- 全量构建、没有变化时的增量运行、修改 1% 文章后的增量更新耗时
+- 索引体积：文件数、分片数、总字节数、gzip 后字节数（GitHub Pages 按 gzip 传输）、最大分片
+- 查询延迟：一组固定查询（单词、词组、单个汉字、英文前缀），分别测量冷查询（每次重新读取 manifest 和分片，
+  相当于浏览器第一次搜索）和热查询（分片已缓存），以及每次查询需要下载的字节数
+
+查询使用 search_index.SearchReader，与浏览器端 src/lib/search.ts 的逻辑相同；
+冷查询的耗时包括读取和解析分片，不含网络传输。
+
+使用方法：
+python3 scripts/bench_search.py --sizes 1000,10000 -o search.json
+python3 scripts/bench_search.py --sizes 1000,10000 --compare search.json   # 慢或大 25% 以上时返回非零
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from bench_corpus import CHINESE_WORDS, ENGLISH_WORDS, generate_corpus
+from bench_pipelines import git_revision
+from search_index import SearchIndex, SearchReader
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = '3000'
+DEFAULT_THRESHOLD = 0.25
+CHANGE_RATIO = 0.01
+
+
+def bench_queries() -> list[str]:
+    queries = list(CHINESE_WORDS[:20]) + [word.lower() for word in ENGLISH_WORDS[:10]]
+    queries += [f"{a} {b}" for a, b in zip(CHINESE_WORDS[:10], ENGLISH_WORDS[10:20])]
+    queries += [f"{a}{b}" for a, b in zip(CHINESE_WORDS[20:30], CHINESE_WORDS[30:40])]
+    queries += [word[0] for word in CHINESE_WORDS[40:45]]
+    queries += [word[:3].lower() for word in ENGLISH_WORDS if len(word) > 4][:5]
+    return queries
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def timed(run) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def index_size(output_dir: Path, shard_names: set[str]) -> dict:
+    total = compressed = largest = shards = 0
+    files = 0
+    for entry in os.scandir(output_dir):
+        data = Path(entry.path).read_bytes()
+        files += 1
+        total += len(data)
+        compressed += len(gzip.compress(data, 6))
+        if entry.name[:-len('.json')] in shard_names:
+            shards += 1
+            largest = max(largest, len(data))
+    return {'files': files, 'shards': shards, 'bytes': total, 'gzip_bytes': compressed, 'largest_shard_bytes': largest}
+
+
+def bench_query_latency(output_dir: Path, queries: list[str]) -> dict:
+    cold, fetched, hits = [], [], []
+    for query in queries:
+        start = time.perf_counter()
+        reader = SearchReader(output_dir)
+        results = reader.search(query)
+        cold.append((time.perf_counter() - start) * 1000)
+        fetched.append(reader.fetched_bytes)
+        hits.append(len(results))
+
+    reader = SearchReader(output_dir)
+    for query in queries:
+        reader.search(query)
+    warm = []
+    for query in queries:
+        start = time.perf_counter()
+        reader.search(query)
+        warm.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'queries': len(queries),
+        'cold_ms': {'p50': round(statistics.median(cold), 3), 'p90': round(percentile(cold, 0.9), 3),
+                    'max': round(max(cold), 3)},
+        'warm_ms': {'p50': round(statistics.median(warm), 3), 'p90': round(percentile(warm, 0.9), 3),
+                    'max': round(max(warm), 3)},
+        'fetched_bytes': {'p50': int(statistics.median(fetched)), 'p90': int(percentile(fetched, 0.9)),
+                          'max': max(fetched)},
+        'empty_results': sum(1 for count in hits if count == 0),
+    }
+
+
+def run_size(size: int, options: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory(prefix='bench-search-') as tmp:
+        root = Path(tmp)
+        corpus = generate_corpus(root / 'src' / 'content', size, options.seed)
+        state_path = root / '.cache' / 'search-index-state.json'
+        output_dir = root / 'public' / 'search'
+        print(f"📦 {size} 个文件的语料已生成，开始测量...", file=sys.stderr)
+
+        def update(rebuild: bool = False) -> SearchIndex:
+            index = SearchIndex(root, state_path, output_dir) if rebuild else SearchIndex.load(root, state_path, output_dir)
+            index.update(rebuild=rebuild)
+            index.save()
+            return index
+
+        build = {'cold': round(timed(lambda: update(rebuild=True)), 6), 'noop': round(timed(update), 6)}
+        index = SearchIndex.load(root, state_path, output_dir)
+        indexed = sorted(key for key, doc in index.docs.items() if doc['id'] is not None)
+        step = max(1, int(1 / CHANGE_RATIO))
+        for key in indexed[::step]:
+            with open(root / 'src' / 'content' / 'blog' / key, 'a', encoding='utf-8') as f:
+                f.write('\n补充一段关于 benchmark 的新内容。\n')
+        build['incremental'] = round(timed(update), 6)
+        build['incremental_files'] = len(indexed[::step])
+
+        index = SearchIndex.load(root, state_path, output_dir)
+        return {
+            'corpus': corpus,
+            'documents': len(indexed),
+            'build_seconds': build,
+            'size': index_size(output_dir, {name for _, name in index.shards}),
+            'query': bench_query_latency(output_dir, bench_queries()),
+        }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """返回比基线慢或大超过 threshold 的指标"""
+    metrics = {
+        '全量构建(s)': lambda r: r['build_seconds']['cold'],
+        '增量更新(s)': lambda r: r['build_seconds']['incremental'],
+        '索引 gzip 字节': lambda r: r['size']['gzip_bytes'],
+        '冷查询 p90(ms)': lambda r: r['query']['cold_ms']['p90'],
+        '热查询 p90(ms)': lambda r: r['query']['warm_ms']['p90'],
+    }
+    regressions = []
+    for size, current in results['sizes'].items():
+        previous = baseline.get('sizes', {}).get(size)
+        if not previous:
+            continue
+        for name, metric in metrics.items():
+            old, new = metric(previous), metric(current)
+            if old > 0 and new > old * (1 + threshold):
+                regressions.append(f"{size} 个文件 {name}: {old} → {new} (+{new / old - 1:.0%})")
+    return regressions
+
+
+def print_summary(results: dict) -> None:
+    for size, result in results['sizes'].items():
+        build, index, query = result['build_seconds'], result['size'], result['query']
+        print(f"\n📊 {size} 个文件（索引 {result['documents']} 篇文章）")
+        print(f"  构建：全量 {build['cold']:.3f}s，无变化 {build['noop']:.3f}s，"
+              f"修改 {build['incremental_files']} 篇后增量 {build['incremental']:.3f}s")
+        print(f"  体积：{index['shards']} 个分片，共 {index['bytes'] / 1024:.1f} KB（gzip {index['gzip_bytes'] / 1024:.1f} KB），"
+              f"最大分片 {index['largest_shard_bytes'] / 1024:.1f} KB")
+        print(f"  查询：冷 p50 {query['cold_ms']['p50']:.2f}ms / p90 {query['cold_ms']['p90']:.2f}ms，"
+              f"热 p50 {query['warm_ms']['p50']:.2f}ms / p90 {query['warm_ms']['p90']:.2f}ms，"
+              f"每次下载 p50 {query['fetched_bytes']['p50'] / 1024:.1f} KB / p90 {query['fetched_bytes']['p90'] / 1024:.1f} KB")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='测量站内搜索索引的体积、构建耗时和查询延迟')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='逗号分隔的语料规模（blog 约占 30%%，默认 3000）')
+    parser.add_argument('--seed', type=int, default=0, help='语料的随机种子')
+    parser.add_argument('-o', '--output', help='把结果写入 JSON 文件（默认输出到标准输出）')
+    parser.add_argument('--compare', help='与之前保存的结果对比')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='判定为变慢或变大的比例（默认 0.25，即 25%%）')
+    options = parser.parse_args(argv)
+
+    results = {
+        'version': RESULTS_VERSION,
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': {'seed': options.seed},
+        'sizes': {},
+    }
+    for size in (int(value) for value in options.sizes.split(',') if value.strip()):
+        results['sizes'][str(size)] = run_size(size, options)
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if options.output:
+        Path(options.output).write_text(text + '\n', encoding='utf-8')
+        print_summary(results)
+        print(f"\n✅ 结果已写入 {options.output}")
+    else:
+        print(text)
+
+    if options.compare:
+        with open(options.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), options.threshold)
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} 个指标比基线差 {options.threshold:.0%} 以上：", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
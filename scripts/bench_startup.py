@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""统一入口的启动耗时基准。
+
+在临时目录中复制一份 scripts/ 并建立空的 src/content，
+反复以子进程方式运行各个子命令，统计墙钟时间的中位数和 p90，
+与空跑 `python -c pass` 的解释器启动时间对比。
+
+使用方法：
+python3 scripts/bench_startup.py            # 默认每个命令运行 20 次
+python3 scripts/bench_startup.py -n 50 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+
+def build_sandbox(root: Path) -> Path:
+    shutil.copytree(SCRIPTS_DIR, root / 'scripts', ignore=shutil.ignore_patterns('__pycache__'))
+    for content_type in ('blog', 'diary'):
+        (root / 'src' / 'content' / content_type).mkdir(parents=True)
+    return root / 'scripts' / 'cli.py'
+
+
+def time_once(argv: list[str], stdin: str = '') -> float:
+    start = time.perf_counter()
+    subprocess.run(argv, input=stdin, text=True, stdout=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='测量 cli.py 各子命令的启动耗时')
+    parser.add_argument('-n', '--runs', type=int, default=20, help='每个命令的运行次数')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出结果')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cli = str(build_sandbox(Path(tmp)))
+        counter = iter(range(10 ** 9))
+        cases = {
+            'python -c pass': lambda: [sys.executable, '-c', 'pass'],
+            'cli --help': lambda: [sys.executable, cli, '--help'],
+            'create --type diary': lambda: [
+                sys.executable, cli, 'create', '--type', 'diary', '--title', 'bench',
+                '--weather', '☀️', '--mood', '😊', '--filename', f"bench-{next(counter)}",
+            ],
+            'dates': lambda: [sys.executable, cli, 'dates'],
+        }
+
+        results = {}
+        for name, make_argv in cases.items():
+            # create 会询问心情评分和标签，输入空行使用默认值
+            timings = sorted(time_once(make_argv(), stdin='\n\n') for _ in range(args.runs))
+            results[name] = {
+                'median_ms': round(statistics.median(timings), 2),
+                'p90_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.9))], 2),
+                'min_ms': round(timings[0], 2),
+            }
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{'命令':<24}{'中位数(ms)':>12}{'p90(ms)':>10}{'最小(ms)':>10}")
+    for name, stats in results.items():
+        print(f"{name:<24}{stats['median_ms']:>12.1f}{stats['p90_ms']:>10.1f}{stats['min_ms']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""从 pypinyin 生成离线拼音表 scripts/data/pinyin_table.txt（仅在更新数据时运行）。
+
+pip install pypinyin
+python3 scripts/build_pinyin_table.py
+
+输出格式（均为 UTF-8 文本）：
+- `@range <起始码位> <结束码位>`：表覆盖的十六进制码位范围
+- `@syllables ...`：去声调的拼音音节表，空格分隔，第 0 项保留为“无读音”
+- `@table` 的下一行：范围内每个码位对应一个字符，字符的码位减去 TABLE_BASE 即音节编号
+- `@phrases` 之后每行一个多音字词组：`词组 音节 音节 ...`，
+  只收录逐字默认读音与词组读音不一致的词（如“银行”“重庆”）
+"""
+
+from __future__ import annotations
+
+import unicodedata
+from pathlib import Path
+
+OUTPUT_PATH = Path(__file__).resolve().parent / 'data' / 'pinyin_table.txt'
+RANGE_START, RANGE_END = 0x3400, 0x9FFF
+TABLE_BASE = 0x100
+
+
+def plain(syllable: str) -> str:
+    """去掉声调，ü 写作 v"""
+    decomposed = unicodedata.normalize('NFD', syllable)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).replace('ü', 'v').lower()
+
+
+def main() -> None:
+    from pypinyin.phrases_dict import phrases_dict
+    from pypinyin.pinyin_dict import pinyin_dict
+
+    default = {cp: plain(value.split(',')[0]) for cp, value in pinyin_dict.items()}
+    syllables = [''] + sorted({default[cp] for cp in range(RANGE_START, RANGE_END + 1) if cp in default})
+    syllable_ids = {s: i for i, s in enumerate(syllables)}
+    table = ''.join(
+        chr(TABLE_BASE + syllable_ids.get(default.get(cp, ''), 0))
+        for cp in range(RANGE_START, RANGE_END + 1)
+    )
+
+    phrases = []
+    for phrase, readings in sorted(phrases_dict.items()):
+        reading = [plain(r[0]) for r in readings]
+        if len(reading) != len(phrase) or not all(RANGE_START <= ord(c) <= RANGE_END for c in phrase):
+            continue
+        if any(default.get(ord(c)) != r for c, r in zip(phrase, reading)):
+            phrases.append(f"{phrase} {' '.join(reading)}")
+
+    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
+        f.write('# 离线拼音表：由 scripts/build_pinyin_table.py 从 pypinyin 生成（MIT License）\n')
+        f.write(f"@range {RANGE_START:x} {RANGE_END:x}\n")
+        f.write(f"@syllables {' '.join(syllables[1:])}\n")
+        f.write('@table\n')
+        f.write(table + '\n')
+        f.write('@phrases\n')
+        f.write('\n'.join(phrases) + '\n')
+    print(f"✅ 已生成 {OUTPUT_PATH}：{len(syllables) - 1} 个音节，{len(phrases)} 个多音词组")
+
+
+if __name__ == '__main__':
+    main()
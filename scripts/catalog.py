@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""内容目录（catalog）：把 blog 和 diary 的 front matter、正文 hash 和全文索引保存在 SQLite 中。
+
+各脚本原本每次都遍历目录、重新解析文件，“三月份评分不高于 2 的日记”“标签为 X 但缺少 summary 的文章”
+这类问题只能全量扫描。这里用标准库 sqlite3 维护一个目录，保存在 `.cache/catalog.sqlite3`：
+- entries：每个文件一行，路径、size/mtime、正文 hash、常用字段（标题、日期、评分等）以及完整 front matter（JSON）
+- tags：标签 -> 文件，带索引
+- bodies：FTS5 全文索引。FTS5 自带的分词器不切分中文，这里与站内搜索相同，
+  中文取相邻两字、英文取单词（search_index.tokenize），词项用空格连接后写入
+日期与站点索引一致：diary 缺少 date 时使用首次提交的时间。
+
+更新是增量的：只重新解析 size/mtime 变化过的文件，每次运行的全部改动在同一个事务中提交。
+content_manager.py、update_diary_dates.py 和监视模式改写内容后会顺带更新目录。
+
+使用方法：
+python3 scripts/catalog.py                                           # 增量更新
+python3 scripts/catalog.py query --type diary --rating-max 2 --month 2025-03
+python3 scripts/catalog.py query --type blog --tag 强化学习 --missing summary
+python3 scripts/catalog.py query --text 策略梯度 --limit 10
+python3 scripts/catalog.py query --sql "SELECT tag, count(*) FROM tags GROUP BY tag ORDER BY 2 DESC LIMIT 10"
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+from content_scanner import ContentFile, scan_content
+from front_matter import read_front_matter
+from instrumentation import log
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CATALOG_PATH = PROJECT_ROOT / '.cache' / 'catalog.sqlite3'
+# 表结构或解析规则变化时递增，旧目录会被清空后重建
+CATALOG_VERSION = 1
+CONTENT_TYPES = ('blog', 'diary')
+DEFAULT_LIMIT = 50
+
+SCHEMA = (
+    'CREATE TABLE entries ('
+    ' id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, type TEXT NOT NULL, path TEXT NOT NULL,'
+    ' size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, body_hash TEXT NOT NULL,'
+    ' title TEXT, date TEXT, summary TEXT, rating INTEGER, weather TEXT, mood TEXT, draft INTEGER NOT NULL,'
+    ' front_matter TEXT NOT NULL)',
+    'CREATE INDEX entries_date ON entries (type, date)',
+    'CREATE INDEX entries_rating ON entries (type, rating, date)',
+    'CREATE TABLE tags (tag TEXT NOT NULL, entry INTEGER NOT NULL, PRIMARY KEY (tag, entry)) WITHOUT ROWID',
+    'CREATE INDEX tags_entry ON tags (entry)',
+    # rowid 与 entries.id 相同；查询只需要词项是否出现（按日期排序，不按相关度），
+    # 每个文件的词项去重后写入，并且不保存词频和位置（detail=none），索引小得多
+    "CREATE VIRTUAL TABLE bodies USING fts5 (terms, tokenize = 'unicode61 remove_diacritics 0', detail = none)",
+)
+
+
+def read_entry(content_type: str, path: Path, stat: os.stat_result, root: Path) -> tuple[dict, list[str], str, str]:
+    """解析单个文件，返回 (entries 的字段, 标签, 正文 hash, 全文索引词项)"""
+    from git_dates import file_creation_time
+    from keywords import strip_markdown
+    from search_index import tokenize
+    from site_index import parse_date
+
+    fm = read_front_matter(path)
+    with open(path, 'rb') as f:
+        if fm.closed:
+            f.seek(fm.body_offset)
+        body = f.read()
+    text = body.decode('utf-8', errors='replace')
+
+    date = parse_date(fm.get('date'))
+    if date is None and content_type == 'diary':
+        date = file_creation_time(path, stat, root)
+    tags = fm.get('tags') or []
+    tags = [str(tag) for tag in tags] if isinstance(tags, list) else [str(tags)]
+    rating = fm.get('rating')
+    title = str(fm.get('title') or path.stem).strip()
+    row = {
+        'title': title,
+        'date': date.strftime('%Y-%m-%d %H:%M:%S') if date else None,
+        'summary': str(fm.get('summary')) if fm.get('summary') not in (None, '') else None,
+        'rating': rating if isinstance(rating, int) and not isinstance(rating, bool) else None,
+        'weather': str(fm.get('weather')) if fm.get('weather') not in (None, '') else None,
+        'mood': str(fm.get('mood')) if fm.get('mood') not in (None, '') else None,
+        'draft': int(fm.get('draft') is True),
+        'front_matter': json.dumps(fm.data, ensure_ascii=False),
+    }
+    terms = ' '.join(dict.fromkeys(tokenize(f"{title}\n{' '.join(tags)}\n{strip_markdown(text)}")))
+    return row, tags, hashlib.blake2b(body, digest_size=16).hexdigest(), terms
+
+
+def fts_query(text: str) -> Optional[str]:
+    """把查询转换成 FTS5 表达式：与站内搜索相同的分词，所有词项都要命中，末尾的英文单词和单个汉字按前缀匹配"""
+    from search_index import query_groups
+
+    groups = query_groups(text)
+    if not groups:
+        return None
+    return ' AND '.join(f'"{term}"' + ('*' if prefix else '') for term, prefix in groups)
+
+
+class ContentCatalog:
+    def __init__(self, root: Path = PROJECT_ROOT, path: Path = CATALOG_PATH):
+        self.root = Path(os.path.abspath(root))
+        self.path = path
+        self.prefixes = {content_type: f"{self.root / 'src' / 'content' / content_type}{os.sep}"
+                         for content_type in CONTENT_TYPES}
+        self._conn = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            import sqlite3
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path)
+            if conn.execute('PRAGMA user_version').fetchone()[0] != CATALOG_VERSION:
+                with conn:
+                    for (name,) in conn.execute(
+                            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('entries', 'tags', 'bodies')"
+                    ).fetchall():
+                        conn.execute(f'DROP TABLE {name}')
+                    for statement in SCHEMA:
+                        conn.execute(statement)
+                    conn.execute(f'PRAGMA user_version = {CATALOG_VERSION}')
+            self._conn = conn
+        return self._conn
+
+    def key(self, content_type: str, path: Path) -> str:
+        text, prefix = str(path), self.prefixes[content_type]
+        # 扫描得到的路径都在 content_dir 下，直接截取字符串，避免大量 pathlib 运算
+        if not text.startswith(prefix):
+            text = os.path.abspath(text)
+        return f"{content_type}/{text[len(prefix):].replace(os.sep, '/')}"
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT count(*) FROM entries').fetchone()[0]
+
+    def update(self, scanned: Optional[dict[str, Iterable[ContentFile]]] = None) -> int:
+        """重新解析新增或修改过的文件，删除已不存在的文件，所有改动在一个事务中提交。
+
+        scanned 为 内容类型 -> 扫描结果（通常复用调用方已有的扫描结果），缺少的类型重新扫描。
+        返回变化的文件数。
+        """
+        stored = {key: (doc, size, mtime_ns) for doc, key, size, mtime_ns in
+                  self.conn.execute('SELECT id, key, size, mtime_ns FROM entries')}
+        changed: list[tuple[str, str, ContentFile]] = []
+        seen = set()
+        for content_type in CONTENT_TYPES:
+            items = (scanned or {}).get(content_type)
+            if items is None:
+                items = scan_content(self.root / 'src' / 'content' / content_type)
+            for item in items:
+                key = self.key(content_type, item.path)
+                seen.add(key)
+                entry = stored.get(key)
+                if entry is None or entry[1:] != (item.stat.st_size, item.stat.st_mtime_ns):
+                    changed.append((content_type, key, item))
+        removed = [doc for key, (doc, _, _) in stored.items() if key not in seen]
+        if not changed and not removed:
+            return 0
+
+        rows, tag_rows, bodies = [], [], []
+        replaced = []
+        for content_type, key, item in changed:
+            try:
+                row, tags, body_hash, terms = read_entry(content_type, item.path, item.stat, self.root)
+            except (OSError, UnicodeDecodeError) as e:
+                log(f"⚠️  读取 {key} 失败：{e}", path=key, error=str(e))
+                continue
+            doc = stored[key][0] if key in stored else None
+            if doc is not None:
+                replaced.append(doc)
+            rows.append((doc, key, content_type, os.path.relpath(item.path, self.root), item.stat.st_size,
+                         item.stat.st_mtime_ns, body_hash, row['title'], row['date'], row['summary'], row['rating'],
+                         row['weather'], row['mood'], row['draft'], row['front_matter']))
+            tag_rows.append((key, tags))
+            bodies.append((key, terms))
+
+        with self.conn:
+            stale = [(doc,) for doc in removed + replaced]
+            self.conn.executemany('DELETE FROM tags WHERE entry = ?', stale)
+            self.conn.executemany('DELETE FROM bodies WHERE rowid = ?', stale)
+            self.conn.executemany('DELETE FROM entries WHERE id = ?', [(doc,) for doc in removed])
+            # 修改过的文件沿用原来的 id（REPLACE 按主键覆盖），新文件由 SQLite 分配
+            self.conn.executemany('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                  rows)
+            ids = dict(self.conn.execute('SELECT key, id FROM entries'))
+            self.conn.executemany('INSERT OR IGNORE INTO tags VALUES (?, ?)',
+                                  [(tag, ids[key]) for key, tags in tag_rows for tag in tags])
+            self.conn.executemany('INSERT INTO bodies (rowid, terms) VALUES (?, ?)',
+                                  [(ids[key], terms) for key, terms in bodies])
+        return len(changed) + len(removed)
+
+    def query(self, content_type: Optional[str] = None, tags: Iterable[str] = (), month: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None, rating_min: Optional[int] = None,
+              rating_max: Optional[int] = None, missing: Iterable[str] = (), text: Optional[str] = None,
+              drafts: bool = True, limit: int = DEFAULT_LIMIT) -> list[dict]:
+        """按条件查询，结果按日期倒序。month 为 YYYY-MM；since/until 为 YYYY-MM-DD（含当天）；
+        missing 为 front matter 中缺少（或为空）的字段；text 为全文检索的查询"""
+        conditions, params = [], []
+        if content_type:
+            conditions.append('e.type = ?')
+            params.append(content_type)
+        for tag in tags:
+            conditions.append('e.id IN (SELECT entry FROM tags WHERE tag = ?)')
+            params.append(tag)
+        if month:
+            # 按日期范围比较，可以使用 (type, date) 索引
+            conditions.append('e.date >= ? AND e.date < ?')
+            params += [month, f"{month}\uffff"]
+        if since:
+            conditions.append('e.date >= ?')
+            params.append(since)
+        if until:
+            conditions.append('e.date < ?')
+            params.append(f"{until}\uffff")
+        if rating_min is not None:
+            conditions.append('e.rating >= ?')
+            params.append(rating_min)
+        if rating_max is not None:
+            conditions.append('e.rating <= ?')
+            params.append(rating_max)
+        for field in missing:
+            conditions.append("coalesce(json_extract(e.front_matter, ?), '') IN ('', '[]')")
+            params.append(f'$."{field}"')
+        if not drafts:
+            conditions.append('e.draft = 0')
+        if text is not None:
+            expression = fts_query(text)
+            if expression is None:
+                return []
+            conditions.append('e.id IN (SELECT rowid FROM bodies WHERE bodies MATCH ?)')
+            params.append(expression)
+
+        sql = ('SELECT e.key, e.type, e.path, e.date, e.title, e.summary, e.rating, e.weather, e.mood, e.draft,'
+               ' (SELECT json_group_array(tag) FROM tags WHERE entry = e.id) FROM entries e')
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY e.date DESC, e.key LIMIT ?'
+        columns = ('key', 'type', 'path', 'date', 'title', 'summary', 'rating', 'weather', 'mood', 'draft', 'tags')
+        results = []
+        for row in self.conn.execute(sql, params + [limit]):
+            result = dict(zip(columns, row))
+            result['draft'] = bool(result['draft'])
+            result['tags'] = json.loads(result['tags'])
+            results.append(result)
+        return results
+
+    def execute(self, sql: str) -> tuple[list[str], list[tuple]]:
+        """以只读方式执行任意 SQL，返回 (列名, 结果行)"""
+        import sqlite3
+
+        _ = self.conn  # 确保目录已创建
+        conn = sqlite3.connect(f"{self.path.as_uri()}?mode=ro", uri=True)
+        try:
+            cursor = conn.execute(sql)
+            return [column[0] for column in cursor.description or ()], cursor.fetchall()
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def refresh(root: Path = PROJECT_ROOT) -> int:
+    """增量更新内容目录，供其他脚本在改写内容后调用。返回变化的文件数"""
+    catalog = ContentCatalog(root, root / '.cache' / 'catalog.sqlite3')
+    try:
+        return catalog.update()
+    finally:
+        catalog.close()
+
+
+def print_results(results: list[dict]) -> None:
+    for result in results:
+        rating = f"{'★' * result['rating']:<5}" if result['rating'] else ' ' * 5
+        tags = f"  [{', '.join(result['tags'])}]" if result['tags'] else ''
+        print(f"  {(result['date'] or '')[:10]:<10}  {rating}  {result['key']}  {result['title']}{tags}")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='维护 blog/diary 的 SQLite 内容目录并查询')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('update', help='增量更新目录（默认）')
+    query = subparsers.add_parser('query', help='按条件查询目录')
+    query.add_argument('--type', choices=CONTENT_TYPES, help='内容类型')
+    query.add_argument('--tag', action='append', default=[], help='包含该标签（可重复，需同时包含）')
+    query.add_argument('--month', help='日期所在的月份，如 2025-03')
+    query.add_argument('--since', help='起始日期（含），如 2025-01-01')
+    query.add_argument('--until', help='结束日期（含），如 2025-06-30')
+    query.add_argument('--rating-min', type=int, help='心情评分下限')
+    query.add_argument('--rating-max', type=int, help='心情评分上限')
+    query.add_argument('--missing', action='append', default=[], help='front matter 中缺少或为空的字段（可重复）')
+    query.add_argument('--text', help='全文检索（标题、标签和正文）')
+    query.add_argument('--no-drafts', action='store_true', help='排除草稿')
+    query.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help=f'最多返回的条数（默认 {DEFAULT_LIMIT}）')
+    query.add_argument('--sql', help='直接执行只读 SQL（表：entries、tags、bodies），忽略其他条件')
+    query.add_argument('--json', action='store_true', help='以 JSON 输出')
+    query.add_argument('--update', action='store_true',
+                       help='查询前先增量更新（目录由处理脚本顺带维护，手动改过文件时使用）')
+    args = parser.parse_args(argv)
+
+    import sqlite3
+
+    catalog = ContentCatalog()
+    try:
+        # 目录为空（第一次使用）时总是先建立
+        if args.command != 'query' or args.update or not len(catalog):
+            start = time.perf_counter()
+            changed = catalog.update()
+            print(f"🗂️  目录共 {len(catalog)} 个文件，本次更新 {changed} 个"
+                  f"（{time.perf_counter() - start:.2f}s）", file=sys.stderr)
+        if args.command != 'query':
+            return
+
+        start = time.perf_counter()
+        if args.sql:
+            columns, rows = catalog.execute(args.sql)
+            elapsed = time.perf_counter() - start
+            if args.json:
+                print(json.dumps([dict(zip(columns, row)) for row in rows], ensure_ascii=False, indent=2))
+            else:
+                print('\t'.join(columns))
+                for row in rows:
+                    print('\t'.join('' if value is None else str(value) for value in row))
+        else:
+            rows = catalog.query(args.type, args.tag, args.month, args.since, args.until, args.rating_min,
+                                 args.rating_max, args.missing, args.text, not args.no_drafts, args.limit)
+            elapsed = time.perf_counter() - start
+            if args.json:
+                print(json.dumps(rows, ensure_ascii=False, indent=2))
+            else:
+                print_results(rows)
+        print(f"🔎 {len(rows)} 条结果（{elapsed * 1000:.1f} ms）", file=sys.stderr)
+    except sqlite3.Error as e:
+        print(f"❌ 查询失败：{e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        catalog.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""把长文章按标题切分成若干段，用于分段生成摘要（map-reduce）。
+
+- 在 Markdown 标题（`#` ~ `######`）处切分，代码块中的 `#` 注释不算标题
+- 过短的段与下一段合并，避免为一两句话单独调用模型
+- 超长的段在空行（段落边界）处继续切分，单个段落仍然超长时按字符数截断
+
+每段的内容只取决于它自己的文字，修改一节只会改变这一节（以及与之合并的相邻短节）的 hash，
+其他段的摘要可以直接从缓存中取得。
+
+使用方法：
+python3 scripts/chunking.py src/content/blog/training-summary.md   # 查看切分结果
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import re
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+FENCE_RE = re.compile(r'^\s*(```|~~~)')
+MAX_CHUNK_CHARS = 2000
+MIN_CHUNK_CHARS = 300
+
+
+class Chunk(NamedTuple):
+    heading: str
+    text: str
+
+    @property
+    def digest(self) -> str:
+        return hashlib.blake2b(self.text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def split_sections(text: str) -> list[Chunk]:
+    """按标题切分，每节包含标题行本身；第一个标题之前的内容作为标题为空的一节"""
+    sections: list[Chunk] = []
+    heading, lines = '', []
+    in_fence = False
+    for line in text.splitlines(keepends=True):
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_RE.match(line)
+        if match:
+            if ''.join(lines).strip():
+                sections.append(Chunk(heading, ''.join(lines).strip('\n')))
+            heading, lines = match.group(2), []
+        lines.append(line)
+    if ''.join(lines).strip():
+        sections.append(Chunk(heading, ''.join(lines).strip('\n')))
+    return sections
+
+
+def split_long(chunk: Chunk, max_chars: int) -> list[Chunk]:
+    """在空行处把超长的一节切成不超过 max_chars 的几段，后续各段沿用同一个标题"""
+    if len(chunk.text) <= max_chars:
+        return [chunk]
+    pieces: list[str] = []
+    current = ''
+    for paragraph in re.split(r'\n\s*\n', chunk.text):
+        while len(paragraph) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        if current and len(current) + 2 + len(paragraph) > max_chars:
+            pieces.append(current)
+            current = ''
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current.strip():
+        pieces.append(current)
+    return [Chunk(chunk.heading, piece) for piece in pieces if piece.strip()]
+
+
+def split_chunks(text: str, max_chars: int = MAX_CHUNK_CHARS, min_chars: int = MIN_CHUNK_CHARS) -> list[Chunk]:
+    """切分正文：先按标题，再合并过短的节、切开过长的节"""
+    chunks: list[Chunk] = []
+    pending: Optional[Chunk] = None
+    for section in split_sections(text):
+        if pending is not None:
+            section = Chunk(pending.heading or section.heading, f"{pending.text}\n\n{section.text}")
+            pending = None
+        if len(section.text) < min_chars:
+            pending = section
+            continue
+        chunks.extend(split_long(section, max_chars))
+    if pending is not None:
+        # 末尾的短节并入上一段（不超过上限时），否则单独成段
+        if chunks and len(chunks[-1].text) + len(pending.text) <= max_chars:
+            last = chunks.pop()
+            chunks.append(Chunk(last.heading, f"{last.text}\n\n{pending.text}"))
+        else:
+            chunks.append(pending)
+    return chunks
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    from keywords import strip_front_matter
+
+    parser = argparse.ArgumentParser(description='查看文章按标题切分的结果')
+    parser.add_argument('path', type=Path, help='Markdown 文件')
+    parser.add_argument('--max-chars', type=int, default=MAX_CHUNK_CHARS, help=f'每段的字符数上限（默认 {MAX_CHUNK_CHARS}）')
+    args = parser.parse_args(argv)
+
+    body = strip_front_matter(args.path.read_text(encoding='utf-8-sig'))
+    chunks = split_chunks(body, args.max_chars)
+    print(f"📄 {args.path.name}：{len(body)} 字，切分为 {len(chunks)} 段")
+    for index, chunk in enumerate(chunks, 1):
+        print(f"  {index:>3}. {chunk.digest[:8]}  {len(chunk.text):>5} 字  {chunk.heading or '（开头）'}")
+
+
+if __name__ == '__main__':
+    main()
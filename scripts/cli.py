@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""内容脚本的统一入口。
+
+使用方法：
+python3 scripts/cli.py create --type diary      # 等同于 create_entry.py
+python3 scripts/cli.py dates                    # 等同于 update_diary_dates.py
+python3 scripts/cli.py process --type blog      # 等同于 content_manager.py
+
+子命令对应的模块只在被调用时才导入，`create` 不会加载模型相关的依赖，
+适合在编辑器钩子中频繁调用。
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import sys
+
+# 子命令 -> (模块名, 说明)
+COMMANDS = {
+    'create': ('create_entry', '创建带 frontmatter 的 blog/diary 文件'),
+    'dates': ('update_diary_dates', '为缺少 date 字段的日记添加创建时间'),
+    'process': ('content_manager', '处理 blog/diary 的 front matter（翻译、tags、summary）'),
+    'keywords': ('keywords', '更新离线关键词索引，查看文章的 tags 和摘要'),
+    'slug': ('pinyin', '把中文标题离线转换成拼音文件名'),
+    'index': ('site_index', '生成标签、归档和日历页面使用的站点聚合索引'),
+    'reshard': ('content_scanner', '把 diary 目录按 年/月 分片，或还原为平铺目录'),
+    'dups': ('duplicates', '检测 blog 和 diary 中内容近似重复的文件'),
+    'related': ('related_posts', '预先计算每篇文章的相关文章'),
+    'search': ('search_index', '生成站内搜索使用的分片倒排索引'),
+    'validate': ('validate_content', '按 config.ts 的规则校验 front matter'),
+    'catalog': ('catalog', '维护 SQLite 内容目录，按标签、日期、评分和全文查询'),
+}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description='blog / diary 内容脚本统一入口',
+        epilog='\n'.join(f"  {name:<10}{help_text}" for name, (_, help_text) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('command', choices=COMMANDS, metavar='command', help='子命令：' + ' / '.join(COMMANDS))
+    parser.add_argument('args', nargs=argparse.REMAINDER, help='传给子命令的参数（子命令 -h 查看详情）')
+    args = parser.parse_args(argv)
+
+    module_name, _ = COMMANDS[args.command]
+    module = importlib.import_module(module_name)
+    sys.argv[0] = f"{parser.prog} {args.command}"
+    module.main(args.args)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,267 +4,676 @@ Astro 内容管理脚本 - 支持 blog 和 diary 目录
 
 功能：
 - 自动处理 blog 和 diary 文件的 front matter
-- 中文标题自动翻译成英文文件名
+- 中文标题自动翻译成英文文件名（或离线转换成拼音文件名）
 - 使用 AI 模型生成 tags 和 summary
 - 支持手动输入和自动生成模式
 
 使用方法：
 python scripts/content_manager.py --type blog    # 处理 blog 文件
 python scripts/content_manager.py --type diary  # 处理 diary 文件
+
+PyYAML、requests、models.yaml 以及进程/线程池都只在真正需要时才加载，
+只处理 diary 时不会触碰任何模型相关的依赖。
 """
 
 import os
 import re
 import argparse
+import importlib
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import cached_property
 from pathlib import Path
 from datetime import datetime
-import locale
 import json
-from typing import Optional, List, Dict
-
-# 可选导入，如果失败则使用备用方案
-try:
-    import yaml
-    YAML_AVAILABLE = True
-except ImportError:
-    YAML_AVAILABLE = False
-    print("⚠️  PyYAML 未安装，将使用备用配置模式")
-
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
-    print("⚠️  requests 未安装，将使用简单规则模式")
-
-# 设置中文时间格式
-locale.setlocale(locale.LC_TIME, 'zh_CN.UTF-8')
+from typing import Optional, List, Dict, Tuple, Union
+
+from content_manifest import ContentManifest
+from content_scanner import ContentFile, scan_content
+from git_dates import file_creation_time
+from front_matter import read_front_matter, field_insertion
+from atomic_write import AtomicWriter, Part
+from model_client import CircuitBreaker, CircuitOpenError, ModelClient, ModelRouter
+from response_cache import ResponseCache, make_key
+from site_index import refresh as refresh_site_index
+from instrumentation import capture_logs, recorder, log
+import pinyin
+
+
+def import_optional(module_name: str):
+    """按需导入可选依赖，未安装时返回 None，由调用方使用备用方案"""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return None
+
+
+DEFAULT_TRACE_PATH = Path(__file__).resolve().parents[1] / '.cache' / 'content-trace.json'
+
+# 提示词模板（同时作为响应缓存键的一部分，修改后旧缓存自动失效）
+TRANSLATE_PROMPT = "你是一个专业的翻译助手，请将中文标题翻译成简洁的英文标题，只返回翻译结果，不要有任何解释或标点符号。"
+TAGS_SUMMARY_PROMPT = (
+    "你是一个专业的内容分析师，请根据文章内容生成最多3个相关的标签和一个不超过30字的中文摘要。"
+    "标签应该简洁、专业。只返回 JSON，格式为 {\"tags\": [\"标签1\", \"标签2\"], \"summary\": \"摘要\"}，不要有任何解释。"
+)
+# 长文章分段生成摘要：先为每段生成摘要（map），再由各段摘要生成 tags 和 summary（reduce）
+CHUNK_SUMMARY_PROMPT = "你是一个专业的内容分析师，请用不超过60字的中文概括这段文章的要点，只返回概括内容，不要有任何解释。"
+REDUCE_PROMPT = (
+    "你是一个专业的内容分析师，下面是一篇文章各部分的要点，请据此生成最多3个相关的标签和一个不超过30字的中文摘要。"
+    "标签应该简洁、专业。只返回 JSON，格式为 {\"tags\": [\"标签1\", \"标签2\"], \"summary\": \"摘要\"}，不要有任何解释。"
+)
+# 正文不超过该长度时一次请求生成；更长的文章按标题分段
+SINGLE_PASS_CHARS = 1500
+CHUNK_SUMMARY_CHARS = 60
+
+
+class MetadataSpeculation:
+    """交互模式下在后台预先生成一个 blog 文件的英文文件名和 tags / summary
+
+    打开文件时立即开始生成，用户回答提示时结果通常已经就绪；用户手动输入 tags 和 summary 时取消生成。
+    后台线程的 log 输出先暂存，取结果时再打印，不会打断正在显示的提示。
+    source 为生成所依据的 read_blog_source 结果，处理文件时直接沿用；
+    stat 为读取前的 (size, mtime_ns)，文件在此之后被修改时结果作废。
+    """
+
+    def __init__(self, manager: 'ContentManager', executor, file_path: Path, source: Tuple[str, str, List[Part]],
+                 stat: Optional[Tuple[int, int]] = None):
+        self.manager = manager
+        self.file_path = file_path
+        self.source = source
+        self.stat = stat
+        title, body_content = source[:2]
+        self.slug = executor.submit(self.run, manager.translate_chinese_to_english, title)
+        self.tags_summary = executor.submit(self.run, manager.generate_tags_and_summary, body_content, title)
+
+    def run(self, function, *args):
+        with capture_logs() as lines, self.manager.track_degradation(self.file_path):
+            return function(*args), lines
+
+    @staticmethod
+    def result(future):
+        recorder.count('speculation_ready' if future.done() else 'speculation_waited')
+        with recorder.span('speculation_wait'):
+            value, lines = future.result()
+        for line in lines:
+            print(line)
+        return value
+
+    def is_current(self) -> bool:
+        """文件自读取以来没有变化（没有记录 stat 时视为没有变化）"""
+        if self.stat is None:
+            return True
+        try:
+            stat = self.file_path.stat()
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == self.stat
+
+    def cancel(self, *futures) -> None:
+        """取消还没开始的生成；已经发出的请求无法中断，结果直接丢弃"""
+        for future in futures or (self.slug, self.tags_summary):
+            if future.cancel():
+                recorder.count('speculation_cancelled')
+
 
 class ContentManager:
-    def __init__(self):
+    def __init__(self, concurrency: int = 1, rate_limit: Optional[float] = None, use_cache: bool = True,
+                 slug_mode: Optional[str] = None, hedge: Optional[bool] = None):
         self.script_dir = Path(__file__).parent
         self.project_root = self.script_dir.parent
-        self.models_config = self.load_models_config()
+        self.concurrency = max(1, concurrency)
+        self.rate_limit = rate_limit
+        self.use_cache = use_cache
+        self._slug_mode = slug_mode
+        self._hedge = hedge
+        self.writer = AtomicWriter()
+        self._keyword_engine = None
+        self._keyword_engine_lock = threading.Lock()
+        # 因模型不可用而改用离线规则的文件和调用次数
+        self.degraded_files: set = set()
+        self.degraded_calls: Counter = Counter()
+        self._degraded_lock = threading.Lock()
+        self._current = threading.local()
+
+    # 模型配置、客户端和缓存都在第一次使用时才加载
+    @cached_property
+    def models_config(self) -> Dict:
+        return self.load_models_config()
+
+    @cached_property
+    def model_client(self) -> Optional[Union[ModelClient, ModelRouter]]:
+        return self.create_model_client(self.rate_limit)
+
+    @cached_property
+    def response_cache(self) -> Optional[ResponseCache]:
+        return self.create_response_cache() if self.use_cache and self.model_client else None
+
+    @cached_property
+    def chunk_executor(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        return ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='chunk')
+
+    @cached_property
+    def speculation_executor(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        return ThreadPoolExecutor(max_workers=4, thread_name_prefix='speculate')
+
+    @cached_property
+    def slug_mode(self) -> str:
+        """文件名生成方式：translate 调用模型翻译，pinyin 离线转拼音（命令行参数优先于 models.yaml 的 slug 字段）"""
+        return self._slug_mode or self.models_config.get('slug') or 'translate'
 
     def load_models_config(self) -> Dict:
         """加载模型配置文件"""
-        if not YAML_AVAILABLE:
-            print("⚠️  PyYAML 不可用，将使用简单规则模式")
+        yaml = import_optional('yaml')
+        if yaml is None:
+            log("⚠️  PyYAML 未安装，将使用简单规则模式")
             return {}
 
         models_file = self.project_root / 'models.yaml'
         if models_file.exists():
             try:
                 with open(models_file, 'r', encoding='utf-8') as f:
-                    return yaml.safe_load(f)
+                    return yaml.safe_load(f) or {}
             except Exception as e:
-                print(f"⚠️  读取 models.yaml 失败：{e}，将使用简单规则模式")
+                log(f"⚠️  读取 models.yaml 失败：{e}，将使用简单规则模式")
                 return {}
         return {}
 
-    def get_file_creation_time(self, file_path: Path) -> datetime:
-        """获取文件创建时间"""
-        stat = os.stat(file_path)
-        # 优先使用创建时间，如果没有则使用修改时间
-        creation_time = stat.st_birthtime if hasattr(stat, 'st_birthtime') else stat.st_ctime
-        return datetime.fromtimestamp(creation_time)
-
+    def create_model_client(self, rate_limit: Optional[float] = None) -> Optional[Union[ModelClient, ModelRouter]]:
+        """创建共享连接池的模型客户端；配置了多个模型时返回按延迟路由的 ModelRouter。
+        没有配置模型或 requests 不可用时返回 None"""
+        models = self.models_config.get('models')
+        if not models:
+            return None
+        if import_optional('requests') is None:
+            log("⚠️  requests 未安装，将使用简单规则模式")
+            return None
+        # 限速和熔断都针对单个服务商，每个模型各自计算；熔断阈值、重试次数可在 models.yaml 中配置
+        breaker_config = self.models_config.get('circuit_breaker') or {}
+        retry_config = self.models_config.get('retry') or {}
+        clients = [
+            ModelClient(
+                model,
+                max_connections=self.concurrency,
+                rate_limit=rate_limit,
+                timeout=model.get('timeout', 10),
+                breaker=CircuitBreaker(
+                    model['name'],
+                    failure_threshold=breaker_config.get('failure_threshold', 3),
+                    reset_timeout=breaker_config.get('reset_timeout', 30),
+                    max_reset_timeout=breaker_config.get('max_reset_timeout', 300),
+                ),
+                retries=retry_config.get('attempts', 2),
+                backoff=retry_config.get('backoff', 0.5),
+                max_backoff=retry_config.get('max_backoff', 8),
+            )
+            for model in models
+        ]
+        if len(clients) == 1:
+            return clients[0]
+
+        routing = self.models_config.get('routing') or {}
+        hedge = self._hedge if self._hedge is not None else bool(routing.get('hedge', False))
+        return ModelRouter(
+            clients,
+            hedge=hedge,
+            hedge_percentile=routing.get('hedge_percentile', 90),
+            hedge_min_delay=routing.get('hedge_min_delay', 0.5),
+            window=routing.get('window', 50),
+        )
+
+    def create_response_cache(self) -> ResponseCache:
+        """创建模型响应缓存，容量和有效期可在 models.yaml 的 cache 段中配置"""
+        cache_config = self.models_config.get('cache') or {}
+        ttl_days = cache_config.get('ttl_days', 90)
+        return ResponseCache(
+            max_entries=cache_config.get('max_entries', 5000),
+            ttl=ttl_days * 24 * 3600 if ttl_days else None,
+        )
+
+    def get_file_creation_time(self, file_path: Path, stat: Optional[os.stat_result] = None) -> datetime:
+        """获取文件创建时间：首次提交到 git 的时间，未提交的文件使用创建时间（回退到 ctime）；
+        stat 为扫描目录时已取得的结果"""
+        return file_creation_time(file_path, stat, self.project_root)
+
+    @contextmanager
+    def track_degradation(self, file_path: Path):
+        """在此期间改用离线规则的调用都记到 file_path 名下（按线程区分，可并发使用）"""
+        self._current.file = file_path
+        try:
+            yield
+        finally:
+            self._current.file = None
+
+    def mark_degraded(self, kind: str) -> None:
+        with self._degraded_lock:
+            self.degraded_calls[kind] += 1
+            file_path = getattr(self._current, 'file', None)
+            if file_path is not None:
+                self.degraded_files.add(file_path)
+
+    @recorder.timed('slug')
     def translate_chinese_to_english(self, chinese_text: str) -> str:
         """简单的中文转英文函数（使用 AI 模型）"""
-        if not self.models_config.get('models') or not REQUESTS_AVAILABLE:
+        if self.slug_mode == 'pinyin':
+            return self.simple_pinyin_convert(chinese_text)
+
+        if self.model_client is None:
             # 如果没有配置模型或 requests 不可用，使用简单的拼音转换
-            print("⚠️  使用简单规则进行中文翻译")
+            log("⚠️  使用简单规则进行中文翻译")
             return self.simple_pinyin_convert(chinese_text)
 
+        cache_key = make_key(self.model_client.model['name'], TRANSLATE_PROMPT, chinese_text)
+        if self.response_cache is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         # 使用配置的模型进行翻译
-        model = self.models_config['models'][0]  # 使用第一个模型
         try:
-            response = requests.post(
-                f"{model['base_url']}/chat/completions",
-                headers={
-                    'Authorization': f"Bearer {model['api_key']}",
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    "model": model['name'],
-                    "messages": [
-                        {"role": "system", "content": "你是一个专业的翻译助手，请将中文标题翻译成简洁的英文标题，只返回翻译结果，不要有任何解释或标点符号。"},
-                        {"role": "user", "content": f"将以下中文标题翻译成英文：{chinese_text}"}
-                    ],
-                    "max_tokens": 50,
-                    "temperature": 0.3
-                },
-                timeout=10
+            translation = self.model_client.chat(
+                [
+                    {"role": "system", "content": TRANSLATE_PROMPT},
+                    {"role": "user", "content": f"将以下中文标题翻译成英文：{chinese_text}"}
+                ],
+                max_tokens=50,
             )
 
-            if response.status_code == 200:
-                result = response.json()
-                translation = result['choices'][0]['message']['content'].strip()
+            if translation is not None:
                 # 清理翻译结果，只保留字母、数字和连字符
-                return re.sub(r'[^a-zA-Z0-9\s-]', '', translation).replace(' ', '-').lower()
+                english_name = re.sub(r'[^a-zA-Z0-9\s-]', '', translation).replace(' ', '-').lower()
+                if self.response_cache is not None:
+                    self.response_cache.set(cache_key, english_name)
+                return english_name
             else:
-                print(f"⚠️  翻译 API 调用失败，使用简单转换")
-                return self.simple_pinyin_convert(chinese_text)
+                log(f"⚠️  翻译 API 调用失败，使用简单转换")
 
+        except CircuitOpenError:
+            # 熔断期间不再逐个输出警告
+            pass
         except Exception as e:
-            print(f"⚠️  翻译失败：{e}，使用简单转换")
-            return self.simple_pinyin_convert(chinese_text)
+            log(f"⚠️  翻译失败：{e}，使用简单转换")
+        self.mark_degraded('slug')
+        return self.simple_pinyin_convert(chinese_text)
 
     def simple_pinyin_convert(self, chinese_text: str) -> str:
-        """简单的拼音转换作为后备方案"""
-        # 这里可以集成更复杂的拼音库，现在用简单处理
-        # 提取关键词并简单翻译
-        text = re.sub(r'[^\u4e00-\u9fff]', '', chinese_text)  # 只保留中文字符
-
-        # 常见词汇的简单映射
-        simple_dict = {
-            '训练': 'training', '学习': 'learning', '深度': 'deep',
-            '强化': 'reinforcement', '小结': 'summary', '总结': 'summary',
-            '笔记': 'notes', '思考': 'thoughts', '实践': 'practice',
-            '教程': 'tutorial', '指南': 'guide', '入门': 'beginner',
-            '高级': 'advanced', '基础': 'basic', '原理': 'principles'
-        }
-
-        result = []
-        for key, value in simple_dict.items():
-            if key in chinese_text:
-                result.append(value)
-
-        if result:
-            return '-'.join(result)
-        else:
-            # 如果无法翻译，使用时间戳
-            return f"post-{int(datetime.now().timestamp())}"
-
+        """离线拼音转换，作为翻译的后备方案"""
+        slug = pinyin.slugify(chinese_text)
+        if slug:
+            return slug
+        # 标题中没有汉字、字母或数字时，使用时间戳
+        return f"post-{int(datetime.now().timestamp())}"
+
+    @recorder.timed('tags_summary')
     def generate_tags_and_summary(self, content: str, title: str) -> tuple[List[str], str]:
         """使用 AI 模型生成 tags 和 summary"""
-        if not self.models_config.get('models') or not REQUESTS_AVAILABLE:
+        if self.model_client is None:
             # 如果没有配置模型或 requests 不可用，使用简单规则生成
-            print("⚠️  使用简单规则生成 tags 和 summary")
+            log("⚠️  使用简单规则生成 tags 和 summary")
             return self.simple_generate_tags_and_summary(content, title)
 
-        model = self.models_config['models'][0]
-        try:
-            # 生成 tags
-            tags_response = requests.post(
-                f"{model['base_url']}/chat/completions",
-                headers={
-                    'Authorization': f"Bearer {model['api_key']}",
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    "model": model['name'],
-                    "messages": [
-                        {"role": "system", "content": "你是一个专业的内容分析师，请根据文章内容生成最多3个相关的标签。标签应该简洁、专业，用逗号分隔。只返回标签，不要有任何解释。"},
-                        {"role": "user", "content": f"标题：{title}\n内容：{content[:500]}..."}
-                    ],
-                    "max_tokens": 50,
-                    "temperature": 0.3
-                },
-                timeout=10
-            )
+        if len(content) > SINGLE_PASS_CHARS:
+            return self.generate_chunked_tags_and_summary(content, title)
+
+        user_prompt = f"标题：{title}\n内容：{content}"
+        cache_key = make_key(self.model_client.model['name'], TAGS_SUMMARY_PROMPT, user_prompt)
+        if self.response_cache is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached['tags'], cached['summary']
 
-            # 生成 summary
-            summary_response = requests.post(
-                f"{model['base_url']}/chat/completions",
-                headers={
-                    'Authorization': f"Bearer {model['api_key']}",
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    "model": model['name'],
-                    "messages": [
-                        {"role": "system", "content": "请用中文为文章内容生成一个不超过30字的简洁摘要。只返回摘要内容，不要有任何解释。"},
-                        {"role": "user", "content": f"标题：{title}\n内容：{content[:500]}..."}
-                    ],
-                    "max_tokens": 60,
-                    "temperature": 0.3
-                },
-                timeout=10
+        try:
+            # 一次请求同时生成 tags 和 summary
+            result_text = self.model_client.chat(
+                [
+                    {"role": "system", "content": TAGS_SUMMARY_PROMPT},
+                    {"role": "user", "content": user_prompt}
+                ],
+                max_tokens=120,
             )
+            if result_text is None:
+                raise ValueError("API 调用失败")
 
-            tags = []
-            summary = ""
+            tags, summary = self.parse_tags_and_summary(result_text)
+            if self.response_cache is not None:
+                self.response_cache.set(cache_key, {'tags': tags, 'summary': summary})
+            return tags, summary
 
-            if tags_response.status_code == 200:
-                tags_result = tags_response.json()
-                tags_text = tags_result['choices'][0]['message']['content'].strip()
-                # 解析标签
-                tags = [tag.strip() for tag in tags_text.split(',') if tag.strip()][:3]
+        except CircuitOpenError:
+            pass
+        except Exception as e:
+            log(f"⚠️  AI 生成失败：{e}，使用简单规则")
+        self.mark_degraded('tags_summary')
+        return self.simple_generate_tags_and_summary(content, title)
+
+    def generate_chunked_tags_and_summary(self, content: str, title: str) -> tuple[List[str], str]:
+        """长文章按标题分段，各段摘要并发生成并按内容 hash 缓存，再合并成 tags 和 summary。
+
+        修改文章后只有内容变化的段需要重新生成摘要，请求数和 token 数与改动的大小成正比。
+        """
+        from chunking import split_chunks
+
+        chunks = split_chunks(content)
+        with recorder.span('chunk_summaries', chunks=len(chunks)):
+            summaries = list(self.chunk_executor.map(self.summarize_chunk, chunks))
+        outlines = "\n".join(f"{index}. {chunk.heading + '：' if chunk.heading else ''}{summary}"
+                              for index, (chunk, summary) in enumerate(zip(chunks, summaries), 1))
+        user_prompt = f"标题：{title}\n各部分要点：\n{outlines}"
+
+        cache_key = make_key(self.model_client.model['name'], REDUCE_PROMPT, user_prompt)
+        if self.response_cache is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached['tags'], cached['summary']
 
-            if summary_response.status_code == 200:
-                summary_result = summary_response.json()
-                summary = summary_result['choices'][0]['message']['content'].strip()
-                # 确保不超过30字
-                if len(summary) > 30:
-                    summary = summary[:30] + "..."
+        try:
+            result_text = self.model_client.chat(
+                [
+                    {"role": "system", "content": REDUCE_PROMPT},
+                    {"role": "user", "content": user_prompt}
+                ],
+                max_tokens=120,
+            )
+            if result_text is None:
+                raise ValueError("API 调用失败")
 
+            tags, summary = self.parse_tags_and_summary(result_text)
+            if self.response_cache is not None:
+                self.response_cache.set(cache_key, {'tags': tags, 'summary': summary})
             return tags, summary
 
+        except CircuitOpenError:
+            pass
         except Exception as e:
-            print(f"⚠️  AI 生成失败：{e}，使用简单规则")
-            return self.simple_generate_tags_and_summary(content, title)
+            log(f"⚠️  AI 生成失败：{e}，使用简单规则")
+        self.mark_degraded('tags_summary')
+        return self.simple_generate_tags_and_summary(content, title)
+
+    def summarize_chunk(self, chunk) -> str:
+        """生成一段的摘要，按段落内容的 hash 缓存；失败时取这一段开头的文字，不影响其他段"""
+        cache_key = make_key(self.model_client.model['name'], CHUNK_SUMMARY_PROMPT, chunk.text)
+        if self.response_cache is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                recorder.count('chunk_summary_cached')
+                return cached
+
+        try:
+            result_text = self.model_client.chat(
+                [
+                    {"role": "system", "content": CHUNK_SUMMARY_PROMPT},
+                    {"role": "user", "content": chunk.text}
+                ],
+                max_tokens=150,
+            )
+            if result_text is None:
+                raise ValueError("API 调用失败")
+            summary = result_text.strip()[:CHUNK_SUMMARY_CHARS * 2]
+            recorder.count('chunk_summary_generated')
+            if self.response_cache is not None:
+                self.response_cache.set(cache_key, summary)
+            return summary
+        except CircuitOpenError:
+            pass
+        except Exception as e:
+            log(f"⚠️  分段摘要生成失败：{e}，使用段落开头")
+        from keywords import strip_markdown
+
+        recorder.count('chunk_summary_fallback')
+        return re.sub(r'\s+', ' ', strip_markdown(chunk.text)).strip()[:CHUNK_SUMMARY_CHARS]
+
+    @staticmethod
+    def parse_tags_and_summary(result_text: str) -> tuple[List[str], str]:
+        """解析模型返回的 JSON（允许包裹在 ``` 代码块中）"""
+        json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
+        if not json_match:
+            raise ValueError(f"无法解析模型返回：{result_text[:50]}")
+        result = json.loads(json_match.group(0))
+
+        tags = result.get('tags') or []
+        if isinstance(tags, str):
+            tags = tags.split(',')
+        tags = [str(tag).strip() for tag in tags if str(tag).strip()][:3]
+
+        summary = str(result.get('summary') or '').strip()
+        # 确保不超过30字
+        if len(summary) > 30:
+            summary = summary[:30] + "..."
+        return tags, summary
 
+    @property
+    def keyword_engine(self):
+        """离线关键词引擎（第一次使用时加载索引并增量更新）"""
+        with self._keyword_engine_lock:
+            if self._keyword_engine is None:
+                from keywords import KeywordEngine
+
+                engine = KeywordEngine.load(self.project_root)
+                engine.update()
+                engine.save()
+                self._keyword_engine = engine
+        return self._keyword_engine
+
+    @recorder.timed('keywords')
     def simple_generate_tags_and_summary(self, content: str, title: str) -> tuple[List[str], str]:
-        """简单的 tags 和 summary 生成规则"""
+        """离线生成 tags 和 summary：优先使用基于语料 IDF 的关键词引擎，再退回简单规则"""
+        try:
+            tags, summary = self.keyword_engine.extract(title, content)
+        except Exception as e:
+            log(f"⚠️  离线关键词引擎不可用：{e}")
+            tags, summary = [], ""
+        if tags and summary:
+            return tags, summary
+
         # 简单的关键词提取
         keywords = ['教程', '笔记', '总结', '实践', '思考', '学习', '项目', '工具', '技术']
-        tags = []
-
-        for keyword in keywords:
-            if keyword in title or keyword in content:
-                tags.append(keyword)
-                if len(tags) >= 3:
-                    break
+        if not tags:
+            for keyword in keywords:
+                if keyword in title or keyword in content:
+                    tags.append(keyword)
+                    if len(tags) >= 3:
+                        break
 
         if not tags:
             tags = ['笔记']  # 默认标签
 
         # 简单的摘要生成
-        summary = title.replace('训练', '').replace('小结', '').replace('总结', '')
-        if len(summary) > 30:
-            summary = summary[:30]
+        if not summary:
+            summary = title.replace('训练', '').replace('小结', '').replace('总结', '')
+            if len(summary) > 30:
+                summary = summary[:30]
         if not summary:
             summary = "一篇技术笔记"
 
         return tags, summary
 
-    def process_blog_file(self, file_path: Path, interactive: bool = True) -> bool:
-        """处理 blog 文件"""
-        print(f"\n📝 处理 blog 文件: {file_path.name}")
+    @recorder.timed('read_blog')
+    def read_blog_source(self, file_path: Path) -> Optional[Tuple[str, str, List[Part]]]:
+        """读取 blog 源文件，返回 (标题, 正文, 正文写入片段)；文件已有 front matter 时返回 None
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        正文写入片段是正文在源文件中的字节区间，写入时直接从源文件拷贝。
+        """
+        # 检查是否已经有 front matter（只读取文件头部）
+        if read_front_matter(file_path).closed:
+            return None
 
-        # 检查是否已经有 front matter
-        if content.startswith('---'):
-            # 找到 front matter 的结束位置
-            end_match = re.search(r'\n---+\n', content[3:])
-            if end_match:
-                print(f"✅ 文件已有 front matter，跳过: {file_path.name}")
-                return False
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        recorder.count('bytes_read', len(raw))
+        content = raw.decode('utf-8')
 
         # 提取标题（从文件名或内容）
         title_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
         title = title_match.group(1) if title_match else file_path.stem
 
-        # 生成英文文件名
+        if '\r' in content:
+            # 含 \r 的文件统一换行符后整体重写，无法按区间拷贝
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+            body_content = re.sub(r'^#\s+.+\n*', '', content, flags=re.MULTILINE).strip()
+            return title, body_content, [body_content.encode('utf-8')]
+
+        # 提取正文内容（去掉标题）
+        body_content, body_parts = self.split_blog_body(content)
+        return title, body_content, body_parts
+
+    @staticmethod
+    def split_blog_body(content: str) -> Tuple[str, List[Tuple[int, int]]]:
+        """去掉一级标题并去除首尾空白，返回 (正文, 正文在 UTF-8 源文件中的字节区间)"""
+        # 一级标题之间的片段（字符区间），等价于 re.sub(r'^#\s+.+\n*', '', content).strip()
+        segments = []
+        position = 0
+        for match in re.finditer(r'^#\s+.+\n*', content, flags=re.MULTILINE):
+            segments.append([position, match.start()])
+            position = match.end()
+        segments.append([position, len(content)])
+        segments = [seg for seg in segments if seg[0] < seg[1]]
+
+        while segments:
+            start, end = segments[0]
+            start = end - len(content[start:end].lstrip())
+            if start < end:
+                segments[0][0] = start
+                break
+            segments.pop(0)
+        while segments:
+            start, end = segments[-1]
+            end = start + len(content[start:end].rstrip())
+            if start < end:
+                segments[-1][1] = end
+                break
+            segments.pop()
+
+        body_content = ''.join(content[start:end] for start, end in segments)
+
+        # 字符偏移换算成字节偏移
+        ranges = []
+        byte_position = 0
+        char_position = 0
+        for start, end in segments:
+            byte_position += len(content[char_position:start].encode('utf-8'))
+            length = len(content[start:end].encode('utf-8'))
+            ranges.append((byte_position, length))
+            byte_position += length
+            char_position = end
+        return body_content, ranges
+
+    def generate_blog_metadata(self, title: str, body_content: str) -> Tuple[str, List[str], str]:
+        """自动生成英文文件名、tags 和 summary（线程安全，可并发调用）"""
         english_name = self.translate_chinese_to_english(title)
-        new_file_name = f"{english_name}.md"
+        tags, summary = self.generate_tags_and_summary(body_content, title)
+        return english_name, tags, summary
+
+    def prefetch_blog_metadata(self, files: List[Path]) -> Dict[Path, Tuple[str, List[str], str]]:
+        """用线程池并发为一批 blog 文件生成元数据，结果按文件路径返回"""
+        def worker(file_path: Path) -> Optional[Tuple[str, List[str], str]]:
+            with recorder.span('metadata', 'file', path=file_path.name), self.track_degradation(file_path):
+                source = self.read_blog_source(file_path)
+                return self.generate_blog_metadata(*source[:2]) if source else None
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        # 在主线程中先初始化缓存，避免多个线程同时创建
+        _ = self.response_cache
+
+        log(f"⚡ 并发生成 {len(files)} 个文件的元数据（并发数 {self.concurrency}）...")
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(worker, file_path): file_path for file_path in files}
+            for future, file_path in futures.items():
+                try:
+                    metadata = future.result()
+                except Exception as e:
+                    # 失败的文件在后续串行处理时重新生成
+                    log(f"⚠️  预生成 {file_path.name} 的元数据失败：{e}")
+                    continue
+                if metadata:
+                    results[file_path] = metadata
+        return results
+
+    def speculate(self, file_path: Path, source: Optional[Tuple[str, str, List[Part]]] = None
+                  ) -> Optional[MetadataSpeculation]:
+        """交互模式下为 blog 文件启动后台生成；没有配置模型时离线规则足够快，不需要预先生成
+
+        读取失败时返回 None，错误留给该文件自己的处理过程报告。
+        """
+        if self.model_client is None:
+            return None
+        stat = None
+        if source is None:
+            try:
+                # 先取 stat 再读取：读取期间或之后的修改都会使结果作废
+                stat = file_path.stat()
+                source = self.read_blog_source(file_path)
+            except (OSError, UnicodeDecodeError):
+                return None
+        if source is None:
+            return None
+        # 在主线程中先初始化缓存，避免后台线程同时创建
+        _ = self.response_cache
+        return MetadataSpeculation(self, self.speculation_executor, file_path, source,
+                                   (stat.st_size, stat.st_mtime_ns) if stat else None)
+
+    def process_blog_file(self, file_path: Path, interactive: bool = True,
+                          metadata: Optional[Tuple[str, List[str], str]] = None,
+                          stat: Optional[os.stat_result] = None,
+                          speculation: Optional[MetadataSpeculation] = None) -> Optional[Path]:
+        """处理 blog 文件，返回写入后的文件路径；无需处理时返回 None
+
+        metadata 为预先生成的 (英文文件名, tags, summary)，仅在自动模式下使用；
+        stat 为扫描目录时取得的 stat 结果，用于确定日期；
+        speculation 为交互模式下已经开始的后台生成，省略时在读取文件后立即开始；
+        生成后文件未被修改时沿用当时读取的内容，保证元数据与写入的正文一致。
+        """
+        log(f"\n📝 处理 blog 文件: {file_path.name}")
+
+        source = None
+        if speculation is not None:
+            if interactive and speculation.is_current():
+                source = speculation.source
+            else:
+                if interactive:
+                    log(f"🔄 {file_path.name} 在后台生成开始后被修改，重新读取")
+                speculation.cancel()
+                speculation = None
+        if source is None:
+            source = self.read_blog_source(file_path)
+        if source is None:
+            log(f"✅ 文件已有 front matter，跳过: {file_path.name}")
+            return None
+        title, body_content, body_parts = source
+        if interactive:
+            metadata = None
+            speculation = speculation or self.speculate(file_path, source)
+
+        log(f"📄 原标题: {title}")
+
+        # 生成英文文件名（交互模式下在后台生成，用户回答完提示后再取结果）
+        english_name = None
+        if speculation is None:
+            english_name = metadata[0] if metadata else self.translate_chinese_to_english(title)
+            log(f"🔤 英文文件名: {english_name}.md")
+
+        # tags 和 summary 由同一次请求生成，交互模式下只在需要时等待一次
+        generated = None
 
-        print(f"📄 原标题: {title}")
-        print(f"🔤 英文文件名: {new_file_name}")
+        def generated_tags_and_summary() -> Tuple[List[str], str]:
+            nonlocal generated
+            if generated is None:
+                generated = (speculation.result(speculation.tags_summary) if speculation
+                             else self.generate_tags_and_summary(body_content, title))
+            return generated
 
         # 获取文件创建时间
-        creation_time = self.get_file_creation_time(file_path)
+        creation_time = self.get_file_creation_time(file_path, stat)
         date_str = creation_time.strftime('%Y-%m-%d')
 
-        # 提取正文内容（去掉标题）
-        body_content = re.sub(r'^#\s+.+\n*', '', content, flags=re.MULTILINE).strip()
-
         # 生成或获取 tags 和 summary
         if interactive:
-            print(f"\n🎯 当前内容预览: {body_content[:100]}...")
+            log(f"\n🎯 当前内容预览: {body_content[:100]}...")
 
             # 询问是否手动输入 tags
             use_manual_tags = input("是否手动输入 tags？(y/n，默认n): ").strip().lower() == 'y'
@@ -272,8 +681,8 @@ class ContentManager:
                 tags_input = input("请输入 tags（用逗号分隔，最多3个）: ").strip()
                 tags = [tag.strip() for tag in tags_input.split(',') if tag.strip()][:3]
             else:
-                tags, _ = self.generate_tags_and_summary(body_content, title)
-                print(f"🤖 生成的 tags: {', '.join(tags)}")
+                tags, _ = generated_tags_and_summary()
+                log(f"🤖 生成的 tags: {', '.join(tags)}")
 
             # 询问是否手动输入 summary
             use_manual_summary = input("是否手动输入 summary？(y/n，默认n): ").strip().lower() == 'y'
@@ -281,9 +690,11 @@ class ContentManager:
                 summary = input("请输入 summary（不超过30字）: ").strip()
                 if len(summary) > 30:
                     summary = summary[:30]
+                if use_manual_tags and speculation:
+                    speculation.cancel(speculation.tags_summary)
             else:
-                _, summary = self.generate_tags_and_summary(body_content, title)
-                print(f"🤖 生成的 summary: {summary}")
+                _, summary = generated_tags_and_summary()
+                log(f"🤖 生成的 summary: {summary}")
 
             # 询问是否添加 weather 和 rating
             add_weather_rating = input("是否添加天气和心情评分？(y/n，默认n): ").strip().lower() == 'y'
@@ -305,17 +716,31 @@ class ContentManager:
 
         else:
             # 自动模式
-            tags, summary = self.generate_tags_and_summary(body_content, title)
-            print(f"🤖 生成的 tags: {', '.join(tags)}")
-            print(f"🤖 生成的 summary: {summary}")
+            if metadata:
+                _, tags, summary = metadata
+            else:
+                tags, summary = self.generate_tags_and_summary(body_content, title)
+            log(f"🤖 生成的 tags: {', '.join(tags)}")
+            log(f"🤖 生成的 summary: {summary}")
 
             # 自动生成 weather 和 rating
             weather = "晴"  # 默认天气
             rating = 3    # 默认心情
-            print(f"🤖 默认天气: {weather}")
-            print(f"🤖 默认心情评分: {rating}")
+            log(f"🤖 默认天气: {weather}")
+            log(f"🤖 默认心情评分: {rating}")
+
+        if english_name is None:
+            english_name = speculation.result(speculation.slug)
+            log(f"🔤 英文文件名: {english_name}.md")
+
+        # 构建新的 front matter 并写入
+        front_matter = self.render_blog_front_matter(title, date_str, summary, tags, weather, rating)
+        return self.write_blog_file(file_path, f"{english_name}.md", front_matter, body_parts)
 
-        # 构建新的 front matter
+    @staticmethod
+    def render_blog_front_matter(title: str, date_str: str, summary: str, tags: List[str],
+                                 weather: Optional[str], rating: Optional[int]) -> str:
+        """渲染 blog 的 front matter 文本"""
         front_matter_lines = [
             "---",
             f'title: "{title}"',
@@ -331,10 +756,11 @@ class ContentManager:
 
         # 过滤掉 None 的行
         front_matter_lines = [line for line in front_matter_lines if line is not None]
-        front_matter = "\n".join(front_matter_lines) + "\n"
+        return "\n".join(front_matter_lines) + "\n"
 
-        # 组合新内容
-        new_content = front_matter + body_content
+    def write_blog_file(self, file_path: Path, new_file_name: str, front_matter: str, body_parts: List[Part]) -> Path:
+        """原子写入处理后的 blog 内容（正文从源文件拷贝），必要时重命名，返回最终的文件路径"""
+        parts = [front_matter.encode('utf-8'), *body_parts]
 
         # 如果文件名需要更改，创建新文件
         if new_file_name != file_path.name:
@@ -342,116 +768,387 @@ class ContentManager:
 
             # 检查文件是否已存在
             if new_file_path.exists():
-                print(f"⚠️  文件 {new_file_name} 已存在，跳过重命名")
+                log(f"⚠️  文件 {new_file_name} 已存在，跳过重命名")
                 # 只在原文件更新内容
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(new_content)
-                print(f"✅ 已更新文件内容: {file_path.name}")
+                self.writer.write(file_path, parts)
+                log(f"✅ 已更新文件内容: {file_path.name}")
+                return file_path
             else:
-                # 创建新文件，删除旧文件
-                with open(new_file_path, 'w', encoding='utf-8') as f:
-                    f.write(new_content)
-                file_path.unlink()  # 删除原文件
-                print(f"✅ 已创建新文件: {new_file_name}")
+                # 创建新文件，新文件落盘后再删除旧文件
+                self.writer.write(new_file_path, parts, source=file_path, remove_source=True)
+                log(f"✅ 已创建新文件: {new_file_name}")
+                return new_file_path
         else:
             # 只更新内容
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-            print(f"✅ 已更新文件: {file_path.name}")
-
-        return True
-
-    def process_diary_file(self, file_path: Path) -> bool:
+            self.writer.write(file_path, parts)
+            log(f"✅ 已更新文件: {file_path.name}")
+            return file_path
+
+    def plan_blog_file(self, file_path: Path) -> Optional[Tuple[str, str, List[Part]]]:
+        """自动模式下生成 (新文件名, front matter, 正文写入片段) 但不写入，可在子进程中执行；
+        已有 front matter 时返回 None"""
+        source = self.read_blog_source(file_path)
+        if source is None:
+            return None
+        title, body_content, body_parts = source
+
+        english_name, tags, summary = self.generate_blog_metadata(title, body_content)
+        date_str = self.get_file_creation_time(file_path).strftime('%Y-%m-%d')
+        front_matter = self.render_blog_front_matter(title, date_str, summary, tags, "晴", 3)
+        return f"{english_name}.md", front_matter, body_parts
+
+    def process_diary_file(self, file_path: Path, stat: Optional[os.stat_result] = None) -> bool:
         """处理 diary 文件（保持原有逻辑）"""
-        print(f"\n📔 处理 diary 文件: {file_path.name}")
+        log(f"\n📔 处理 diary 文件: {file_path.name}")
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # 检查是否已有 front matter 及 date 字段（只读取文件头部）
+        fm = read_front_matter(file_path)
+        if fm.has_block and not fm.closed:
+            log(f"⚠️  front matter 格式不正确，跳过: {file_path.name}")
+            return False
+        if 'date' in fm:
+            log(f"✅ 文件已有 date 字段，跳过: {file_path.name}")
+            return False
 
         # 获取文件创建时间
-        creation_time = self.get_file_creation_time(file_path)
+        creation_time = self.get_file_creation_time(file_path, stat)
         date_str = creation_time.strftime('%Y-%m-%d %H:%M:%S')
 
-        # 检查是否已有 front matter
-        if content.startswith('---'):
-            # 找到 front matter 的结束位置
-            end_match = re.search(r'\n---+\n', content[3:])
-            if end_match:
-                # front matter 已存在，检查是否已有 date 字段
-                front_matter = content[3:end_match.start()]
-                if 'date:' in front_matter:
-                    print(f"✅ 文件已有 date 字段，跳过: {file_path.name}")
-                    return False
-
-                # 在 front matter 中插入 date 字段
-                new_content = content[:3] + f'\ndate: "{date_str}"' + content[3:end_match.start()] + content[end_match.start():]
-            else:
-                print(f"⚠️  front matter 格式不正确，跳过: {file_path.name}")
-                return False
-        else:
-            # 没有 front matter，创建新的
-            new_content = f"""---
-date: "{date_str}"
----
-
-{content}"""
-
-        # 写入文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        # 在 front matter 中插入 date 字段；没有 front matter 则创建新的（正文直接从原文件拷贝）
+        offset, data = field_insertion(fm, f'date: "{date_str}"')
+        self.writer.insert(file_path, offset, data)
 
-        print(f"✅ 已添加时间戳: {date_str}")
+        log(f"✅ 已添加时间戳: {date_str}")
         return True
 
-    def process_directory(self, content_type: str, interactive: bool = True):
-        """处理指定目录"""
+    def process_in_pool(self, content_type: str, files: List[Path], jobs: int) -> List[Tuple[Path, Optional[Path]]]:
+        """用进程池并行处理一批文件（仅自动模式），返回 (源文件, 写入后的路径或 None)
+
+        blog 文件在子进程中完成解析、生成文件名和 tags、渲染 front matter，
+        由父进程按文件顺序解决文件名冲突并写入；diary 文件直接在子进程中处理。
+        处理失败的文件不会出现在返回结果中。
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        log(f"⚙️  使用 {jobs} 个进程并行处理 {len(files)} 个文件...")
+        chunksize = max(1, len(files) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_pool_worker,
+                                 initargs=(self.use_cache, self._slug_mode, self._hedge, recorder.enabled)) as executor:
+            outcomes = list(executor.map(_run_pool_worker, [(content_type, f) for f in files], chunksize=chunksize))
+
+        results = []
+        # 目标文件名只需与同一目录下的文件不冲突
+        taken_names = {(item.path.parent, item.name)
+                       for parent in {file_path.parent for file_path in files}
+                       for item in scan_content(parent, recursive=False)}
+        for file_path, (ok, payload, degraded, profile) in zip(files, outcomes):
+            # 子进程中记录的时间片和计数并入本进程的记录器
+            recorder.merge(profile)
+            if degraded:
+                self.degraded_files.add(file_path)
+            if not ok:
+                log(f"❌ 处理文件 {file_path.name} 失败: {payload}")
+                continue
+            if content_type == 'diary':
+                if payload:
+                    self.writer.mark_dirty(file_path.parent)
+                results.append((file_path, file_path if payload else None))
+                continue
+            if payload is None:
+                results.append((file_path, None))
+                continue
+
+            # 按文件顺序解决文件名冲突：目标名已被占用时保留原文件名（与串行模式一致）
+            new_file_name, front_matter, body_parts = payload
+            if new_file_name != file_path.name and (file_path.parent, new_file_name) in taken_names:
+                log(f"⚠️  文件名冲突：{file_path.name} → {new_file_name}，保留原文件名")
+                new_file_name = file_path.name
+            try:
+                written_path = self.write_blog_file(file_path, new_file_name, front_matter, body_parts)
+            except Exception as e:
+                log(f"❌ 处理文件 {file_path.name} 失败: {e}")
+                continue
+            taken_names.discard((file_path.parent, file_path.name))
+            taken_names.add((written_path.parent, written_path.name))
+            results.append((file_path, written_path))
+        return results
+
+    def check_duplicates(self, content_type: str, scanned: List[ContentFile], pending_files: List[Path],
+                         skip: bool = False, jobs: int = 1) -> List[Path]:
+        """改写之前检查待处理的文件是否与已有内容近似重复，返回需要继续处理的文件
+
+        skip 为 True 时跳过重复的文件：与已处理过的文件重复，或与本次排在前面的文件重复。
+        """
+        from duplicates import DuplicateIndex
+
+        index = DuplicateIndex(self.project_root)
+        try:
+            index.update(content_type, scanned, jobs=jobs)
+            pending_keys = {index.key(content_type, file_path) for file_path in pending_files}
+            kept_keys = set()
+            kept = []
+            for file_path in pending_files:
+                key = index.key(content_type, file_path)
+                matches = index.duplicates_of(key)
+                if matches:
+                    other, score = matches[0]
+                    log(f"⚠️  疑似重复：{key} ≈ {other}（相似度 {score:.0%}）",
+                        path=key, duplicate=other, similarity=score)
+                    if skip and any(other not in pending_keys or other in kept_keys for other, _ in matches):
+                        log(f"⏭️  跳过疑似重复的文件: {file_path.name}")
+                        continue
+                kept_keys.add(key)
+                kept.append(file_path)
+        finally:
+            index.close()
+        return kept
+
+    def process_directory(self, content_type: str, interactive: bool = True, force: bool = False, jobs: int = 1,
+                          duplicates: str = 'report'):
+        """处理指定目录（借助清单跳过上次运行后未变化的文件）
+
+        duplicates：report 报告与已有内容近似重复的待处理文件，skip 同时跳过这些文件，off 不检查。
+        """
         content_dir = self.project_root / 'src' / 'content' / content_type
 
         if not content_dir.exists():
-            print(f"❌ 错误：找不到 {content_type} 目录 {content_dir}")
+            log(f"❌ 错误：找不到 {content_type} 目录 {content_dir}")
             return
 
-        print(f"\n📁 开始处理 {content_type} 目录...")
+        log(f"\n📁 开始处理 {content_type} 目录...")
 
+        manifest = ContentManifest.load()
         updated_files = []
-
-        # 扫描所有 markdown 文件
-        for file_path in content_dir.iterdir():
-            if file_path.suffix.lower() in ['.md', '.markdown']:
-                try:
+        skipped_count = 0
+
+        # 递归扫描所有 markdown 文件（先取快照，避免重命名产生的新文件被重复遍历），
+        # 扫描时取得的 stat 结果用于清单判断和确定日期，不再逐个 stat
+        pending_files = []
+        stats = {}
+        with recorder.span('scan', files=0) as span:
+            scanned = scan_content(content_dir)
+            for item in scanned:
+                if not force and manifest.is_unchanged(item.path, item.stat):
+                    skipped_count += 1
+                    continue
+                pending_files.append(item.path)
+                stats[item.path] = item.stat
+            if recorder.enabled:
+                span.args.update(files=len(pending_files), skipped=skipped_count)
+
+        if duplicates != 'off' and pending_files:
+            with recorder.span('duplicates', files=len(pending_files)):
+                pending_files = self.check_duplicates(content_type, scanned, pending_files,
+                                                      skip=duplicates == 'skip', jobs=jobs)
+
+        if jobs > 1 and not interactive and len(pending_files) > 1:
+            # 多进程模式：结果在父进程中汇总
+            for file_path, written_path in self.process_in_pool(content_type, pending_files, jobs):
+                if written_path:
+                    updated_files.append(written_path.name)
+                manifest.record(written_path or file_path, file_path)
+            pending_files = []
+
+        # 自动模式下先并发生成所有 blog 的元数据，再按文件顺序依次写入，保证结果确定
+        prefetched = {}
+        if (content_type == 'blog' and not interactive and self.concurrency > 1
+                and self.model_client is not None and len(pending_files) > 1):
+            with recorder.span('prefetch', files=len(pending_files)):
+                prefetched = self.prefetch_blog_metadata(pending_files)
+
+        # 交互模式下用户回答当前文件的提示时，后台已经在为下一个文件生成元数据
+        speculations = {}
+        speculate_ahead = content_type == 'blog' and interactive
+
+        for position, file_path in enumerate(pending_files):
+            if speculate_ahead:
+                for upcoming in pending_files[position:position + 2]:
+                    if upcoming not in speculations:
+                        speculations[upcoming] = self.speculate(upcoming)
+            try:
+                with recorder.span('file', 'file', path=file_path.name, type=content_type), \
+                        self.track_degradation(file_path):
                     if content_type == 'blog':
-                        if self.process_blog_file(file_path, interactive):
-                            updated_files.append(file_path.name)
+                        written_path = self.process_blog_file(file_path, interactive, prefetched.get(file_path),
+                                                              stats.get(file_path), speculations.pop(file_path, None))
+                        if written_path:
+                            updated_files.append(written_path.name)
+                        manifest.record(written_path or file_path, file_path)
                     elif content_type == 'diary':
-                        if self.process_diary_file(file_path):
+                        if self.process_diary_file(file_path, stats.get(file_path)):
                             updated_files.append(file_path.name)
-                except Exception as e:
-                    print(f"❌ 处理文件 {file_path.name} 失败: {e}")
+                        manifest.record(file_path)
+            except Exception as e:
+                log(f"❌ 处理文件 {file_path.name} 失败: {e}", path=file_path.name, error=str(e))
+
+        for speculation in speculations.values():
+            if speculation is not None:
+                speculation.cancel()
+
+        with recorder.span('fsync_dirs'):
+            self.writer.flush()
+        with recorder.span('manifest_save'):
+            manifest.evict_missing(content_dir)
+            manifest.save()
+        if updated_files:
+            from catalog import refresh as refresh_catalog
+
+            refreshes = [('site_index', '站点索引', refresh_site_index, ()),
+                         ('catalog', '内容目录', refresh_catalog, (self.project_root,))]
+            if content_type == 'blog':
+                from related_posts import refresh as refresh_related_posts
+                from search_index import refresh as refresh_search_index
+
+                refreshes += [('related_posts', '相关文章', refresh_related_posts, (self.project_root,)),
+                              ('search_index', '搜索索引', refresh_search_index, (self.project_root,))]
+            for name, label, refresh, refresh_args in refreshes:
+                with recorder.span(name):
+                    try:
+                        refresh(*refresh_args)
+                    except Exception as e:
+                        # 文件已经写入，派生数据留到下次运行或 CI 中重新生成
+                        log(f"⚠️  更新{label}失败（文件已写入，下次运行时重新生成）：{e}", error=str(e))
+
+        if skipped_count:
+            log(f"⏭️  {skipped_count} 个文件自上次运行后未变化，已跳过")
 
         # 输出结果
         if updated_files:
-            print(f"\n✅ 成功处理了 {len(updated_files)} 个 {content_type} 文件：")
+            log(f"\n✅ 成功处理了 {len(updated_files)} 个 {content_type} 文件：")
             for file_name in updated_files:
-                print(f"  📝 {file_name}")
+                log(f"  📝 {file_name}")
         else:
-            print(f"✅ 没有需要处理的 {content_type} 文件")
+            log(f"✅ 没有需要处理的 {content_type} 文件")
+
+        # 只在本次运行实际用到模型缓存时输出统计，不为此触发模型配置的加载
+        response_cache = self.__dict__.get('response_cache')
+        if response_cache is not None and (response_cache.hits or response_cache.misses):
+            stats = response_cache.stats()
+            log(f"🗄️  模型缓存命中 {stats['hits']} 次，未命中 {stats['misses']} 次（命中率 {stats['hit_rate']:.0%}）")
+
+        model_client = self.__dict__.get('model_client')
+        if isinstance(model_client, ModelRouter):
+            self.log_routing(model_client)
+        self.log_degradation()
+
+    def log_degradation(self) -> None:
+        """输出因模型不可用改用离线规则的文件数和熔断次数"""
+        if not self.degraded_files:
+            return
+        calls = self.degraded_calls
+        log(f"🔌 {len(self.degraded_files)} 个文件因模型不可用改用离线规则生成"
+            f"（文件名 {calls['slug']} 次，tags/summary {calls['tags_summary']} 次）",
+            degraded_files=len(self.degraded_files))
+        model_client = self.__dict__.get('model_client')
+        for client in getattr(model_client, 'clients', [model_client]):
+            breaker = getattr(client, 'breaker', None)
+            if breaker is not None and breaker.trips:
+                log(f"  ⚡ {breaker.name} 熔断 {breaker.trips} 次，期间跳过 {breaker.rejected} 次请求")
+
+    @staticmethod
+    def log_routing(router: ModelRouter) -> None:
+        """输出各模型的请求数、失败数和延迟分位数"""
+        rows = [row for row in router.summary() if row['requests']]
+        if not rows:
+            return
+        log("🛰️  模型路由：")
+        for row in rows:
+            latency = (f"p50 {row['p50'] * 1000:.0f}ms / p90 {row['p90'] * 1000:.0f}ms"
+                       if row['p50'] is not None else '无成功请求')
+            log(f"  {row['model']}: {row['requests']} 次请求，失败 {row['errors']} 次，{latency}")
+        if router.hedged:
+            log(f"  对冲请求 {router.hedged} 次，其中 {router.hedge_wins} 次由第二个模型先返回")
+
+
+# 进程池子进程中使用的 ContentManager（每个进程初始化一次）
+_pool_manager: Optional[ContentManager] = None
+
+
+def _init_pool_worker(use_cache: bool, slug_mode: Optional[str], hedge: Optional[bool], profile: bool = False) -> None:
+    global _pool_manager
+    if profile:
+        recorder.enable()
+    _pool_manager = ContentManager(use_cache=use_cache, slug_mode=slug_mode, hedge=hedge)
+
+
+def _run_pool_worker(task: Tuple[str, Path]) -> Tuple[bool, object, bool, Optional[dict]]:
+    """子进程任务：blog 返回写入计划，diary 直接处理；异常以 (False, 错误信息) 返回。
+    第三项表示是否因模型不可用改用了离线规则（熔断器在每个子进程中各自计数），
+    第四项是 --profile 时本任务记录的埋点数据，由父进程合并"""
+    content_type, file_path = task
+    try:
+        with recorder.span('file', 'file', path=file_path.name, type=content_type):
+            if content_type == 'blog':
+                with _pool_manager.track_degradation(file_path):
+                    outcome = True, _pool_manager.plan_blog_file(file_path)
+            else:
+                outcome = True, _pool_manager.process_diary_file(file_path)
+    except Exception as e:
+        outcome = False, str(e)
+    return (*outcome, content_type == 'blog' and file_path in _pool_manager.degraded_files, recorder.drain())
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """主函数"""
     parser = argparse.ArgumentParser(description='Astro 内容管理脚本')
-    parser.add_argument('--type', choices=['blog', 'diary'], required=True,
-                       help='选择要处理的内容类型：blog 或 diary')
+    parser.add_argument('--type', choices=['blog', 'diary'],
+                       help='选择要处理的内容类型：blog 或 diary（--watch 时省略表示两者都监视）')
     parser.add_argument('--auto', action='store_true',
                        help='自动模式（不询问用户输入，全部自动生成）')
-
-    args = parser.parse_args()
-
-    manager = ContentManager()
-
-    print(f"🚀 开始处理 {args.type} 内容...")
-    manager.process_directory(args.type, interactive=not args.auto)
-    print(f"\n🎉 {args.type} 内容处理完成！")
+    parser.add_argument('--force', action='store_true',
+                       help='忽略处理清单，重新检查所有文件')
+    parser.add_argument('--concurrency', type=int, default=4,
+                       help='自动模式下并发调用模型的最大数量（默认 4，设为 1 则串行）')
+    parser.add_argument('--rate-limit', type=float, default=None,
+                       help='每秒最多发出的模型请求数（默认不限）')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='不使用模型响应缓存，总是重新请求模型')
+    parser.add_argument('--jobs', type=int, default=1,
+                       help='自动模式下并行处理文件的进程数（默认 1）')
+    parser.add_argument('--slug', choices=['translate', 'pinyin'], default=None,
+                       help='blog 文件名的生成方式：translate 调用模型翻译，pinyin 离线转拼音（默认读取 models.yaml 的 slug 字段）')
+    parser.add_argument('--hedge', action=argparse.BooleanOptionalAction, default=None,
+                       help='配置了多个模型时，请求变慢后向第二快的模型再发一次，取先返回的结果（默认读取 models.yaml 的 routing.hedge）')
+    parser.add_argument('--duplicates', choices=['report', 'skip', 'off'], default='report',
+                       help='处理前检查与已有内容近似重复的文件：report 只报告（默认），skip 报告并跳过，off 不检查')
+    parser.add_argument('--profile', nargs='?', const=str(DEFAULT_TRACE_PATH), default=None, metavar='TRACE',
+                       help=f"记录各阶段耗时并写出 Chrome trace（默认 {DEFAULT_TRACE_PATH.relative_to(DEFAULT_TRACE_PATH.parents[1])}），结束时输出汇总表")
+    parser.add_argument('--watch', action='store_true',
+                       help='持续监视内容目录，文件保存后自动处理（blog 按自动模式处理）')
+    parser.add_argument('--debounce', type=float, default=0.5,
+                       help='监视模式下文件最后一次变化后等待的秒数（默认 0.5）')
+    parser.add_argument('--poll-interval', type=float, default=1.0,
+                       help='inotify 不可用时轮询目录的间隔秒数（默认 1）')
+
+    args = parser.parse_args(argv)
+    if args.type is None and not args.watch:
+        parser.error('需要指定 --type（或使用 --watch）')
+    if args.profile:
+        recorder.enable()
+
+    manager = ContentManager(concurrency=args.concurrency, rate_limit=args.rate_limit,
+                             use_cache=not args.no_cache, slug_mode=args.slug, hedge=args.hedge)
+
+    if args.watch:
+        from content_watcher import ContentWatcher
+
+        content_types = [args.type] if args.type else ['blog', 'diary']
+        # 先补上监视开始前积累的变化，之后只处理被改动的文件
+        for content_type in content_types:
+            manager.process_directory(content_type, interactive=False, force=args.force, jobs=args.jobs,
+                                      duplicates=args.duplicates)
+        ContentWatcher(manager, content_types, debounce=args.debounce, poll_interval=args.poll_interval).run()
+    else:
+        log(f"🚀 开始处理 {args.type} 内容...")
+        with recorder.span('process_directory', type=args.type):
+            manager.process_directory(args.type, interactive=not args.auto, force=args.force, jobs=args.jobs,
+                                      duplicates=args.duplicates)
+        log(f"\n🎉 {args.type} 内容处理完成！")
+
+    if args.profile:
+        print(recorder.format_summary())
+        trace_path = recorder.write_trace(Path(args.profile))
+        print(f"\n🧭 trace 已写入 {trace_path}（可在 chrome://tracing 或 ui.perfetto.dev 中打开）")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""内容处理清单：记录每个文件的 size / mtime / hash，跳过未变化的文件。
+
+清单保存在项目根目录的 `.cache/content-manifest.json`，以相对路径为键。
+一次 stat 命中 size + mtime 即视为未变化；mtime 变了但 size 相同时再比对
+内容 hash（例如 `touch` 或 git checkout 之后），避免无谓的重新解析。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+MANIFEST_PATH = PROJECT_ROOT / '.cache' / 'content-manifest.json'
+MANIFEST_VERSION = 1
+
+
+def hash_file(path: Path, chunk_size: int = 1 << 16) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentManifest:
+    def __init__(self, path: Path = MANIFEST_PATH, root: Path = PROJECT_ROOT):
+        self.path = path
+        self.root = Path(os.path.abspath(root))
+        self.entries: dict[str, dict] = {}
+        self._seen: set[str] = set()
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: Path = MANIFEST_PATH, root: Path = PROJECT_ROOT) -> 'ContentManifest':
+        manifest = cls(path, root)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+        if data.get('version') == MANIFEST_VERSION:
+            manifest.entries = data.get('files', {})
+        return manifest
+
+    def key(self, path: Path) -> str:
+        path = Path(os.path.abspath(path))
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def is_unchanged(self, path: Path, stat: os.stat_result | None = None) -> bool:
+        """文件自上次记录后未变化则返回 True（通常只需一次 stat）。"""
+        key = self.key(path)
+        self._seen.add(key)
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+
+        stat = stat or os.stat(path)
+        if entry['size'] != stat.st_size:
+            return False
+        if entry['mtime_ns'] == stat.st_mtime_ns:
+            return True
+
+        if hash_file(path) != entry['hash']:
+            return False
+        entry['mtime_ns'] = stat.st_mtime_ns
+        self._dirty = True
+        return True
+
+    def record(self, path: Path, source: Path | None = None) -> None:
+        """记录文件当前状态（处理完成或确认无需处理之后调用）。
+
+        source 为改写前的路径：文件被重命名时同时删除旧条目，清单在本次运行结束时就与目录一致。
+        """
+        key = self.key(path)
+        if source is not None:
+            source_key = self.key(source)
+            if source_key != key:
+                self.entries.pop(source_key, None)
+                self._seen.discard(source_key)
+        stat = os.stat(path)
+        self.entries[key] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'hash': hash_file(path),
+        }
+        self._seen.add(key)
+        self._dirty = True
+
+    def forget(self, path: Path) -> None:
+        if self.entries.pop(self.key(path), None) is not None:
+            self._dirty = True
+
+    def move(self, source: Path, target: Path) -> None:
+        """文件被移动（内容不变）后沿用原条目，避免下次运行重新处理"""
+        entry = self.entries.pop(self.key(source), None)
+        if entry is None:
+            return
+        key = self.key(target)
+        self.entries[key] = entry
+        self._seen.add(key)
+        self._dirty = True
+
+    def evict_missing(self, directory: Path) -> int:
+        """清除 directory 下本次未扫描到且已不存在的条目（删除或重命名的文件）。"""
+        prefix = self.key(directory).rstrip('/') + '/'
+        stale = [
+            key for key in self.entries
+            if key.startswith(prefix) and key not in self._seen and not (self.root / key).exists()
+        ]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self._dirty = True
+        return len(stale)
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'files': self.entries}, f, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""基于 os.scandir 的内容目录扫描，支持子目录以及按 年/月 分片的 diary 目录。
+
+- 一次遍历拿到文件路径和 stat 结果（DirEntry 会缓存 stat），后续判断清单、
+  取创建时间都复用同一个 stat，不再对每个文件单独调用 os.stat
+- 递归进入子目录，跳过以 . 开头的文件和目录（原子写入的临时文件、编辑器交换文件）
+- 分片布局：`src/content/diary/2025/11/xxx.md`，目录中存在 4 位数字的年份目录即视为已分片
+
+迁移现有目录：
+python3 scripts/content_scanner.py                 # 把平铺的 diary 按 年/月 分片（按 front matter 的 date，没有则按首次提交时间）
+python3 scripts/content_scanner.py --dry-run       # 只显示将要移动的文件
+python3 scripts/content_scanner.py --layout flat   # 还原为平铺目录
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CONTENT_ROOT = PROJECT_ROOT / 'src' / 'content'
+CONTENT_SUFFIXES = ('.md', '.markdown')
+YEAR_DIR_RE = re.compile(r'^\d{4}$')
+DATE_RE = re.compile(r'^(\d{4})[-./](\d{1,2})')
+
+
+class ContentFile(NamedTuple):
+    path: Path
+    stat: os.stat_result
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+
+def iter_content_files(directory: Path, recursive: bool = True) -> Iterator[ContentFile]:
+    """遍历目录下的 markdown 文件，顺序不固定"""
+    stack = [os.fspath(directory)]
+    while stack:
+        try:
+            iterator = os.scandir(stack.pop())
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with iterator:
+            for entry in iterator:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append(entry.path)
+                    continue
+                if not entry.name.lower().endswith(CONTENT_SUFFIXES):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield ContentFile(Path(entry.path), stat)
+
+
+def scan_content(directory: Path, recursive: bool = True) -> list[ContentFile]:
+    """按路径排序的文件列表（先取快照，处理过程中新建或重命名的文件不会被重复遍历）"""
+    # 按字符串排序，比较 Path 对象要慢一个数量级
+    return sorted(iter_content_files(directory, recursive), key=lambda item: str(item.path))
+
+
+def list_subdirectories(directory: Path) -> list[Path]:
+    """directory 及其下所有（非隐藏）子目录，供监视器逐个添加 inotify watch"""
+    result = []
+    stack = [Path(directory)]
+    while stack:
+        current = stack.pop()
+        result.append(current)
+        try:
+            with os.scandir(current) as iterator:
+                stack.extend(Path(entry.path) for entry in iterator
+                             if entry.is_dir(follow_symlinks=False) and not entry.name.startswith('.'))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+    return result
+
+
+def creation_time(stat: os.stat_result) -> datetime:
+    """优先使用创建时间，没有则使用 ctime"""
+    return datetime.fromtimestamp(getattr(stat, 'st_birthtime', stat.st_ctime))
+
+
+def is_sharded(directory: Path) -> bool:
+    try:
+        with os.scandir(directory) as iterator:
+            return any(entry.is_dir() and YEAR_DIR_RE.match(entry.name) for entry in iterator)
+    except FileNotFoundError:
+        return False
+
+
+def shard_directory(directory: Path, date: datetime) -> Path:
+    return Path(directory) / f"{date:%Y}" / f"{date:%m}"
+
+
+def entry_directory(directory: Path, date: datetime) -> Path:
+    """新文件应写入的目录：已分片时写入对应的 年/月 目录，否则写入 directory 本身"""
+    return shard_directory(directory, date) if is_sharded(directory) else Path(directory)
+
+
+def content_date(item: ContentFile) -> datetime:
+    """front matter 中的 date（只取年月），没有或无法解析时使用文件首次提交或创建的时间"""
+    from front_matter import read_front_matter
+    from git_dates import file_creation_time
+
+    try:
+        value = read_front_matter(item.path).get('date')
+    except (OSError, UnicodeDecodeError):
+        value = None
+    match = DATE_RE.match(str(value).strip()) if value else None
+    if match and 1 <= int(match.group(2)) <= 12:
+        return datetime(int(match.group(1)), int(match.group(2)), 1)
+    return file_creation_time(item.path, item.stat)
+
+
+def plan_reshard(directory: Path, layout: str = 'month') -> list[tuple[Path, Path]]:
+    """返回需要移动的 (原路径, 新路径)；已在正确位置的文件不移动"""
+    moves = []
+    targets: set[Path] = set()
+    for item in scan_content(directory):
+        if layout == 'flat':
+            target = Path(directory) / item.name
+        else:
+            target = shard_directory(directory, content_date(item)) / item.name
+        if target == item.path:
+            continue
+        # 目标位置已有同名文件时在文件名后追加序号
+        stem, suffix = os.path.splitext(item.name)
+        counter = 1
+        while target in targets or target.exists():
+            target = target.with_name(f"{stem}-{counter}{suffix}")
+            counter += 1
+        targets.add(target)
+        moves.append((item.path, target))
+    return moves
+
+
+def remove_empty_directories(directory: Path) -> None:
+    for current in sorted(list_subdirectories(directory), key=lambda path: len(path.parts), reverse=True):
+        if current != Path(directory):
+            try:
+                current.rmdir()
+            except OSError:
+                pass
+
+
+def reshard(directory: Path, layout: str = 'month', dry_run: bool = False) -> list[tuple[Path, Path]]:
+    """按 layout 重新组织目录，同步更新处理清单中的路径"""
+    from content_manifest import ContentManifest
+
+    moves = plan_reshard(directory, layout)
+    if dry_run or not moves:
+        return moves
+
+    manifest = ContentManifest.load()
+    for source, target in moves:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.rename(source, target)
+        manifest.move(source, target)
+    if layout == 'flat':
+        remove_empty_directories(directory)
+    manifest.save()
+    return moves
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='把内容目录按 年/月 分片，或还原为平铺目录')
+    parser.add_argument('--type', choices=['diary', 'blog'], default='diary', help='内容类型（默认 diary）')
+    parser.add_argument('--layout', choices=['month', 'flat'], default='month',
+                        help='month：按 年/月 分片（默认）；flat：全部移回顶层目录')
+    parser.add_argument('--dry-run', action='store_true', help='只显示将要移动的文件')
+    args = parser.parse_args(argv)
+
+    directory = CONTENT_ROOT / args.type
+    if not directory.is_dir():
+        print(f"❌ 错误：找不到 {args.type} 目录 {directory}")
+        return
+
+    moves = reshard(directory, args.layout, args.dry_run)
+    if not moves:
+        print("✅ 所有文件都已在正确的位置，无需移动")
+        return
+    for source, target in moves:
+        print(f"  📦 {source.relative_to(directory)} → {target.relative_to(directory)}")
+    if args.dry_run:
+        print(f"\n🔍 共 {len(moves)} 个文件需要移动（--dry-run，未做任何修改）")
+    else:
+        print(f"\n✅ 已移动 {len(moves)} 个文件")
+
+
+if __name__ == '__main__':
+    main()
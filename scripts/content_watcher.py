@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""监视 src/content/blog 和 src/content/diary，文件保存后立即处理对应文件。
+
+- Linux 上通过 inotify（ctypes 调用 libc）等待事件，空闲时阻塞在 select 上不占用 CPU；
+  其他平台或 inotify 不可用时退回定时轮询目录的 size/mtime
+- 包括子目录（如按 年/月 分片的 diary），运行中新建的子目录会自动加入监视
+- 编辑器保存时常会连续触发多个事件，同一文件在安静 debounce 秒后才处理一次
+- 脚本自己写入的文件会记录进清单，之后收到的事件因内容未变而被忽略；
+  原子写入产生的隐藏临时文件直接忽略
+
+使用方法：
+python3 scripts/content_manager.py --watch               # 同时监视 blog 和 diary
+python3 scripts/content_manager.py --watch --type diary  # 只监视 diary
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from content_manifest import ContentManifest
+from content_scanner import iter_content_files, list_subdirectories
+from instrumentation import log
+from site_index import refresh as refresh_site_index
+
+if TYPE_CHECKING:
+    from content_manager import ContentManager
+
+CONTENT_SUFFIXES = ('.md', '.markdown')
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_POLL_INTERVAL = 1.0
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def is_content_file(name: str) -> bool:
+    # 以 . 开头的是原子写入的临时文件或编辑器的交换文件
+    return not name.startswith('.') and name.lower().endswith(CONTENT_SUFFIXES)
+
+
+class InotifyWatcher:
+    """基于 inotify 的目录监视（含子目录），wait() 返回有变化的文件路径"""
+
+    def __init__(self, directories: Iterable[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 失败')
+        self.directories: dict[int, Path] = {}
+        try:
+            for directory in directories:
+                for subdirectory in list_subdirectories(directory):
+                    self.add_watch(subdirectory)
+        except BaseException:
+            os.close(self.fd)
+            raise
+
+    def add_watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f'无法监视 {directory}')
+        self.directories[wd] = Path(directory)
+
+    def wait(self, timeout: Optional[float]) -> list[Path]:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        paths = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            directory = self.directories.get(wd)
+            if directory is None or name.startswith('.'):
+                continue
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    paths.extend(self.watch_new_directory(directory / name))
+            elif is_content_file(name):
+                paths.append(directory / name)
+        return paths
+
+    def watch_new_directory(self, directory: Path) -> list[Path]:
+        """监视新建（或移入）的子目录，返回其中已有的文件（添加监视之前写入的文件不会再产生事件）"""
+        try:
+            for subdirectory in list_subdirectories(directory):
+                self.add_watch(subdirectory)
+        except OSError:
+            return []
+        return [item.path for item in iter_content_files(directory)]
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """定时比较目录中各文件的 size/mtime，作为没有 inotify 时的后备方案"""
+
+    def __init__(self, directories: Iterable[Path], interval: float = DEFAULT_POLL_INTERVAL):
+        self.directories = [Path(directory) for directory in directories]
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for directory in self.directories:
+            for item in iter_content_files(directory):
+                snapshot[item.path] = (item.stat.st_size, item.stat.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout: Optional[float]) -> list[Path]:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        snapshot = self.scan()
+        changed = [path for path, state in snapshot.items() if self.snapshot.get(path) != state]
+        changed.extend(path for path in self.snapshot if path not in snapshot)
+        self.snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def create_watcher(directories: list[Path], poll_interval: float = DEFAULT_POLL_INTERVAL):
+    try:
+        return InotifyWatcher(directories)
+    except (OSError, AttributeError) as e:
+        log(f"⚠️  inotify 不可用（{e}），改为每 {poll_interval:g} 秒轮询一次", error=str(e))
+        return PollingWatcher(directories, poll_interval)
+
+
+class ContentWatcher:
+    def __init__(self, manager: 'ContentManager', content_types: Iterable[str],
+                 debounce: float = DEFAULT_DEBOUNCE, poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.manager = manager
+        content_root = manager.project_root / 'src' / 'content'
+        self.directories = {content_root / content_type: content_type for content_type in content_types}
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.manifest = ContentManifest.load()
+        self.pending: dict[Path, float] = {}
+
+    def run(self) -> None:
+        directories = [directory for directory in self.directories if directory.is_dir()]
+        if not directories:
+            log("❌ 错误：没有可监视的目录")
+            return
+
+        watcher = create_watcher(directories, self.poll_interval)
+        names = '、'.join(self.directories[directory] for directory in directories)
+        log(f"👀 正在监视 {names}（{type(watcher).__name__}），按 Ctrl+C 退出")
+        try:
+            while True:
+                timeout = None
+                if self.pending:
+                    timeout = max(0.0, min(self.pending.values()) - time.monotonic())
+                for path in watcher.wait(timeout):
+                    # 每次事件都推迟处理时间，连续保存只处理最后一次
+                    self.pending[path] = time.monotonic() + self.debounce
+
+                now = time.monotonic()
+                due = [path for path, deadline in self.pending.items() if deadline <= now]
+                if due:
+                    for path in due:
+                        del self.pending[path]
+                    self.process(due)
+        except KeyboardInterrupt:
+            log("\n👋 已停止监视")
+        finally:
+            watcher.close()
+            self.manifest.save()
+
+    def content_type(self, path: Path) -> Optional[str]:
+        """文件所属的内容类型（文件可能位于内容目录的子目录中）"""
+        for parent in path.parents:
+            if parent in self.directories:
+                return self.directories[parent]
+        return None
+
+    def process(self, paths: list[Path]) -> None:
+        changed = set()
+        for path in sorted(paths):
+            if not path.exists():
+                self.manifest.forget(path)
+                changed.add(self.content_type(path))
+                continue
+            # 脚本自己写入的文件已记录在清单中，内容未变时不再处理
+            if self.manifest.is_unchanged(path):
+                continue
+
+            content_type = self.content_type(path)
+            if content_type is None:
+                continue
+            changed.add(content_type)
+            try:
+                if content_type == 'blog':
+                    with self.manager.track_degradation(path):
+                        written_path = self.manager.process_blog_file(path, interactive=False)
+                    self.manifest.record(written_path or path, path)
+                else:
+                    self.manager.process_diary_file(path)
+                    self.manifest.record(path)
+            except Exception as e:
+                log(f"❌ 处理文件 {path.name} 失败: {e}", path=path.name, error=str(e))
+
+        self.manager.writer.flush()
+        self.manifest.save()
+        if changed:
+            from catalog import refresh as refresh_catalog
+
+            refresh_site_index(self.manager.project_root)
+            refresh_catalog(self.manager.project_root)
+        if 'blog' in changed:
+            from related_posts import refresh as refresh_related_posts
+            from search_index import refresh as refresh_search_index
+
+            refresh_related_posts(self.manager.project_root)
+            refresh_search_index(self.manager.project_root)
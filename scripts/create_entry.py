@@ -1,13 +1,25 @@
 #!/usr/bin/env python3
-"""快速为 blog/diary 创建带 frontmatter 的内容文件。"""
+"""快速为 blog/diary 创建带 frontmatter 的内容文件。
+
+也可以从 JSONL 或 CSV 批量导入（例如从其他应用迁移多年的日记），每条记录生成一个文件：
+python3 scripts/create_entry.py --type diary --import entries.jsonl
+python3 scripts/create_entry.py --type blog --import posts.csv --tags 迁移 --batch-size 2000
+"""
 
 from __future__ import annotations
 
 import argparse
+import csv
+import io
 import json
+import os
 import re
+import sys
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from content_scanner import entry_directory, is_sharded, shard_directory
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 BLOG_DIR = PROJECT_ROOT / 'src' / 'content' / 'blog'
@@ -15,8 +27,14 @@ DIARY_DIR = PROJECT_ROOT / 'src' / 'content' / 'diary'
 
 
 def slugify(value: str, fallback_prefix: str) -> str:
-    base = re.sub(r'[^a-z0-9]+', '-', value.strip().lower())
-    base = re.sub(r'-{2,}', '-', base).strip('-')
+    # 含汉字的标题离线转换成拼音，拼音表只在这时才加载
+    if re.search(r'[\u3400-\u9fff]', value):
+        from pinyin import slugify as pinyin_slugify
+
+        base = pinyin_slugify(value)
+    else:
+        base = re.sub(r'[^a-z0-9]+', '-', value.strip().lower())
+        base = re.sub(r'-{2,}', '-', base).strip('-')
     return base or f"{fallback_prefix}-{datetime.now():%Y%m%d%H%M%S}"
 
 
@@ -47,6 +65,45 @@ def ensure_extension(name: str, *, default: str) -> str:
     return name if name.endswith(default) else f"{name}{default}"
 
 
+def render_blog_entry(title: str, date: datetime, summary: str, tags: list[str], weather: str, mood: str,
+                      rating: int, draft: bool, body: str = '在这里写正文…') -> str:
+    lines = [
+        '---',
+        f"title: {to_json_scalar(title)}",
+        f"date: {date:%Y-%m-%d}",
+        f"summary: {to_json_scalar(summary)}",
+        f"tags: {json.dumps(tags, ensure_ascii=False)}",
+        f"weather: {to_json_scalar(weather)}",
+        f"mood: {to_json_scalar(mood)}",
+        f"rating: {rating}",
+        f"draft: {'true' if draft else 'false'}",
+        '---',
+        '',
+        body,
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+def render_diary_entry(date: datetime, title: str, mood: str, rating: int, weather: str, tags: list[str],
+                       body: str = '随手记一记…') -> str:
+    lines = [
+        '---',
+        f"date: {to_json_scalar(date.strftime('%Y-%m-%d %H:%M:%S'))}",
+    ]
+    if title:
+        lines.append(f"title: {to_json_scalar(title)}")
+    lines.extend([
+        f"mood: {to_json_scalar(mood)}",
+        f"rating: {rating}",
+        f"weather: {to_json_scalar(weather)}",
+    ])
+    if tags:
+        # 日记页面只识别行内列表，与 blog 的写法保持一致
+        lines.append(f"tags: {json.dumps(tags, ensure_ascii=False)}")
+    lines.extend(['---', '', body])
+    return '\n'.join(lines) + '\n'
+
+
 def write_blog_entry(args: argparse.Namespace) -> Path:
     title = prompt('文章标题', preset=args.title)
     summary = prompt('摘要 (<=30 字)', default=title[:30], preset=args.summary)
@@ -69,21 +126,8 @@ def write_blog_entry(args: argparse.Namespace) -> Path:
 
     BLOG_DIR.mkdir(parents=True, exist_ok=True)
 
-    lines = [
-        '---',
-        f"title: {to_json_scalar(title)}",
-        f"date: {datetime.now():%Y-%m-%d}",
-        f"summary: {to_json_scalar(summary)}",
-        f"tags: {json.dumps(tags, ensure_ascii=False)}",
-        f"weather: {to_json_scalar(weather)}",
-        f"mood: {to_json_scalar(mood)}",
-        f"rating: {rating}",
-        f"draft: {'true' if args.draft else 'false'}",
-        '---',
-        '',
-        '在这里写正文…',
-    ]
-    target.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    text = render_blog_entry(title, datetime.now(), summary, tags, weather, mood, rating, args.draft)
+    target.write_text(text, encoding='utf-8')
     return target
 
 
@@ -103,32 +147,216 @@ def write_diary_entry(args: argparse.Namespace) -> Path:
 
     filename_seed = args.filename or (title.strip() if title else f"diary-{now:%Y%m%d-%H%M%S}")
     filename = ensure_extension(filename_seed, default='.md')
-    target = DIARY_DIR / filename
+    # diary 目录已按 年/月 分片时写入当月的子目录
+    directory = entry_directory(DIARY_DIR, now)
+    target = directory / filename
     if target.exists():
         raise SystemExit(f"❌ 文件已存在：{target}")
 
-    DIARY_DIR.mkdir(parents=True, exist_ok=True)
+    directory.mkdir(parents=True, exist_ok=True)
 
-    lines = [
-        '---',
-        f"date: {to_json_scalar(now.strftime('%Y-%m-%d %H:%M:%S'))}",
-    ]
-    if title:
-        lines.append(f"title: {to_json_scalar(title)}")
-    lines.extend([
-        f"mood: {to_json_scalar(mood)}",
-        f"rating: {rating}",
-        f"weather: {to_json_scalar(weather)}",
-    ])
-    if tags:
-        lines.append('tags:')
-        lines.extend([f"  - {tag}" for tag in tags])
-    lines.extend(['---', '', '随手记一记…'])
-    target.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    target.write_text(render_diary_entry(now, title, mood, rating, weather, tags), encoding='utf-8')
     return target
 
 
-def main() -> None:
+def parse_rating(value: Any) -> int:
+    """批量导入时不像交互输入那样把超出范围的评分截断到 1-5，而是报告该条记录，避免悄悄改动数据"""
+    try:
+        rating = int(value)
+    except (TypeError, ValueError):
+        rating = None
+    if rating is None or not 1 <= rating <= 5:
+        raise ValueError(f"心情评分应为 1-5 的整数：{value!r}")
+    return rating
+
+
+def parse_date(value: Any, default: datetime) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if value is None or not str(value).strip():
+        return default
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace('/', '-'))
+    except ValueError:
+        raise ValueError(f"无法解析日期：{value!r}") from None
+    return parsed.replace(tzinfo=None)
+
+
+def record_text(record: dict, key: str, default: str = '') -> str:
+    value = record.get(key)
+    if value is None or not str(value).strip():
+        return default
+    return str(value).strip()
+
+
+def record_tags(record: dict, fallback: list[str]) -> list[str]:
+    value = record.get('tags')
+    if isinstance(value, list):
+        return [str(tag).strip() for tag in value if str(tag).strip()] or fallback
+    return parse_tags(str(value), fallback) if value else fallback
+
+
+def record_flag(record: dict, key: str, default: bool) -> bool:
+    value = record.get(key)
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('true', '1', 'yes', 'y')
+
+
+def filename_stem(value: str) -> str:
+    stem = value[:-len('.md')] if value.endswith('.md') else value
+    if not stem or stem in ('.', '..') or '/' in stem or os.sep in stem:
+        raise ValueError(f"文件名不合法：{value!r}")
+    return stem
+
+
+def read_records(stream: Iterable[str], fmt: str) -> Iterator[tuple[int, dict | ValueError]]:
+    """逐条读取记录，返回 (行号, 记录)；无法解析的行返回 (行号, 错误)，不影响后续记录"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, ValueError(f"JSON 格式错误：{e.msg}")
+            continue
+        yield number, record if isinstance(record, dict) else ValueError('每行应为一个 JSON 对象')
+
+
+class ExistingNames:
+    """各目录已有文件名的内存集合：每个目录只列一次，之后解决重名不再逐个调用 exists()"""
+
+    def __init__(self) -> None:
+        self.directories: dict[Path, set[str]] = {}
+        self.suffixes: dict[tuple[Path, str], int] = {}
+
+    def claim(self, directory: Path, stem: str) -> str:
+        """返回 directory 中还没被占用的文件名，重名时依次加 -2、-3… 后缀"""
+        names = self.directories.get(directory)
+        if names is None:
+            try:
+                names = set(os.listdir(directory))
+            except FileNotFoundError:
+                names = set()
+            self.directories[directory] = names
+        name = f"{stem}.md"
+        if name in names:
+            # 记住每个文件名用到的后缀，大量同名记录时不必每次从 -2 开始尝试
+            suffix = self.suffixes.get((directory, stem), 2)
+            while f"{stem}-{suffix}.md" in names:
+                suffix += 1
+            self.suffixes[(directory, stem)] = suffix + 1
+            name = f"{stem}-{suffix}.md"
+        names.add(name)
+        return name
+
+
+class EntryImporter:
+    """把记录渲染成 blog/diary 文件，按批写入；内存占用只与批大小和文件名集合有关"""
+
+    def __init__(self, content_type: str, defaults: argparse.Namespace, batch_size: int = 1000):
+        self.content_type = content_type
+        self.defaults = defaults
+        self.batch_size = max(1, batch_size)
+        self.names = ExistingNames()
+        self.now = datetime.now()
+        self.diary_sharded = is_sharded(DIARY_DIR)
+        self.created_dirs: set[Path] = set()
+        self.batch: list[tuple[int, Path, str]] = []
+        self.created = 0
+        self.failed = 0
+
+    def build(self, record: dict) -> tuple[Path, str, str]:
+        """返回 (目录, 文件名主干, 文件内容)；记录不合法时抛出 ValueError"""
+        defaults = self.defaults
+        date = parse_date(record.get('date'), self.now)
+        title = record_text(record, 'title')
+        weather = record_text(record, 'weather', defaults.weather or '☀️')
+        mood = record_text(record, 'mood', defaults.mood or '😊')
+        rating = parse_rating(record_text(record, 'rating', str(defaults.rating or 3)))
+        body = str(record.get('body') or record.get('content') or '').strip('\n')
+        filename = record_text(record, 'filename')
+
+        if self.content_type == 'blog':
+            if not title:
+                raise ValueError('缺少 title')
+            summary = record_text(record, 'summary', title[:30])
+            tags = record_tags(record, parse_tags(defaults.tags or '', ['随笔']))
+            draft = record_flag(record, 'draft', defaults.draft)
+            text = render_blog_entry(title, date, summary, tags, weather, mood, rating, draft,
+                                     body or '在这里写正文…')
+            return BLOG_DIR, filename_stem(filename or slugify(title, 'post')), text
+
+        tags = record_tags(record, parse_tags(defaults.tags or '', []))
+        text = render_diary_entry(date, title, mood, rating, weather, tags, body or '随手记一记…')
+        directory = shard_directory(DIARY_DIR, date) if self.diary_sharded else DIARY_DIR
+        return directory, filename_stem(filename or title or f"diary-{date:%Y%m%d-%H%M%S}"), text
+
+    def report(self, number: int, message: str) -> None:
+        self.failed += 1
+        print(f"⚠️  第 {number} 行：{message}", file=sys.stderr)
+
+    def add(self, number: int, record: dict | ValueError) -> None:
+        try:
+            if isinstance(record, ValueError):
+                raise record
+            directory, stem, text = self.build(record)
+        except ValueError as e:
+            self.report(number, str(e))
+            return
+        self.batch.append((number, directory / self.names.claim(directory, stem), text))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        for number, target, text in self.batch:
+            if target.parent not in self.created_dirs:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                self.created_dirs.add(target.parent)
+            try:
+                # 'x' 模式：文件在扫描目录之后才被其他进程创建时报错，而不是覆盖
+                with open(target, 'x', encoding='utf-8') as f:
+                    f.write(text)
+            except OSError as e:
+                self.report(number, f"{target.name}: {e.strerror or e}")
+            else:
+                self.created += 1
+        if self.batch:
+            print(f"📦 已写入 {self.created} 个文件", file=sys.stderr)
+        self.batch.clear()
+
+    def run(self, records: Iterable[tuple[int, dict | ValueError]]) -> None:
+        for number, record in records:
+            self.add(number, record)
+        self.flush()
+
+
+def import_entries(args: argparse.Namespace) -> int:
+    """从 JSONL/CSV 批量导入，返回失败的记录数"""
+    fmt = args.format or ('csv' if args.source.lower().endswith('.csv') else 'jsonl')
+    # utf-8-sig 兼容表格软件导出时带的 BOM；newline='' 是 csv 模块的要求
+    if args.source == '-':
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+    else:
+        stream = open(args.source, 'r', encoding='utf-8-sig', newline='')
+    importer = EntryImporter(args.type, args, args.batch_size)
+    with stream:
+        importer.run(read_records(stream, fmt))
+
+    target = BLOG_DIR if args.type == 'blog' else DIARY_DIR
+    print(f"✅ 已导入 {importer.created} 条记录到 {target.relative_to(PROJECT_ROOT)}"
+          + (f"，{importer.failed} 条失败" if importer.failed else ''))
+    return importer.failed
+
+
+def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser(description='为 blog 或 diary 初始化 frontmatter。')
     parser.add_argument('--type', choices=['blog', 'diary'], required=True, help='内容类型')
     parser.add_argument('--title', help='标题（可选，留空则运行时输入）')
@@ -139,7 +367,16 @@ def main() -> None:
     parser.add_argument('--rating', type=int, help='心情评分 1-5')
     parser.add_argument('--filename', help='自定义文件名（含扩展名或不含）')
     parser.add_argument('--draft', action='store_true', help='blog 是否标记为草稿')
-    args = parser.parse_args()
+    parser.add_argument('--import', dest='source', metavar='FILE',
+                        help='从 JSONL 或 CSV 批量导入（- 表示标准输入），上面的参数作为记录缺省字段的默认值')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], help='导入文件的格式（默认按扩展名判断）')
+    parser.add_argument('--batch-size', type=int, default=1000, help='导入时每批写入的文件数（默认 1000）')
+    args = parser.parse_args(argv)
+
+    if args.source:
+        if import_entries(args):
+            sys.exit(1)
+        return
 
     if args.type == 'blog':
         target = write_blog_entry(args)
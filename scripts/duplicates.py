@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""基于 MinHash + LSH 的近似重复检测（blog 和 diary 一起比较）。
+
+从多台设备同步日记时，同一篇内容常以不同的文件名出现两次（例如未命名的日记按时间戳命名）。
+两两比较是 O(N²)，这里为每个文件计算 MinHash 签名，再用 LSH 分段只比较有一段完全相同的文件：
+- 正文（不含 front matter）经 NFKC、小写并去掉空白和标点后，取 5 字的字符 shingle
+- 签名使用 one-permutation hashing：每个 shingle 只算一次 crc32，按 hash 分到 64 个桶内取最小值，
+  空桶向右借用相邻桶的值（rotation densification），计算量与正文长度成正比
+- 64 个值分为 16 段，每段 4 个值；相似度 0.8 的两个文件至少一段相同的概率超过 99.9%，
+  候选再用签名估计的相似度确认
+- 签名和各段的取值保存在 `.cache/minhash.sqlite3`（段取值带索引），再次运行只重新计算变化过的文件，
+  查询某个文件的重复项只需 16 次索引查找，不必把全部签名载入内存
+
+`content_manager.py` 处理目录前会检查待处理的文件，报告疑似重复（`--duplicates skip` 时跳过）。
+
+使用方法：
+python3 scripts/duplicates.py                  # 列出 blog 和 diary 中所有疑似重复的文件组
+python3 scripts/duplicates.py --threshold 0.9  # 只列出相似度不低于 90% 的文件
+python3 scripts/duplicates.py --jobs 4         # 首次建立索引时用 4 个进程计算签名
+"""
+
+from __future__ import annotations
+
+import argparse
+import operator
+import os
+import re
+import unicodedata
+import zlib
+from array import array
+from pathlib import Path
+from typing import Iterable, Optional
+
+from content_scanner import ContentFile, scan_content
+from front_matter import read_front_matter
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CACHE_PATH = PROJECT_ROOT / '.cache' / 'minhash.sqlite3'
+CONTENT_TYPES = ('blog', 'diary')
+SHINGLE_SIZE = 5
+MIN_SHINGLES = 20             # 正文太短（如刚创建、只有模板文字的日记）不参与比较
+NUM_HASHES = 64               # 必须是 2 的幂
+BANDS = 16
+ROWS = NUM_HASHES // BANDS
+DEFAULT_THRESHOLD = 0.8
+NON_WORD_RE = re.compile(r'[\W_]+')
+# 文件数超过该值时才值得启动进程池
+POOL_MIN_FILES = 200
+
+
+def read_body(path: Path) -> str:
+    fm = read_front_matter(path)
+    with open(path, 'rb') as f:
+        if fm.closed:
+            f.seek(fm.body_offset)
+        return f.read().decode('utf-8', errors='replace')
+
+
+def normalize(text: str) -> str:
+    if not unicodedata.is_normalized('NFKC', text):
+        text = unicodedata.normalize('NFKC', text)
+    return NON_WORD_RE.sub('', text.lower())
+
+
+def signature(text: str) -> Optional[array]:
+    """one-permutation MinHash 签名；正文太短时返回 None"""
+    # UTF-32 编码后每个字符占 4 字节，5 字的 shingle 就是 20 字节的切片，省去逐个编码
+    data = normalize(text).encode('utf-32-le')
+    width = 4 * SHINGLE_SIZE
+    items = {data[i:i + width] for i in range(0, len(data) - width + 4, 4)}
+    if len(items) < MIN_SHINGLES:
+        return None
+    # 从大到小写入字典，每个桶最后留下的是最小值
+    mask, shift = NUM_HASHES - 1, NUM_HASHES.bit_length() - 1
+    bins = {value & mask: value >> shift for value in sorted(map(zlib.crc32, items), reverse=True)}
+
+    if len(bins) == NUM_HASHES:
+        return array('I', [bins[index] for index in range(NUM_HASHES)])
+    result = array('I', bytes(4 * NUM_HASHES))
+    for index in range(NUM_HASHES):
+        distance = 0
+        while (index + distance) & mask not in bins:
+            distance += 1
+        # 借用的值加上与距离相关的偏移，避免两个文件因为借用同一个桶而偶然相等
+        result[index] = (bins[(index + distance) & mask] + distance * 0x9E3779B1) & 0xFFFFFFFF
+    return result
+
+
+def file_signature(path: Path) -> Optional[array]:
+    return signature(read_body(path))
+
+
+def band_values(value: array) -> list[int]:
+    """各段 4 个 32 位值拼成的整数（折叠到 SQLite 的 63 位整数范围内）"""
+    data = value.tobytes()
+    size = ROWS * 4
+    return [int.from_bytes(data[i:i + size], 'little') % 0x7FFFFFFFFFFFFFE7 for i in range(0, len(data), size)]
+
+
+def similarity(a: array, b: array) -> float:
+    """签名中相同位置取值相等的比例，即 Jaccard 相似度的估计"""
+    return sum(map(operator.eq, a, b)) / NUM_HASHES
+
+
+class DuplicateIndex:
+    def __init__(self, root: Path = PROJECT_ROOT, path: Path = CACHE_PATH, threshold: float = DEFAULT_THRESHOLD):
+        self.root = Path(os.path.abspath(root))
+        self.path = path
+        self.threshold = threshold
+        self._conn = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            import sqlite3
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS signatures ('
+                ' id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE,'
+                ' size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, signature BLOB)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS bands ('
+                ' band INTEGER NOT NULL, value INTEGER NOT NULL, doc INTEGER NOT NULL,'
+                ' PRIMARY KEY (band, value, doc)) WITHOUT ROWID'
+            )
+            self._conn = conn
+        return self._conn
+
+    def key(self, content_type: str, path: Path) -> str:
+        content_dir = self.root / 'src' / 'content' / content_type
+        text, prefix = str(path), f"{content_dir}{os.sep}"
+        # 扫描得到的路径都在 content_dir 下，直接截取字符串，避免大量 pathlib 运算
+        if not text.startswith(prefix):
+            text = os.path.abspath(text)
+        return f"{content_type}/{text[len(prefix):].replace(os.sep, '/')}"
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT count(*) FROM signatures WHERE signature IS NOT NULL').fetchone()[0]
+
+    def update(self, content_type: str, items: Optional[Iterable[ContentFile]] = None, jobs: int = 1) -> int:
+        """重新计算新增或修改过的文件的签名，删除已不存在的文件。
+
+        items 为扫描 content_type 目录得到的文件列表（通常复用调用方已有的扫描结果）。
+        返回重新计算的文件数。
+        """
+        content_dir = self.root / 'src' / 'content' / content_type
+        if items is None:
+            items = scan_content(content_dir)
+        stored = {key: (doc, size, mtime_ns) for doc, key, size, mtime_ns in self.conn.execute(
+            'SELECT id, key, size, mtime_ns FROM signatures WHERE key >= ? AND key < ?',
+            (f"{content_type}/", f"{content_type}0"))}
+
+        changed = []
+        seen = set()
+        for item in items:
+            key = self.key(content_type, item.path)
+            seen.add(key)
+            entry = stored.get(key)
+            if entry is None or entry[1:3] != (item.stat.st_size, item.stat.st_mtime_ns):
+                changed.append((key, item))
+        removed = [key for key in stored if key not in seen]
+        if not changed and not removed:
+            return 0
+
+        signatures = self.compute([item.path for _, item in changed], jobs)
+        with self.conn:
+            self.remove([stored[key][0] for key in removed] +
+                        [stored[key][0] for key, _ in changed if key in stored])
+            next_id = (self.conn.execute('SELECT max(id) FROM signatures').fetchone()[0] or 0) + 1
+            rows, bands = [], []
+            for doc, ((key, item), value) in enumerate(zip(changed, signatures), next_id):
+                rows.append((doc, key, item.stat.st_size, item.stat.st_mtime_ns, value.tobytes() if value else None))
+                if value:
+                    bands.extend((band, band_value, doc) for band, band_value in enumerate(band_values(value)))
+            self.conn.executemany('INSERT INTO signatures VALUES (?, ?, ?, ?, ?)', rows)
+            # 按主键顺序写入，减少 B 树的随机插入
+            bands.sort()
+            self.conn.executemany('INSERT OR IGNORE INTO bands VALUES (?, ?, ?)', bands)
+        return len(changed)
+
+    @staticmethod
+    def compute(paths: list[Path], jobs: int = 1) -> list[Optional[array]]:
+        """计算签名，读取失败的文件视为正文为空"""
+        if jobs > 1 and len(paths) >= POOL_MIN_FILES:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                return list(executor.map(_safe_file_signature, paths, chunksize=max(1, len(paths) // (jobs * 4))))
+        return [_safe_file_signature(path) for path in paths]
+
+    def remove(self, docs: list[int]) -> None:
+        """删除文件的签名及其各段取值（段取值由原签名算出，按主键删除）"""
+        for doc in docs:
+            blob = self.conn.execute('SELECT signature FROM signatures WHERE id = ?', (doc,)).fetchone()[0]
+            if blob:
+                self.conn.executemany('DELETE FROM bands WHERE band = ? AND value = ? AND doc = ?',
+                                      [(band, band_value, doc)
+                                       for band, band_value in enumerate(band_values(array('I', blob)))])
+            self.conn.execute('DELETE FROM signatures WHERE id = ?', (doc,))
+
+    def signature_of(self, key: str) -> Optional[tuple[int, array]]:
+        row = self.conn.execute('SELECT id, signature FROM signatures WHERE key = ?', (key,)).fetchone()
+        if row is None or row[1] is None:
+            return None
+        return row[0], array('I', row[1])
+
+    def duplicates_of(self, key: str) -> list[tuple[str, float]]:
+        """与 key 相似度不低于阈值的文件，按相似度降序"""
+        found = self.signature_of(key)
+        if found is None:
+            return []
+        doc, value = found
+        candidates = set()
+        for band, band_value in enumerate(band_values(value)):
+            candidates.update(row[0] for row in self.conn.execute(
+                'SELECT doc FROM bands WHERE band = ? AND value = ?', (band, band_value)))
+        candidates.discard(doc)
+
+        matches = []
+        for other in candidates:
+            other_key, blob = self.conn.execute('SELECT key, signature FROM signatures WHERE id = ?', (other,)).fetchone()
+            score = similarity(value, array('I', blob))
+            if score >= self.threshold:
+                matches.append((other_key, score))
+        return sorted(matches, key=lambda item: (-item[1], item[0]))
+
+    def groups(self) -> list[list[tuple[str, Optional[str], float]]]:
+        """所有疑似重复的文件组：[(文件, 与之相似的组内文件, 相似度), ...]，组内第一个文件的后两项为 None 和 1.0"""
+        signatures: dict[int, array] = {}
+        parent: dict[int, int] = {}
+        matched: dict[int, tuple[int, float]] = {}
+
+        def load(doc: int) -> array:
+            if doc not in signatures:
+                blob = self.conn.execute('SELECT signature FROM signatures WHERE id = ?', (doc,)).fetchone()[0]
+                signatures[doc] = array('I', blob)
+            return signatures[doc]
+
+        def find(doc: int) -> int:
+            while parent.setdefault(doc, doc) != doc:
+                doc = parent[doc]
+            return doc
+
+        rows = self.conn.execute(
+            'SELECT group_concat(doc) FROM bands GROUP BY band, value HAVING count(*) > 1')
+        for (docs,) in rows:
+            # 同一段内只与已有的代表比较，大量相同的文件也只需线性次数的比较
+            representatives: list[int] = []
+            for doc in map(int, docs.split(',')):
+                for representative in representatives:
+                    if find(doc) == find(representative):
+                        break
+                    score = similarity(load(doc), load(representative))
+                    if score >= self.threshold:
+                        parent[find(doc)] = find(representative)
+                        matched.setdefault(doc, (representative, score))
+                        break
+                else:
+                    representatives.append(doc)
+
+        members: dict[int, list[int]] = {}
+        for doc in parent:
+            members.setdefault(find(doc), []).append(doc)
+        grouped = [doc for docs in members.values() if len(docs) > 1 for doc in docs]
+        if not grouped:
+            return []
+        keys = dict(self.conn.execute('SELECT id, key FROM signatures WHERE id IN (%s)'
+                                      % ','.join(str(doc) for doc in grouped)))
+
+        result = []
+        for docs in members.values():
+            if len(docs) < 2:
+                continue
+            group = []
+            for doc in sorted(docs, key=lambda doc: keys[doc]):
+                other, score = matched.get(doc, (None, 1.0))
+                group.append((keys[doc], keys.get(other), score))
+            result.append(group)
+        return sorted(result)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def _safe_file_signature(path: Path) -> Optional[array]:
+    try:
+        return file_signature(path)
+    except OSError:
+        return None
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='检测 blog 和 diary 中内容近似重复的文件')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'判定为重复的相似度下限（默认 {DEFAULT_THRESHOLD}）')
+    parser.add_argument('--jobs', type=int, default=1, help='计算签名的进程数（默认 1）')
+    args = parser.parse_args(argv)
+
+    index = DuplicateIndex(threshold=args.threshold)
+    for content_type in CONTENT_TYPES:
+        changed = index.update(content_type, jobs=args.jobs)
+        if changed:
+            print(f"🔄 {content_type}：重新计算了 {changed} 个文件的签名")
+    groups = index.groups()
+    total = len(index)
+    index.close()
+
+    if not groups:
+        print(f"✅ 没有发现疑似重复的文件（共 {total} 个文件参与比较）")
+        return
+    print(f"⚠️  在 {total} 个文件中发现 {len(groups)} 组疑似重复的文件：")
+    for group in groups:
+        print()
+        for key, other, score in group:
+            print(f"  📄 {key}" + (f"  ≈ {other}（相似度 {score:.0%}）" if other else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""front matter 流式读取：只读取文件开头的 `---` 块，遇到结束分隔线立即停止。
+
+返回解析后的字段以及正文在文件中的字节偏移，判断“是否已有 date”等操作
+不会读取正文，适用于带大段数据或公式的长文章。
+
+解析器只支持本仓库实际使用的 YAML 子集：
+- `key: value` 标量（带引号的字符串、整数、true/false）
+- `key: ["a", "b"]` 行内列表
+- `key:` 后跟 `  - item` 的块列表
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from instrumentation import recorder
+
+DELIMITER_RE = re.compile(rb'^---+[ \t]*\r?\n?$')
+KEY_RE = re.compile(r'^([A-Za-z_][\w-]*)\s*:(?:\s+(.*?))?\s*$')
+LIST_ITEM_RE = re.compile(r'^\s+-\s*(.*?)\s*$')
+MAX_HEADER_BYTES = 64 * 1024
+BOM = b'\xef\xbb\xbf'
+
+
+@dataclass
+class FrontMatter:
+    data: dict[str, Any] = field(default_factory=dict)
+    raw_values: dict[str, str] = field(default_factory=dict)
+    line_numbers: dict[str, int] = field(default_factory=dict)
+    has_block: bool = False       # 文件以 `---` 开头
+    closed: bool = False          # 找到了结束分隔线
+    header_offset: int = 0        # 开始分隔线之后的字节偏移（插入新字段的位置）
+    body_offset: int = 0          # 正文起始的字节偏移
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+
+def parse_scalar(raw: str) -> Any:
+    if raw == '':
+        return ''
+    if raw[0] == '"':
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return raw.strip('"')
+    if raw[0] == "'" and raw.endswith("'") and len(raw) > 1:
+        return raw[1:-1].replace("''", "'")
+    if raw[0] == '[' and raw.endswith(']'):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return [parse_scalar(item.strip()) for item in raw[1:-1].split(',') if item.strip()]
+    if raw in ('true', 'false'):
+        return raw == 'true'
+    if re.fullmatch(r'-?\d+', raw):
+        return int(raw)
+    return raw
+
+
+def parse_front_matter_lines(lines: list[str], first_line_number: int = 2) -> FrontMatter:
+    """解析 front matter 内部各行（不含分隔线），first_line_number 为第一行在文件中的行号"""
+    fm = FrontMatter()
+    current_list_key: Optional[str] = None
+    for index, line in enumerate(lines):
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        item_match = LIST_ITEM_RE.match(line)
+        if item_match and current_list_key is not None:
+            if fm.data[current_list_key] is None:
+                fm.data[current_list_key] = []
+            fm.data[current_list_key].append(parse_scalar(item_match.group(1)))
+            continue
+        key_match = KEY_RE.match(line)
+        if not key_match:
+            current_list_key = None
+            continue
+        key, raw = key_match.group(1), key_match.group(2) or ''
+        fm.raw_values[key] = raw
+        fm.line_numbers[key] = first_line_number + index
+        if raw:
+            fm.data[key] = parse_scalar(raw)
+            current_list_key = None
+        else:
+            # 值为空：可能是块列表的开头，遇到 `- item` 时再转成列表
+            fm.data[key] = None
+            current_list_key = key
+    return fm
+
+
+def read_front_matter(path: Path, max_header_bytes: int = MAX_HEADER_BYTES) -> FrontMatter:
+    """逐行读取文件开头的 front matter，读到结束分隔线（或超过上限）即停止"""
+    with recorder.span('read_front_matter'), open(path, 'rb') as f:
+        first = f.readline()
+        offset = header_offset = len(first)
+        if not DELIMITER_RE.match(first.removeprefix(BOM)):
+            recorder.count('bytes_read', offset)
+            return FrontMatter()
+
+        header_lines: list[str] = []
+        while offset <= max_header_bytes:
+            line = f.readline()
+            if not line:
+                break
+            offset += len(line)
+            if DELIMITER_RE.match(line):
+                recorder.count('bytes_read', offset)
+                fm = parse_front_matter_lines(header_lines)
+                fm.has_block = fm.closed = True
+                fm.header_offset = header_offset
+                fm.body_offset = offset
+                return fm
+            header_lines.append(line.decode('utf-8').rstrip('\r\n'))
+
+    recorder.count('bytes_read', offset)
+    return FrontMatter(has_block=True, header_offset=header_offset)
+
+
+def field_insertion(fm: FrontMatter, line: str) -> tuple[int, bytes]:
+    """在 front matter 第一行插入 line 所需的 (字节偏移, 插入内容)；没有 front matter 时在文件开头新建一个"""
+    if fm.has_block:
+        return fm.header_offset, f"{line}\n".encode('utf-8')
+    return 0, f"---\n{line}\n---\n\n".encode('utf-8')
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""根据 git 历史确定内容文件的创建时间。
+
+CI 中全新 clone 的仓库里，文件的 st_ctime 只是 checkout 的时间，用它补 date 字段会得到错误的日期。
+这里只运行一次 `git log --diff-filter=AR --name-status`，从最早的提交开始重放新增和重命名，
+建立 路径 -> 首次提交时间 的索引：
+- 重命名（包括 diary 分片时的移动）沿用原路径的时间
+- 索引按 HEAD 缓存在 `.cache/git-dates.json`，HEAD 前进后只重放新增的提交
+- 未提交的新文件、不在 git 仓库中或没有安装 git 时退回文件的创建时间
+
+注意浅克隆（actions/checkout 默认 fetch-depth: 1）只有最后一次提交，需要完整历史。
+
+使用方法：
+python3 scripts/git_dates.py src/content/diary/xxx.md   # 查看文件的创建时间及来源
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from content_scanner import creation_time
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CACHE_PATH = PROJECT_ROOT / '.cache' / 'git-dates.json'
+CACHE_VERSION = 1
+PATHSPEC = 'src/content'
+
+
+def run_git(root: Path, *args: str) -> Optional[str]:
+    try:
+        result = subprocess.run(['git', '-C', os.fspath(root), *args],
+                                capture_output=True, text=True, encoding='utf-8', errors='surrogateescape')
+    except OSError:
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def replay_log(output: str, dates: dict[str, int]) -> None:
+    """按时间顺序重放 `git log --reverse -z` 的输出：新增记录首次时间，重命名沿用原路径的时间"""
+    tokens = iter(token.lstrip('\n') for token in output.split('\0'))
+    timestamp = 0
+    for token in tokens:
+        if token.startswith('commit '):
+            timestamp = int(token[len('commit '):])
+        elif token.startswith('A'):
+            dates.setdefault(next(tokens), timestamp)
+        elif token.startswith('R'):
+            source, target = next(tokens), next(tokens)
+            dates[target] = dates.pop(source, timestamp)
+
+
+class GitDateIndex:
+    def __init__(self, toplevel: Path, head: str, dates: dict[str, int]):
+        self.toplevel = toplevel
+        self.head = head
+        self.dates = dates
+
+    @classmethod
+    def load(cls, root: Path = PROJECT_ROOT, cache_path: Path = CACHE_PATH) -> Optional['GitDateIndex']:
+        """读取缓存并补上新提交；不在 git 仓库中时返回 None"""
+        output = run_git(root, 'rev-parse', '--show-toplevel', 'HEAD')
+        if output is None:
+            return None
+        toplevel, head = output.split()
+        toplevel = Path(toplevel)
+
+        cached = {}
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION and data.get('toplevel') == toplevel.as_posix():
+                cached = data
+        except (OSError, ValueError):
+            pass
+
+        if cached.get('head') == head:
+            return cls(toplevel, head, cached['dates'])
+
+        dates: dict[str, int] = {}
+        revisions = 'HEAD'
+        if cached.get('head') and run_git(root, 'merge-base', '--is-ancestor', cached['head'], head) is not None:
+            dates = cached['dates']
+            revisions = f"{cached['head']}..HEAD"
+        output = run_git(root, 'log', '--reverse', '-M', '--diff-filter=AR', '--name-status', '-z',
+                         '--format=%x00commit %at', revisions, '--', PATHSPEC)
+        if output is None:
+            return None
+        replay_log(output, dates)
+
+        index = cls(toplevel, head, dates)
+        index.save(cache_path)
+        return index
+
+    def save(self, cache_path: Path = CACHE_PATH) -> None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'toplevel': self.toplevel.as_posix(), 'head': self.head,
+                       'dates': self.dates}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, cache_path)
+
+    def lookup(self, path: Path) -> Optional[datetime]:
+        path = Path(os.path.abspath(path))
+        try:
+            key = path.relative_to(self.toplevel).as_posix()
+        except ValueError:
+            try:
+                key = path.resolve().relative_to(self.toplevel).as_posix()
+            except ValueError:
+                return None
+        timestamp = self.dates.get(key)
+        return datetime.fromtimestamp(timestamp) if timestamp is not None else None
+
+
+@lru_cache(maxsize=None)
+def load_index(root: Path = PROJECT_ROOT) -> Optional[GitDateIndex]:
+    """每个进程只加载一次"""
+    return GitDateIndex.load(root)
+
+
+def file_creation_time(path: Path, stat: Optional[os.stat_result] = None, root: Path = PROJECT_ROOT) -> datetime:
+    """文件首次提交的时间；未提交的文件使用文件的创建时间（stat 为扫描目录时已取得的结果）"""
+    index = load_index(root)
+    if index is not None:
+        date = index.lookup(path)
+        if date is not None:
+            return date
+    return creation_time(stat or os.stat(path))
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='根据 git 历史查看内容文件的创建时间')
+    parser.add_argument('paths', nargs='+', help='文件路径')
+    args = parser.parse_args(argv)
+
+    index = load_index()
+    if index is None:
+        print("⚠️  不在 git 仓库中（或没有安装 git），只能使用文件的创建时间")
+    for path in args.paths:
+        date = index.lookup(Path(path)) if index is not None else None
+        source = 'git'
+        if date is None:
+            try:
+                date = creation_time(os.stat(path))
+            except OSError as e:
+                print(f"❌ {path}: {e}")
+                continue
+            source = 'stat'
+        print(f"{date:%Y-%m-%d %H:%M:%S}  [{source}]  {path}")
+
+
+if __name__ == '__main__':
+    main()
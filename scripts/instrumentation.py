@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""运行时埋点：分阶段计时、计数器、延迟直方图和日志事件，可导出为 Chrome trace。
+
+默认关闭，所有接口在关闭时几乎没有开销（span 返回共享的空上下文，计数直接返回）。
+`content_manager.py --profile` 会打开记录器，运行结束后：
+- 写出 Chrome trace 格式的 JSON（可在 chrome://tracing 或 https://ui.perfetto.dev 中打开），
+  每个文件、每个阶段都是一个时间片，日志输出是其中的瞬时事件
+- 输出汇总表：各阶段耗时、最慢的文件、模型调用延迟分布、缓存命中率、读写字节数
+
+用法：
+    from instrumentation import recorder, log
+
+    with recorder.span('read', path=name):
+        ...
+    recorder.count('bytes_read', size)
+    recorder.observe('model_latency_ms', elapsed_ms)
+    log(f"✅ 已更新文件: {name}", path=name)   # 打印并记录为事件
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Optional
+
+# 延迟直方图的分桶上界（毫秒）
+LATENCY_BUCKETS_MS = (50, 100, 200, 500, 1000, 2000, 5000, 10000)
+SLOWEST_FILES = 5
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class _Span:
+    __slots__ = ('recorder', 'name', 'category', 'args', 'start')
+
+    def __init__(self, recorder: 'Recorder', name: str, category: str, args: dict):
+        self.recorder = recorder
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self) -> '_Span':
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.recorder._complete(self.name, self.category, self.start, end, self.args)
+
+
+class Recorder:
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+        self.events: list[dict] = []
+        self.counters: dict[str, float] = defaultdict(float)
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.stage_totals: dict[str, list] = defaultdict(lambda: [0, 0])
+
+    def enable(self) -> None:
+        self.enabled = True
+        self._origin = time.perf_counter_ns()
+
+    # ---- 记录接口 ----
+
+    def span(self, name: str, category: str = 'stage', **args: Any):
+        """记录一段耗时；关闭时返回空上下文"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def timed(self, name: str, category: str = 'stage'):
+        """装饰器：每次调用记录为一个 span（是否记录在调用时判断）"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, name, category, {}):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name: str, value: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        """记录一个样本（如模型调用延迟），用于汇总分位数和直方图"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.samples[name].append(value)
+
+    def event(self, name: str, category: str = 'log', **args: Any) -> None:
+        if not self.enabled:
+            return
+        event = {
+            'name': name, 'cat': category, 'ph': 'i', 's': 't',
+            'ts': (time.perf_counter_ns() - self._origin) / 1000,
+            'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args,
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def _complete(self, name: str, category: str, start: int, end: int, args: dict) -> None:
+        event = {
+            'name': name, 'cat': category, 'ph': 'X',
+            'ts': (start - self._origin) / 1000, 'dur': (end - start) / 1000,
+            'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args,
+        }
+        with self._lock:
+            self.events.append(event)
+            if category != 'file':
+                totals = self.stage_totals[name]
+                totals[0] += 1
+                totals[1] += end - start
+
+    # ---- 跨进程汇总 ----
+
+    def drain(self) -> Optional[dict]:
+        """取出并清空目前记录的内容，供进程池的子进程随结果一起返回；关闭时返回 None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            snapshot = {
+                'origin': self._origin, 'events': self.events, 'counters': dict(self.counters),
+                'samples': dict(self.samples), 'stage_totals': dict(self.stage_totals),
+            }
+            self.events = []
+            self.counters.clear()
+            self.samples.clear()
+            self.stage_totals.clear()
+        return snapshot
+
+    def merge(self, snapshot: Optional[dict]) -> None:
+        """合并子进程 drain() 的结果；perf_counter 是系统范围的单调时钟，时间戳换算到本进程的起点即可"""
+        if not self.enabled or not snapshot:
+            return
+        shift = (snapshot['origin'] - self._origin) / 1000
+        with self._lock:
+            for event in snapshot['events']:
+                event['ts'] += shift
+                self.events.append(event)
+            for name, value in snapshot['counters'].items():
+                self.counters[name] += value
+            for name, values in snapshot['samples'].items():
+                self.samples[name].extend(values)
+            for name, (calls, ns) in snapshot['stage_totals'].items():
+                totals = self.stage_totals[name]
+                totals[0] += calls
+                totals[1] += ns
+
+    # ---- 导出 ----
+
+    def summary(self) -> dict:
+        stages = {name: {'calls': calls, 'ms': round(ns / 1e6, 3)}
+                  for name, (calls, ns) in sorted(self.stage_totals.items(), key=lambda item: -item[1][1])}
+        files = sorted((event for event in self.events if event['cat'] == 'file'), key=lambda event: -event['dur'])
+        histograms = {name: self.histogram(values) for name, values in self.samples.items()}
+        hits, misses = self.counters.get('cache_hit', 0), self.counters.get('cache_miss', 0)
+        return {
+            'stages': stages,
+            'slowest_files': [{'path': event['args'].get('path'), 'ms': round(event['dur'] / 1000, 3)}
+                              for event in files[:SLOWEST_FILES]],
+            'histograms': histograms,
+            'cache_hit_rate': hits / (hits + misses) if hits + misses else None,
+            'counters': dict(self.counters),
+        }
+
+    @staticmethod
+    def histogram(values: list[float]) -> dict:
+        ordered = sorted(values)
+
+        def percentile(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 3)
+
+        buckets = {f"<{bound}": 0 for bound in LATENCY_BUCKETS_MS}
+        buckets[f">={LATENCY_BUCKETS_MS[-1]}"] = 0
+        for value in ordered:
+            bound = next((b for b in LATENCY_BUCKETS_MS if value < b), None)
+            buckets[f"<{bound}" if bound is not None else f">={LATENCY_BUCKETS_MS[-1]}"] += 1
+        return {
+            'count': len(ordered), 'p50': percentile(0.5), 'p90': percentile(0.9),
+            'p99': percentile(0.99), 'max': round(ordered[-1], 3), 'buckets': buckets,
+        }
+
+    def write_trace(self, path: Path) -> Path:
+        """写出 Chrome trace（JSON Object 格式），汇总结果放在 otherData 中"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        counters = [{'name': 'counters', 'ph': 'C', 'ts': (time.perf_counter_ns() - self._origin) / 1000,
+                     'pid': os.getpid(), 'args': dict(self.counters)}]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'traceEvents': self.events + counters,
+                'displayTimeUnit': 'ms',
+                'otherData': self.summary(),
+            }, f, ensure_ascii=False)
+        return path
+
+    def format_summary(self) -> str:
+        summary = self.summary()
+        lines = ['', '⏱️  各阶段耗时', f"{'阶段':<24}{'次数':>8}{'总耗时(ms)':>14}"]
+        for name, stats in summary['stages'].items():
+            lines.append(f"{name:<24}{stats['calls']:>8}{stats['ms']:>14.1f}")
+
+        if summary['slowest_files']:
+            lines.append('\n🐢 最慢的文件')
+            for item in summary['slowest_files']:
+                lines.append(f"  {item['ms']:>10.1f} ms  {item['path']}")
+
+        for name, stats in summary['histograms'].items():
+            lines.append(f"\n📈 {name}: {stats['count']} 次，p50 {stats['p50']:.0f}，p90 {stats['p90']:.0f}，"
+                         f"p99 {stats['p99']:.0f}，最大 {stats['max']:.0f}")
+            peak = max(stats['buckets'].values()) or 1
+            for bucket, count in stats['buckets'].items():
+                if count:
+                    lines.append(f"  {bucket:>8} ms {'█' * max(1, round(20 * count / peak))} {count}")
+
+        if summary['cache_hit_rate'] is not None:
+            lines.append(f"\n🗄️  模型缓存命中率 {summary['cache_hit_rate']:.0%}")
+        counters = summary['counters']
+        lines.append(f"💾 读取 {format_bytes(counters.get('bytes_read', 0))}，"
+                     f"写入 {format_bytes(counters.get('bytes_written', 0))}")
+        return '\n'.join(lines)
+
+
+def format_bytes(value: float) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == 'B' else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+_log_buffer = threading.local()
+
+
+def log(message: str, **fields: Any) -> None:
+    """输出一行运行信息；打开记录器时同时记录为带结构化字段的事件。
+    当前线程处于 capture_logs() 中时暂存起来，由调用方稍后输出"""
+    lines = getattr(_log_buffer, 'lines', None)
+    if lines is not None:
+        lines.append(message)
+    else:
+        print(message)
+    if recorder.enabled:
+        recorder.event(message.strip(), **fields)
+
+
+@contextlib.contextmanager
+def capture_logs():
+    """暂存当前线程的 log() 输出（例如后台生成时不打断用户正在回答的提示），返回暂存的行"""
+    previous = getattr(_log_buffer, 'lines', None)
+    _log_buffer.lines = lines = []
+    try:
+        yield lines
+    finally:
+        _log_buffer.lines = previous
+
+
+# 进程内共享的记录器
+recorder = Recorder()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""离线关键词与摘要引擎：在整个 blog + diary 语料上建立 IDF 索引，按 TF-IDF 挑选 tags，
+并抽取与全文最相近的句子作为摘要，不需要任何网络请求。
+
+- 分词：中文按 2~4 字的 n-gram 切分，英文/数字按单词切分（统一小写）
+- 索引：`.cache/keyword-index.json`，记录每个文件的 size/mtime 和词项集合，
+  文件变化时只增量更新对应的文档频率
+- 打分：安装了 NumPy 时向量化计算，否则退回纯 Python
+
+使用方法：
+python3 scripts/keywords.py                        # 增量更新索引
+python3 scripts/keywords.py src/content/blog/x.md  # 查看某篇文章的 tags 和摘要
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 是可选依赖
+    np = None
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CONTENT_DIRS = ('blog', 'diary')
+INDEX_PATH = PROJECT_ROOT / '.cache' / 'keyword-index.json'
+INDEX_VERSION = 1
+
+CJK_RUN_RE = re.compile(r'[㐀-䶿一-鿿]+')
+WORD_RE = re.compile(r'[A-Za-z][A-Za-z0-9+#.-]*[A-Za-z0-9+#]|[A-Za-z]{2,}')
+SENTENCE_RE = re.compile(r'[^。！？!?；;\n]+[。！？!?；;]?')
+MARKDOWN_NOISE_RE = re.compile(
+    r'```.*?```|~~~.*?~~~|\$\$.*?\$\$|\$[^$\n]+\$|`[^`\n]*`|<[^>\n]+>|!?\[([^\]]*)\]\([^)]*\)|https?://\S+',
+    re.DOTALL,
+)
+NGRAM_SIZES = (2, 3, 4)
+ABSORB_RATIO = 0.8
+TITLE_WEIGHT = 3
+STOPWORDS = {
+    # 英文
+    'the', 'and', 'for', 'with', 'that', 'this', 'are', 'was', 'from', 'not', 'but', 'have', 'has',
+    'you', 'your', 'can', 'will', 'all', 'any', 'our', 'its', 'into', 'then', 'than', 'also',
+    # 中文常见虚词组合
+    '一个', '我们', '你们', '他们', '这个', '那个', '这些', '那些', '什么', '怎么', '因为', '所以',
+    '但是', '然后', '如果', '就是', '还是', '可以', '没有', '不是', '自己', '已经', '时候', '今天',
+    '一下', '一些', '这样', '那样', '以及', '或者', '而且', '并且', '其中', '之后', '之前', '的时',
+}
+STOP_CHARS = set('的了是在和也就都而及与着或把被让给这那有个么吗呢吧啊哦嗯')
+
+
+def strip_markdown(text: str) -> str:
+    """去掉代码块、公式、链接地址和 HTML 标签，只保留可读文本"""
+    return MARKDOWN_NOISE_RE.sub(lambda m: m.group(1) or ' ', text)
+
+
+def tokenize(text: str) -> list[str]:
+    """中文按 n-gram、英文按单词切分，过滤停用词"""
+    tokens = []
+    for match in CJK_RUN_RE.finditer(text):
+        run = match.group(0)
+        for n in NGRAM_SIZES:
+            for i in range(len(run) - n + 1):
+                gram = run[i:i + n]
+                if gram[0] in STOP_CHARS or gram[-1] in STOP_CHARS or '的' in gram or gram in STOPWORDS:
+                    continue
+                tokens.append(gram)
+    for match in WORD_RE.finditer(text):
+        word = match.group(0).lower()
+        if word not in STOPWORDS and not word.isdigit():
+            tokens.append(word)
+    return tokens
+
+
+def split_sentences(text: str) -> list[str]:
+    sentences = []
+    for match in SENTENCE_RE.finditer(text):
+        sentence = match.group(0).strip().lstrip('#>-*+ \t').strip()
+        if len(sentence) >= 4:
+            sentences.append(sentence)
+    return sentences
+
+
+def strip_front_matter(text: str) -> str:
+    if text.startswith('---'):
+        end = re.search(r'\n---+\s*\n', text[3:])
+        if end:
+            return text[3 + end.end():]
+    return text
+
+
+class KeywordEngine:
+    def __init__(self, root: Path = PROJECT_ROOT, index_path: Path = INDEX_PATH):
+        self.root = Path(os.path.abspath(root))
+        self.index_path = index_path
+        self.docs: dict[str, dict] = {}
+        self.df: Counter = Counter()
+        self._dirty = False
+
+    @classmethod
+    def load(cls, root: Path = PROJECT_ROOT, index_path: Path = INDEX_PATH) -> 'KeywordEngine':
+        engine = cls(root, index_path)
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return engine
+        if data.get('version') == INDEX_VERSION:
+            engine.docs = data['docs']
+            engine.df = Counter(data['df'])
+        return engine
+
+    # ---- 索引维护 ----
+
+    def iter_content_files(self) -> Iterable[Path]:
+        for content_type in CONTENT_DIRS:
+            content_dir = self.root / 'src' / 'content' / content_type
+            if not content_dir.is_dir():
+                continue
+            for dirpath, _, filenames in os.walk(content_dir):
+                for name in filenames:
+                    if name.lower().endswith(('.md', '.markdown')):
+                        yield Path(dirpath) / name
+
+    def update(self) -> int:
+        """增量更新索引：只重新分词新增或修改过的文件，删除的文件从文档频率中扣除。返回变化的文件数"""
+        seen = set()
+        changed = 0
+        for path in self.iter_content_files():
+            key = path.relative_to(self.root).as_posix()
+            seen.add(key)
+            stat = path.stat()
+            entry = self.docs.get(key)
+            if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                continue
+            try:
+                text = path.read_text(encoding='utf-8')
+            except (OSError, UnicodeDecodeError):
+                continue
+            self._remove_doc(key)
+            terms = sorted(set(tokenize(strip_markdown(strip_front_matter(text)))))
+            self.docs[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'terms': terms}
+            self.df.update(terms)
+            changed += 1
+
+        for key in [key for key in self.docs if key not in seen]:
+            self._remove_doc(key)
+            changed += 1
+
+        if changed:
+            self._dirty = True
+        return changed
+
+    def _remove_doc(self, key: str) -> None:
+        entry = self.docs.pop(key, None)
+        if entry is None:
+            return
+        for term in entry['terms']:
+            self.df[term] -= 1
+            if self.df[term] <= 0:
+                del self.df[term]
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'docs': self.docs, 'df': self.df},
+                      f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
+
+    # ---- 打分 ----
+
+    def idf(self, term: str) -> float:
+        return math.log((len(self.docs) + 1) / (self.df.get(term, 0) + 1)) + 1
+
+    def weigh(self, counts: Counter) -> dict[str, float]:
+        """返回 TF-IDF 权重（按词频做次线性缩放）"""
+        terms = list(counts)
+        if not terms:
+            return {}
+        if np is not None:
+            tf = 1 + np.log(np.fromiter((counts[t] for t in terms), dtype=np.float64, count=len(terms)))
+            df = np.fromiter((self.df.get(t, 0) for t in terms), dtype=np.float64, count=len(terms))
+            weights = tf * (np.log((len(self.docs) + 1) / (df + 1)) + 1)
+            return dict(zip(terms, weights.tolist()))
+        return {t: (1 + math.log(counts[t])) * self.idf(t) for t in terms}
+
+    def extract_tags(self, title: str, content: str, limit: int = 3) -> list[str]:
+        body_counts = Counter(tokenize(strip_markdown(content)))
+        counts = body_counts.copy()
+        for token in tokenize(title):
+            counts[token] += TITLE_WEIGHT
+        weights = self.weigh(counts)
+
+        # 子串归并：若更长的片段与其子串出现次数相当（如“策略梯度”与“策略梯”），只保留长的
+        absorbed = set()
+        for term, count in counts.items():
+            if len(term) < 3 or not CJK_RUN_RE.fullmatch(term):
+                continue
+            for n in range(2, len(term)):
+                for i in range(len(term) - n + 1):
+                    sub = term[i:i + n]
+                    if count >= ABSORB_RATIO * counts.get(sub, 0):
+                        absorbed.add(sub)
+
+        # 标签必须在正文中出现过，且总共至少出现两次（标题中的出现按 TITLE_WEIGHT 计）
+        candidates = heapq.nlargest(
+            limit * 8,
+            ((term, weight) for term, weight in weights.items()
+             if term not in absorbed and body_counts[term] and counts[term] >= 2),
+            key=lambda item: item[1],
+        )
+        tags: list[str] = []
+        for term, _ in candidates:
+            # 与已选标签有重叠的片段（如“化学习”之于“强化学习”）不再入选
+            if any(term[i:i + 2] in tag for tag in tags for i in range(max(1, len(term) - 1))):
+                continue
+            tags.append(term)
+            if len(tags) >= limit:
+                break
+        return tags
+
+    def extract_summary(self, title: str, content: str, max_length: int = 30) -> str:
+        """选出与全文 TF-IDF 向量余弦相似度最高的句子"""
+        text = strip_markdown(content)
+        sentences = split_sentences(text)
+        if not sentences:
+            return ''
+
+        doc_weights = self.weigh(Counter(tokenize(title + '\n' + text)))
+        doc_norm = math.sqrt(sum(w * w for w in doc_weights.values())) or 1.0
+
+        best_sentence, best_score = '', -1.0
+        for position, sentence in enumerate(sentences):
+            sentence_weights = self.weigh(Counter(tokenize(sentence)))
+            if not sentence_weights:
+                continue
+            dot = sum(w * doc_weights.get(t, 0.0) for t, w in sentence_weights.items())
+            norm = math.sqrt(sum(w * w for w in sentence_weights.values())) or 1.0
+            # 靠前的句子略微加分
+            score = dot / (norm * doc_norm) * (1 + 0.1 / (1 + position))
+            if score > best_score:
+                best_sentence, best_score = sentence, score
+
+        return best_sentence[:max_length]
+
+    def extract(self, title: str, content: str) -> tuple[list[str], str]:
+        return self.extract_tags(title, content), self.extract_summary(title, content)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='离线关键词索引与 tags/摘要提取')
+    parser.add_argument('files', nargs='*', help='要提取 tags 和摘要的文件')
+    parser.add_argument('--rebuild', action='store_true', help='丢弃现有索引并重建')
+    args = parser.parse_args(argv)
+
+    engine = KeywordEngine() if args.rebuild else KeywordEngine.load()
+    if args.rebuild:
+        engine._dirty = True
+    changed = engine.update()
+    engine.save()
+    print(f"📚 索引共 {len(engine.docs)} 篇文档，{len(engine.df)} 个词项（本次更新 {changed} 篇）")
+
+    for file_name in args.files:
+        path = Path(file_name)
+        text = strip_front_matter(path.read_text(encoding='utf-8'))
+        title_match = re.search(r'^#\s+(.+)$', text, re.MULTILINE)
+        title = title_match.group(1) if title_match else path.stem
+        tags, summary = engine.extract(title, text)
+        print(f"\n📄 {path.name}")
+        print(f"🏷️  tags: {', '.join(tags) or '（无）'}")
+        print(f"📝 summary: {summary or '（无）'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""chat/completions 接口的轻量客户端：共享 keep-alive 连接池 + 全局限速。
+
+同一个 ModelClient 可以被多个线程同时使用，所有请求复用一个 requests.Session，
+避免每次调用都重新建立 TLS 连接。
+
+每个 ModelClient 带有一个在整次运行中共享的熔断器（CircuitBreaker）：
+- 连续 failure_threshold 次请求失败（超时、网络错误、非 200）后熔断，之后的请求立即抛出 CircuitOpenError，
+  调用方直接改用离线规则，不再逐个等待超时
+- 熔断 reset_timeout 秒后进入半开状态，只放行一个试探请求：成功则恢复，失败则重新熔断且等待时间翻倍
+- 429 / 5xx 和连接错误视为暂时性错误，按指数退避加随机抖动重试；超时不重试，避免一次请求等待多个超时
+
+models.yaml 中配置了多个模型时，由 ModelRouter 在它们之间路由：
+- 记录每个模型最近的请求延迟和成败，每次请求发给当前最快的健康模型，失败时换下一个健康模型重试
+- 最近 HEALTH_WINDOW 次请求中失败过半的模型视为不健康，RETRY_AFTER 秒后才会再试探一次；熔断中的模型不参与路由，
+  所有模型都熔断时直接抛出 CircuitOpenError
+- 每 EXPLORE_EVERY 次请求选一次最久没有用过的健康模型，使其他模型的延迟数据保持更新
+- 开启 hedge 后，请求耗时超过所选模型延迟的 hedge_percentile 分位数（至少 hedge_min_delay 秒）时，
+  向第二快的健康模型再发一次同样的请求，取先成功返回的结果；单个服务商变慢时可以明显压低尾延迟
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Optional
+
+from instrumentation import log, recorder
+
+TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """熔断器处于打开状态，请求没有发出"""
+
+
+class CircuitBreaker:
+    """closed（正常）→ 连续失败达到阈值 → open（拒绝请求）→ 等待结束 → half_open（放行一个试探请求）"""
+
+    def __init__(self, name: str, *, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 max_reset_timeout: float = 300.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.trips = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """现在是否可能放行请求（不改变状态，供路由挑选模型）"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open':
+                return time.monotonic() - self._opened_at >= self.reset_timeout
+            return not self._probing
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self._probing = False
+            if self.state == 'closed':
+                return True
+            if self.state == 'half_open' and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            recovered = self.state != 'closed'
+            self.state = 'closed'
+            self.failures = 0
+            self._probing = False
+            self.reset_timeout = self.base_reset_timeout
+        if recovered:
+            log(f"✅ 模型 {self.name} 已恢复，重新调用模型")
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open':
+                # 试探失败：重新熔断，等待时间翻倍
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+            elif self.state == 'open' or self.failures < self.failure_threshold:
+                return
+            self.state = 'open'
+            self._opened_at = time.monotonic()
+            self._probing = False
+            self.trips += 1
+            failures, timeout = self.failures, self.reset_timeout
+        recorder.count('circuit_trips')
+        log(f"⚡ 模型 {self.name} 连续失败 {failures} 次，熔断 {timeout:g} 秒，期间直接使用离线规则",
+            model=self.name, failures=failures)
+
+
+class RateLimiter:
+    """简单的全局限速器：相邻两个请求的发出间隔不少于 1/rate 秒。"""
+
+    def __init__(self, rate: Optional[float] = None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ModelClient:
+    def __init__(self, model: dict, *, max_connections: int = 4,
+                 rate_limit: Optional[float] = None, timeout: float = 10,
+                 breaker: Optional[CircuitBreaker] = None, retries: int = 2,
+                 backoff: float = 0.5, max_backoff: float = 8.0):
+        self.model = model
+        self.max_connections = max(1, max_connections)
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.breaker = breaker or CircuitBreaker(model['name'])
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_connections)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.headers.update({
+                        'Authorization': f"Bearer {self.model['api_key']}",
+                        'Content-Type': 'application/json',
+                    })
+                    self._session = session
+        return self._session
+
+    def chat(self, messages: list[dict], *, max_tokens: int, temperature: float = 0.3) -> Optional[str]:
+        """发送一次对话请求，返回回复文本；HTTP 状态码非 200 时返回 None，网络错误直接抛出。
+        熔断期间不发出请求，直接抛出 CircuitOpenError；暂时性错误按指数退避重试。"""
+        if not self.breaker.allow():
+            recorder.count('circuit_rejected')
+            raise CircuitOpenError(self.model['name'])
+
+        import requests
+
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                response = self.post(messages, max_tokens, temperature)
+            except requests.exceptions.Timeout:
+                self.breaker.record_failure()
+                raise
+            except requests.exceptions.ConnectionError:
+                if attempt == self.retries:
+                    self.breaker.record_failure()
+                    raise
+            except requests.RequestException:
+                # 其他请求错误（响应体读取中断、解码失败、重定向过多等）同样计为失败，
+                # 否则半开状态的试探请求既不成功也不失败，熔断器会一直拒绝后续请求
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code == 200:
+                    # 解析成功才算成功：200 但响应体格式错误同样计为失败
+                    try:
+                        content = response.json()['choices'][0]['message']['content'].strip()
+                    except (requests.RequestException, ValueError, KeyError, IndexError, TypeError, AttributeError):
+                        self.breaker.record_failure()
+                        raise
+                    self.breaker.record_success()
+                    return content
+                if response.status_code not in TRANSIENT_STATUS or attempt == self.retries:
+                    self.breaker.record_failure()
+                    return None
+                retry_after = response.headers.get('Retry-After')
+            recorder.count('model_retries')
+            with recorder.span('retry_backoff', 'model', attempt=attempt + 1):
+                time.sleep(self.backoff_delay(attempt, retry_after))
+        return None
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """指数退避 + 全抖动；服务端给出 Retry-After 时以它为准（不超过 max_backoff）"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def post(self, messages: list[dict], max_tokens: int, temperature: float):
+        with recorder.span('rate_limit_wait', 'model'):
+            self.rate_limiter.acquire()
+        start = time.perf_counter()
+        with recorder.span('model_call', 'model', model=self.model['name'], max_tokens=max_tokens) as span:
+            response = self.session.post(
+                f"{self.model['base_url']}/chat/completions",
+                json={
+                    "model": self.model['name'],
+                    "messages": messages,
+                    "max_tokens": max_tokens,
+                    "temperature": temperature,
+                },
+                timeout=self.timeout,
+            )
+            if recorder.enabled:
+                span.args['status'] = response.status_code
+        recorder.observe('model_latency_ms', (time.perf_counter() - start) * 1000)
+        recorder.count(f"model_status_{response.status_code}")
+        return response
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+HEALTH_WINDOW = 10
+RETRY_AFTER = 30.0
+EXPLORE_EVERY = 20
+MIN_LATENCY_SAMPLES = 5
+DEFAULT_HEDGE_DELAY = 2.0
+
+
+class ModelStats:
+    """单个模型最近若干次请求的延迟（只统计成功的请求）和成败"""
+
+    def __init__(self, window: int = 50):
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=HEALTH_WINDOW)
+        self.requests = 0
+        self.errors = 0
+        self.last_used = 0.0
+        self.last_failure = 0.0
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.requests += 1
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+        else:
+            self.errors += 1
+            self.last_failure = time.monotonic()
+
+    def healthy(self, now: float) -> bool:
+        if len(self.outcomes) < 4 or self.outcomes.count(False) * 2 < len(self.outcomes):
+            return True
+        return now - self.last_failure >= RETRY_AFTER
+
+    def latency(self, percentile: float = 50, recent: Optional[int] = None) -> Optional[float]:
+        """延迟的分位数；recent 指定时只看最近 recent 次成功的请求"""
+        samples = list(self.latencies)[-recent:] if recent else self.latencies
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+
+class ModelRouter:
+    """在多个 ModelClient 之间按延迟和健康状况路由，接口与 ModelClient 相同（chat / close）"""
+
+    def __init__(self, clients: list[ModelClient], *, hedge: bool = False, hedge_percentile: float = 90,
+                 hedge_min_delay: float = 0.5, window: int = 50):
+        self.clients = clients
+        # 响应缓存的键使用第一个模型：同一个提示词无论由哪个模型回答，都只缓存一份
+        self.model = clients[0].model
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.stats = [ModelStats(window) for _ in clients]
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    def ranked(self) -> list[int]:
+        """健康的模型按最近的延迟中位数排序（没有数据的排在后面，按配置顺序），不健康的排在最后"""
+        now = time.monotonic()
+        available = [client.breaker.available() for client in self.clients]
+        if not any(available):
+            recorder.count('circuit_rejected')
+            raise CircuitOpenError(', '.join(client.model['name'] for client in self.clients))
+        with self._lock:
+            self._requests += 1
+            healthy = [stats.healthy(now) and available[index] for index, stats in enumerate(self.stats)]
+
+            def key(index: int):
+                latency = self.stats[index].latency(recent=HEALTH_WINDOW)
+                return (not healthy[index], latency is None, latency or 0.0, index)
+
+            order = sorted(range(len(self.clients)), key=key)
+            if self._requests % EXPLORE_EVERY == 0:
+                candidates = [index for index in order if healthy[index]]
+                if len(candidates) > 1:
+                    stale = min(candidates, key=lambda index: self.stats[index].last_used)
+                    order.remove(stale)
+                    order.insert(0, stale)
+            self.stats[order[0]].last_used = now
+            return [index for index in order if healthy[index]] or [index for index in order if available[index]][:1]
+
+    def call(self, index: int, messages: list[dict], max_tokens: int, temperature: float) -> Optional[str]:
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = self.clients[index].chat(messages, max_tokens=max_tokens, temperature=temperature)
+            ok = result is not None
+            return result
+        except CircuitOpenError:
+            # 请求没有发出，不计入延迟和失败统计
+            start = None
+            raise
+        finally:
+            if start is not None:
+                with self._lock:
+                    self.stats[index].record(time.perf_counter() - start, ok)
+
+    def submit(self, index: int, messages: list[dict], max_tokens: int, temperature: float) -> Future:
+        """在独立的守护线程中发出请求。落后的请求可能一直持续到超时，不能占用有限的线程池，
+        否则后续请求会排队等待它们"""
+        future: Future = Future()
+
+        def run() -> None:
+            try:
+                future.set_result(self.call(index, messages, max_tokens, temperature))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f"hedge-{index}", daemon=True).start()
+        return future
+
+    def hedge_delay(self, index: int) -> float:
+        with self._lock:
+            stats = self.stats[index]
+            latency = stats.latency(self.hedge_percentile) if len(stats.latencies) >= MIN_LATENCY_SAMPLES else None
+        return max(self.hedge_min_delay, latency if latency is not None else DEFAULT_HEDGE_DELAY)
+
+    def chat(self, messages: list[dict], *, max_tokens: int, temperature: float = 0.3) -> Optional[str]:
+        """发给当前最快的健康模型；失败时换下一个健康模型。全部失败时返回 None 或抛出最后一个异常"""
+        order = self.ranked()
+        primary, backups = order[0], order[1:2]
+        if self.hedge and backups:
+            return self.hedged_chat(primary, backups[0], messages, max_tokens, temperature)
+
+        error: Optional[Exception] = None
+        for index in [primary] + backups:
+            try:
+                result = self.call(index, messages, max_tokens, temperature)
+            except Exception as e:
+                error = e
+                continue
+            if result is not None:
+                return result
+        if error is not None:
+            raise error
+        return None
+
+    def hedged_chat(self, primary: int, backup: int, messages: list[dict], max_tokens: int,
+                    temperature: float) -> Optional[str]:
+        futures = {self.submit(primary, messages, max_tokens, temperature): primary}
+        done, _ = wait(futures, timeout=self.hedge_delay(primary))
+        if not done:
+            # 所选模型比平时慢：向第二个模型发同样的请求，两者竞速
+            futures[self.submit(backup, messages, max_tokens, temperature)] = backup
+            with self._lock:
+                self.hedged += 1
+            recorder.count('model_hedged')
+
+        error: Optional[Exception] = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if result is not None:
+                    # 落后的请求在后台继续完成，只用于更新延迟统计
+                    if futures[future] == backup:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return result
+
+        # 所选模型在对冲之前就失败了：直接换第二个模型
+        if len(futures) == 1:
+            try:
+                result = self.call(backup, messages, max_tokens, temperature)
+            except Exception as e:
+                error = e
+            else:
+                if result is not None:
+                    return result
+        if error is not None:
+            raise error
+        return None
+
+    def summary(self) -> list[dict]:
+        with self._lock:
+            return [{
+                'model': client.model['name'],
+                'requests': stats.requests,
+                'errors': stats.errors,
+                'p50': stats.latency(50),
+                'p90': stats.latency(90),
+            } for client, stats in zip(self.clients, self.stats)]
+
+    def close(self) -> None:
+        for client in self.clients:
+            client.close()
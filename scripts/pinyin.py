@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""离线汉字转拼音，用于把中文标题转成文件名（slug），不需要任何网络请求。
+
+- 拼音表：`scripts/data/pinyin_table.txt`（由 build_pinyin_table.py 生成），
+  以字符串按码位直接索引音节编号，第一次使用时才加载
+- 多音字：按多音词组做正向最长匹配（如“银行”读 yin-hang、“重庆”读 chong-qing）
+- 英文和数字原样保留（统一小写），其余标点作为分隔符
+- 转换结果做了记忆化，同一标题重复转换不再查表
+
+使用方法：
+python3 scripts/pinyin.py 强化学习入门笔记     # 输出 qiang-hua-xue-xi-ru-men-bi-ji
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+TABLE_PATH = Path(__file__).resolve().parent / 'data' / 'pinyin_table.txt'
+TABLE_BASE = 0x100  # 与 build_pinyin_table.py 保持一致
+SLUG_MAX_LENGTH = 80
+
+TOKEN_RE = re.compile(r'[㐀-鿿]+|[a-z0-9]+')
+
+
+class PinyinTable(NamedTuple):
+    start: int
+    syllables: tuple[str, ...]
+    table: str
+    phrases: dict[str, tuple[str, ...]]
+    max_phrase_length: int
+
+    def syllable(self, char: str) -> str:
+        """单个汉字的默认读音，表中没有时返回空字符串"""
+        index = ord(char) - self.start
+        if 0 <= index < len(self.table):
+            return self.syllables[ord(self.table[index]) - TABLE_BASE]
+        return ''
+
+    def segment(self, run: str) -> list[str]:
+        """对连续汉字做正向最长匹配，词组优先使用词组读音"""
+        result = []
+        i = 0
+        while i < len(run):
+            for length in range(min(self.max_phrase_length, len(run) - i), 1, -1):
+                reading = self.phrases.get(run[i:i + length])
+                if reading:
+                    result.extend(reading)
+                    i += length
+                    break
+            else:
+                result.append(self.syllable(run[i]))
+                i += 1
+        return [syllable for syllable in result if syllable]
+
+
+@lru_cache(maxsize=None)
+def load_table(path: Path = TABLE_PATH) -> PinyinTable:
+    start = 0
+    syllables: tuple[str, ...] = ('',)
+    table = ''
+    phrases: dict[str, tuple[str, ...]] = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        section = None
+        for line in f:
+            line = line.rstrip('\n')
+            if line.startswith('#') or not line:
+                continue
+            if line.startswith('@'):
+                section, _, value = line[1:].partition(' ')
+                if section == 'range':
+                    start = int(value.split()[0], 16)
+                elif section == 'syllables':
+                    syllables = ('',) + tuple(value.split())
+                continue
+            if section == 'table':
+                table = line
+            elif section == 'phrases':
+                phrase, *reading = line.split()
+                phrases[phrase] = tuple(reading)
+    return PinyinTable(start, syllables, table, phrases, max(map(len, phrases), default=1))
+
+
+@lru_cache(maxsize=4096)
+def transliterate(text: str) -> tuple[str, ...]:
+    """把文本拆成拼音音节和英文/数字单词"""
+    # NFKC 把全角字母、数字转成半角
+    text = unicodedata.normalize('NFKC', text).lower()
+    words: list[str] = []
+    for match in TOKEN_RE.finditer(text):
+        token = match.group(0)
+        if token[0].isascii():
+            words.append(token)
+        else:
+            words.extend(load_table().segment(token))
+    return tuple(words)
+
+
+@lru_cache(maxsize=4096)
+def slugify(text: str, max_length: int = SLUG_MAX_LENGTH) -> str:
+    """转换成小写、以连字符分隔的 slug，超长时在音节边界截断；没有可用字符时返回空字符串"""
+    slug = ''
+    for word in transliterate(text):
+        candidate = f"{slug}-{word}" if slug else word
+        if len(candidate) > max_length:
+            break
+        slug = candidate
+    return slug
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='把中文标题转换成拼音 slug')
+    parser.add_argument('titles', nargs='+', help='要转换的标题')
+    args = parser.parse_args(argv)
+
+    for title in args.titles:
+        print(slugify(title))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""预先计算每篇文章的相关文章：稀疏 TF-IDF 向量 + 余弦相似度 top-k。
+
+输出 `src/data/related-posts.json`（slug -> 相关文章 slug 列表），文章页直接读取，
+不必在每次 `astro build` 时两两比较全部文章：
+- 分词与 keywords.py 相同（中文 2~4 字 n-gram、英文单词），标题中的词按 TITLE_WEIGHT 计，
+  IDF 直接使用 keywords.py 增量维护的文档频率索引
+- 每篇文章只保留权重最高的 MAX_TERMS 个词并做 L2 归一化；出现在一半以上文档中的词区分度很低，直接忽略
+- 相似度通过倒排表累加（稀疏矩阵与稀疏向量相乘），只计算至少共享一个词的文章对
+- 增量更新：只重新计算变化过的文章所在的行，以及 top-k 中含有变化文章的行；
+  其余行只把变化文章的新得分合并进去。未变化文章的向量沿用上次计算的结果，
+  语料的文档数相比上次全量计算时变化超过 IDF_DRIFT 时自动全量重算
+
+状态保存在 `.cache/related-posts-state.json`，结果与上次相同时不改写输出文件。
+
+使用方法：
+python3 scripts/related_posts.py            # 增量更新
+python3 scripts/related_posts.py --rebuild  # 全量重算
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import math
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from content_scanner import iter_content_files
+from front_matter import read_front_matter
+from instrumentation import log
+from keywords import TITLE_WEIGHT, KeywordEngine, strip_front_matter, strip_markdown, tokenize
+from site_index import content_slug
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+OUTPUT_PATH = PROJECT_ROOT / 'src' / 'data' / 'related-posts.json'
+STATE_PATH = PROJECT_ROOT / '.cache' / 'related-posts-state.json'
+STATE_VERSION = 1
+TOP_K = 5
+MAX_TERMS = 64
+MAX_DF_RATIO = 0.5
+MIN_SCORE = 0.05
+IDF_DRIFT = 0.2
+
+
+class RelatedPosts:
+    def __init__(self, root: Path = PROJECT_ROOT, state_path: Path = STATE_PATH, output_path: Path = OUTPUT_PATH,
+                 top_k: int = TOP_K):
+        self.root = Path(os.path.abspath(root))
+        self.state_path = state_path
+        self.output_path = output_path
+        self.top_k = top_k
+        # key -> {size, mtime_ns, slug, vector: {词: 权重}}；草稿的 slug 为 None，不参与计算
+        self.docs: dict[str, dict] = {}
+        self.rows: dict[str, list[list]] = {}     # key -> [[key, 得分], ...]，按得分降序
+        self.corpus_size = 0                       # 上次全量计算时语料的文档数
+        self._engine: Optional[KeywordEngine] = None
+        self._dirty = False
+
+    @classmethod
+    def load(cls, root: Path = PROJECT_ROOT, state_path: Path = STATE_PATH,
+             output_path: Path = OUTPUT_PATH) -> 'RelatedPosts':
+        related = cls(root, state_path, output_path)
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return related
+        if data.get('version') == STATE_VERSION and data.get('top_k') == related.top_k:
+            related.docs = data['docs']
+            related.rows = data['rows']
+            related.corpus_size = data['corpus_size']
+        return related
+
+    # ---- 向量 ----
+
+    @property
+    def engine(self) -> KeywordEngine:
+        """IDF 来自 keywords.py 的文档频率索引（blog + diary），使用前先增量更新"""
+        if self._engine is None:
+            self._engine = KeywordEngine.load(self.root, self.root / '.cache' / 'keyword-index.json')
+            if self._engine.update():
+                self._engine.save()
+        return self._engine
+
+    def vectorize(self, path: Path) -> dict[str, float]:
+        fm = read_front_matter(path)
+        title = str(fm.get('title') or path.stem)
+        text = path.read_text(encoding='utf-8', errors='replace')
+        counts = Counter(tokenize(strip_markdown(strip_front_matter(text))))
+        for token in tokenize(title):
+            counts[token] += TITLE_WEIGHT
+
+        engine = self.engine
+        max_df = MAX_DF_RATIO * len(engine.docs)
+        weights = {term: (1 + math.log(count)) * engine.idf(term) for term, count in counts.items()
+                   if len(engine.docs) < 4 or engine.df.get(term, 0) <= max_df}
+        top = heapq.nlargest(MAX_TERMS, weights.items(), key=lambda item: item[1])
+        norm = math.sqrt(sum(weight * weight for _, weight in top)) or 1.0
+        return {term: round(weight / norm, 6) for term, weight in top}
+
+    def postings(self) -> dict[str, list[tuple[str, float]]]:
+        """倒排表：词 -> [(key, 权重), ...]"""
+        result: dict[str, list[tuple[str, float]]] = {}
+        for key, doc in self.docs.items():
+            for term, weight in doc['vector'].items():
+                result.setdefault(term, []).append((key, weight))
+        return result
+
+    @staticmethod
+    def scores(vector: dict[str, float], postings: dict[str, list[tuple[str, float]]]) -> dict[str, float]:
+        """一行相似度：稀疏向量与整个矩阵相乘，只访问共享词的文章"""
+        result: dict[str, float] = {}
+        for term, weight in vector.items():
+            for other, other_weight in postings.get(term, ()):
+                result[other] = result.get(other, 0.0) + weight * other_weight
+        return result
+
+    def top(self, key: str, scores: dict[str, float]) -> list[list]:
+        # 与增量合并时的排序一致：得分降序，同分按 key 升序
+        best = heapq.nsmallest(self.top_k, ((-round(score, 4), other) for other, score in scores.items()
+                                            if other != key and score >= MIN_SCORE))
+        return [[other, -score] for score, other in best]
+
+    # ---- 更新 ----
+
+    def update(self, rebuild: bool = False) -> int:
+        """重新读取变化过的文章并更新受影响的行。返回变化的文章数"""
+        content_dir = self.root / 'src' / 'content' / 'blog'
+        items = {item.path.relative_to(content_dir).as_posix(): item for item in iter_content_files(content_dir)}
+        changed = {key for key, item in items.items()
+                   if key not in self.docs or (self.docs[key]['size'], self.docs[key]['mtime_ns'])
+                   != (item.stat.st_size, item.stat.st_mtime_ns)}
+        removed = {key for key in self.docs if key not in items}
+        if not changed and not removed and not rebuild:
+            return 0
+
+        # 语料规模变化较大时 IDF 已明显不同，全部向量重新计算
+        corpus_size = len(self.engine.docs)
+        if abs(corpus_size - self.corpus_size) > IDF_DRIFT * max(1, self.corpus_size):
+            rebuild = True
+
+        for key in removed:
+            del self.docs[key]
+            self.rows.pop(key, None)
+        for key in sorted(items if rebuild else changed):
+            item = items[key]
+            try:
+                draft = read_front_matter(item.path).get('draft') is True
+                vector = {} if draft else self.vectorize(item.path)
+            except (OSError, UnicodeDecodeError) as e:
+                log(f"⚠️  读取 {key} 失败：{e}", path=key, error=str(e))
+                self.docs.pop(key, None)
+                continue
+            self.docs[key] = {'size': item.stat.st_size, 'mtime_ns': item.stat.st_mtime_ns,
+                              'slug': None if draft else content_slug(key), 'vector': vector}
+
+        if rebuild:
+            self.corpus_size = corpus_size
+            postings = self.postings()
+            self.rows = {key: self.top(key, self.scores(doc['vector'], postings))
+                         for key, doc in self.docs.items() if doc['slug']}
+        else:
+            self.update_rows({key for key in changed if key in self.docs}, removed | (changed - self.docs.keys()))
+        self._dirty = True
+        return len(changed) + len(removed)
+
+    def update_rows(self, changed: set[str], removed: set[str]) -> None:
+        postings = self.postings()
+
+        # top-k 中含有变化或删除文章的行需要整行重算（第 k+1 名未知）
+        affected = set(changed) | {key for key, row in self.rows.items()
+                                   if any(other in changed or other in removed for other, _ in row)}
+        for key in affected:
+            doc = self.docs.get(key)
+            if doc and doc['slug']:
+                self.rows[key] = self.top(key, self.scores(doc['vector'], postings))
+            else:
+                self.rows.pop(key, None)
+
+        # 其余行只可能因为变化的文章得分更高而改变：把新得分合并进去
+        for key in changed:
+            for other, score in self.scores(self.docs[key]['vector'], postings).items():
+                if other == key or other in affected or score < MIN_SCORE:
+                    continue
+                score = round(score, 4)
+                row = self.rows.setdefault(other, [])
+                if len(row) < self.top_k or (-score, key) < (-row[-1][1], row[-1][0]):
+                    row.append([key, score])
+                    row.sort(key=lambda item: (-item[1], item[0]))
+                    del row[self.top_k:]
+
+    # ---- 输出 ----
+
+    def aggregate(self) -> dict[str, list[str]]:
+        result = {}
+        for key, row in sorted(self.rows.items(), key=lambda item: self.docs[item[0]]['slug']):
+            slugs = [self.docs[other]['slug'] for other, _ in row if self.docs.get(other, {}).get('slug')]
+            if slugs:
+                result[self.docs[key]['slug']] = slugs
+        return result
+
+    def write(self) -> bool:
+        """写出相关文章列表，内容与现有文件相同时跳过。返回是否写入"""
+        text = json.dumps(self.aggregate(), ensure_ascii=False, separators=(',', ':')) + '\n'
+        try:
+            if self.output_path.read_text(encoding='utf-8') == text:
+                return False
+        except OSError:
+            pass
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.output_path.with_name(self.output_path.name + '.tmp')
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, self.output_path)
+        return True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(self.state_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': STATE_VERSION, 'top_k': self.top_k, 'corpus_size': self.corpus_size,
+                       'docs': self.docs, 'rows': self.rows}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.state_path)
+        self._dirty = False
+
+
+def refresh(root: Path = PROJECT_ROOT) -> bool:
+    """增量更新并写出相关文章，供其他脚本在改写 blog 后调用。返回输出文件是否变化"""
+    related = RelatedPosts.load(root)
+    related.update()
+    written = related.write()
+    related.save()
+    return written
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='预先计算每篇文章的相关文章')
+    parser.add_argument('--rebuild', action='store_true', help='忽略缓存，全量重算')
+    args = parser.parse_args(argv)
+
+    related = RelatedPosts() if args.rebuild else RelatedPosts.load()
+    changed = related.update(rebuild=args.rebuild)
+    written = related.write()
+    related.save()
+
+    aggregate = related.aggregate()
+    print(f"🔗 {len(aggregate)} 篇文章有相关文章（本次变化 {changed} 篇）")
+    print("✅ 已更新 src/data/related-posts.json" if written else "✅ 相关文章没有变化")
+
+
+if __name__ == '__main__':
+    main()
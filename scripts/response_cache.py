@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""模型响应的磁盘缓存：按 (模型, 提示词模板, 输入 hash) 记忆化，支持 LRU 淘汰和 TTL。
+
+缓存保存在 `.cache/model-responses.sqlite3`。同一标题或正文再次处理时直接复用
+上次的翻译 / tags / summary，不再重复请求模型。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from instrumentation import recorder
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CACHE_PATH = PROJECT_ROOT / '.cache' / 'model-responses.sqlite3'
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_TTL = 90 * 24 * 3600
+
+
+def make_key(model_name: str, template: str, text: str) -> str:
+    digest = hashlib.sha256()
+    for part in (model_name, template, text):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path: Path = CACHE_PATH, *, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl: Optional[float] = DEFAULT_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            import sqlite3
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                ' key TEXT PRIMARY KEY, value TEXT NOT NULL,'
+                ' created_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute('SELECT value, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self.conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self.conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                recorder.count('cache_miss')
+                return None
+            self.conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            self.conn.commit()
+            self.hits += 1
+        recorder.count('cache_hit')
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            # 超出容量时淘汰最久未访问的条目
+            self.conn.execute(
+                'DELETE FROM responses WHERE key IN ('
+                ' SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,),
+            )
+            self.conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.conn.execute('DELETE FROM responses')
+            self.conn.commit()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate}
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""站内搜索的倒排索引：按词项前缀分片，浏览器只下载查询用到的分片。
+
+输出到 `public/search/`（构建时原样拷贝到站点根目录）：
+- manifest.json：文档数、每个分片覆盖的词项范围（按下界排序）和文档表的分块大小
+- s<n>.json：一个分片，词项 -> 倒排表。倒排表为 (文档 id 差值, 权重) 的 varint 序列再做 base64，
+  文档 id 升序存放，差值通常只有 1 个字节
+- d<n>.json：文档表的一块，文档 id -> [slug, 标题, 日期]，只在展示结果时按需下载
+
+分词：中文取相邻两字（bigram，单独一个汉字时取单字），英文和数字按单词切分，统一 NFKC 归一化并小写。
+只索引会出现在站点上的文章（有 date、不是草稿），权重为 标题 × 8 + 标签 × 6 + 摘要 × 3 + 正文出现次数（最多计 10 次）。
+
+增量更新：状态保存在 `.cache/search-index-state.json`，记录每篇文章的 size/mtime、文档 id 和出现在哪些分片中。
+再次运行时只重新分词变化过的文章，只改写涉及的分片和文档表分块；分片超过 2 × SHARD_BYTES 时拆分，
+已有分片的文件名保持不变，浏览器缓存仍然有效。全量构建等价于从一个空分片开始的增量更新。
+
+查询逻辑与 `src/lib/search.ts` 一致：所有 bigram / 单词都要命中（AND），查询末尾的英文单词和单个汉字按前缀匹配，
+得分为 Σ idf × w / (w + 4)。
+
+使用方法：
+python3 scripts/search_index.py                  # 增量更新
+python3 scripts/search_index.py --rebuild        # 全量重建
+python3 scripts/search_index.py --query 强化学习  # 在本地索引上试查询
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import math
+import os
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Optional
+
+from content_scanner import iter_content_files
+from instrumentation import log
+from keywords import CJK_RUN_RE, strip_front_matter, strip_markdown
+from site_index import read_record
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+OUTPUT_DIR = PROJECT_ROOT / 'public' / 'search'
+STATE_PATH = PROJECT_ROOT / '.cache' / 'search-index-state.json'
+INDEX_VERSION = 1
+SHARD_BYTES = 32 * 1024
+DOC_CHUNK = 512
+MAX_TERM_LENGTH = 24
+FIELD_WEIGHTS = {'title': 8, 'tags': 6, 'summary': 3}
+BODY_CAP = 10
+SATURATION = 4
+
+TOKEN_RE = re.compile(f"{CJK_RUN_RE.pattern}|[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize('NFKC', text).lower()
+
+
+def tokenize(text: str) -> list[str]:
+    """中文取 bigram（单独一个汉字取单字），英文和数字取长度不少于 2 的单词"""
+    tokens = []
+    for match in TOKEN_RE.finditer(normalize(text)):
+        token = match.group(0)
+        if token[0] < '\u0080':
+            if len(token) >= 2:
+                tokens.append(token[:MAX_TERM_LENGTH])
+        elif len(token) == 1:
+            tokens.append(token)
+        else:
+            tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+    return tokens
+
+
+def query_groups(query: str) -> list[tuple[str, bool]]:
+    """把查询拆成 (词项, 是否前缀匹配)：末尾的英文单词和单个汉字按前缀匹配，方便边输入边搜索"""
+    text = normalize(query)
+    matches = list(TOKEN_RE.finditer(text))
+    groups = []
+    for i, match in enumerate(matches):
+        token = match.group(0)
+        last = i == len(matches) - 1 and match.end() == len(text)
+        if token[0] < '\u0080':
+            if len(token) >= 2:
+                groups.append((token[:MAX_TERM_LENGTH], last and len(token) < MAX_TERM_LENGTH))
+        elif len(token) == 1:
+            groups.append((token, True))
+        else:
+            groups.extend((token[j:j + 2], False) for j in range(len(token) - 1))
+    return list(dict.fromkeys(groups))
+
+
+def term_weights(record: dict, body: str) -> dict[str, int]:
+    weights: Counter = Counter()
+    fields = {'title': record['title'], 'tags': ' '.join(record['tags']), 'summary': record['summary']}
+    for name, text in fields.items():
+        for term in set(tokenize(text)):
+            weights[term] += FIELD_WEIGHTS[name]
+    for term, count in Counter(tokenize(strip_markdown(body))).items():
+        weights[term] += min(count, BODY_CAP)
+    return dict(weights)
+
+
+# ---- 倒排表编码 ----
+
+def encode_postings(postings: Iterable[tuple[int, int]]) -> str:
+    """[(文档 id, 权重), ...]（id 升序）-> base64(varint(id 差值), varint(权重), ...)"""
+    out = bytearray()
+    previous = 0
+    for doc, weight in postings:
+        for value in (doc - previous, weight):
+            while value >= 0x80:
+                out.append(value & 0x7f | 0x80)
+                value >>= 7
+            out.append(value)
+        previous = doc
+    return base64.b64encode(out).decode('ascii')
+
+
+def decode_postings(encoded: str) -> list[tuple[int, int]]:
+    data = base64.b64decode(encoded)
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    postings = []
+    doc = 0
+    for i in range(0, len(values), 2):
+        doc += values[i]
+        postings.append((doc, values[i + 1]))
+    return postings
+
+
+def entry_size(term: str, encoded: str) -> int:
+    return len(term.encode('utf-8')) + len(encoded) + 6
+
+
+class SearchIndex:
+    def __init__(self, root: Path = PROJECT_ROOT, state_path: Path = STATE_PATH, output_dir: Path = OUTPUT_DIR):
+        self.root = Path(os.path.abspath(root))
+        self.state_path = state_path
+        self.output_dir = output_dir
+        # key -> {size, mtime_ns, id, record, shards}；不会出现在站点上的文章 id 为 None
+        self.docs: dict[str, dict] = {}
+        self.shards: list[list[str]] = [['', 's0']]   # [[词项下界, 文件名], ...]，按下界排序
+        self.next_shard = 1
+        self._dirty = False
+
+    @classmethod
+    def load(cls, root: Path = PROJECT_ROOT, state_path: Path = STATE_PATH,
+             output_dir: Path = OUTPUT_DIR) -> 'SearchIndex':
+        index = cls(root, state_path, output_dir)
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        # 输出目录被清理过（如全新 clone）时状态已经失效，全量重建
+        if data.get('version') == INDEX_VERSION and (output_dir / 'manifest.json').exists():
+            index.docs = data['docs']
+            index.shards = data['shards']
+            index.next_shard = data['next_shard']
+        return index
+
+    # ---- 分片 ----
+
+    def shard_of(self, term: str, lows: Optional[list[str]] = None) -> str:
+        lows = lows if lows is not None else [low for low, _ in self.shards]
+        return self.shards[bisect_right(lows, term) - 1][1]
+
+    def read_shard(self, name: str) -> dict[str, list[tuple[int, int]]]:
+        try:
+            with open(self.output_dir / f"{name}.json", 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {term: decode_postings(encoded) for term, encoded in data.items()}
+
+    def write_file(self, name: str, data) -> None:
+        text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        path = self.output_dir / name
+        try:
+            if path.read_text(encoding='utf-8') == text:
+                return
+        except OSError:
+            pass
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    def split(self, encoded: dict[str, str]) -> list[dict[str, str]]:
+        """按编码后的大小把一个分片切成若干块，每块约 SHARD_BYTES"""
+        pieces: list[dict[str, str]] = [{}]
+        size = 0
+        for term in sorted(encoded):
+            if size >= SHARD_BYTES:
+                pieces.append({})
+                size = 0
+            pieces[-1][term] = encoded[term]
+            size += entry_size(term, encoded[term])
+        return pieces
+
+    def rewrite_shard(self, name: str, postings: dict[str, list[tuple[int, int]]], owners: dict[int, str]) -> None:
+        encoded = {term: encode_postings(sorted(items)) for term, items in postings.items() if items}
+        if sum(entry_size(term, value) for term, value in encoded.items()) <= 2 * SHARD_BYTES:
+            self.write_file(f"{name}.json", dict(sorted(encoded.items())))
+            return
+
+        # 拆分：第一块沿用原文件名（下界不变），其余各块使用新文件名
+        pieces = self.split(encoded)
+        position = next(i for i, (_, shard) in enumerate(self.shards) if shard == name)
+        self.write_file(f"{name}.json", pieces[0])
+        for offset, piece in enumerate(pieces[1:], start=1):
+            new_name = f"s{self.next_shard}"
+            self.next_shard += 1
+            self.shards.insert(position + offset, [min(piece), new_name])
+            self.write_file(f"{new_name}.json", piece)
+            # 未变化的文章也可能有词项被分到新分片，记下以便之后删除时找到
+            for doc in {doc for term in piece for doc, _ in postings[term]}:
+                key = owners.get(doc)
+                if key is not None and new_name not in self.docs[key]['shards']:
+                    self.docs[key]['shards'].append(new_name)
+
+    # ---- 更新 ----
+
+    def update(self, rebuild: bool = False) -> int:
+        """重新分词变化过的文章，改写涉及的分片和文档表。返回变化的文章数"""
+        if rebuild:
+            self.docs = {}
+            self.shards = [['', 's0']]
+            self.next_shard = 1
+        content_dir = self.root / 'src' / 'content' / 'blog'
+        items = {item.path.relative_to(content_dir).as_posix(): item for item in iter_content_files(content_dir)}
+        changed = [key for key, item in sorted(items.items())
+                   if key not in self.docs or (self.docs[key]['size'], self.docs[key]['mtime_ns'])
+                   != (item.stat.st_size, item.stat.st_mtime_ns)]
+        removed = [key for key in self.docs if key not in items]
+        if not changed and not removed and not rebuild:
+            return 0
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stale_ids = set()
+        dirty_shards = set()
+        dirty_chunks = set()
+        for key in removed + changed:
+            doc = self.docs.get(key)
+            if doc and doc['id'] is not None:
+                stale_ids.add(doc['id'])
+                dirty_shards.update(doc['shards'])
+                dirty_chunks.add(doc['id'] // DOC_CHUNK)
+        for key in removed:
+            del self.docs[key]
+
+        # 新的文档 id：沿用原来的 id，新文章取最小的空闲 id
+        used = {doc['id'] for doc in self.docs.values() if doc['id'] is not None}
+        free = (i for i in range(len(used) + len(changed) + 1) if i not in used)
+        fresh: dict[str, dict[str, int]] = {}
+        for key in changed:
+            item = items[key]
+            old_id = self.docs.get(key, {}).get('id')
+            try:
+                record = read_record('blog', item.path, item.stat, key)
+                body = strip_front_matter(item.path.read_text(encoding='utf-8-sig', errors='replace'))
+            except (OSError, UnicodeDecodeError) as e:
+                log(f"⚠️  读取 blog/{key} 失败：{e}", path=f"blog/{key}", error=str(e))
+                self.docs.pop(key, None)
+                continue
+            doc_id = None
+            if record is not None:
+                doc_id = old_id if old_id is not None else next(free)
+                used.add(doc_id)
+                fresh[key] = term_weights(record, body)
+                dirty_chunks.add(doc_id // DOC_CHUNK)
+            self.docs[key] = {'size': item.stat.st_size, 'mtime_ns': item.stat.st_mtime_ns,
+                              'id': doc_id, 'record': record, 'shards': []}
+
+        lows = [low for low, _ in self.shards]
+        additions: dict[str, dict[str, list[tuple[int, int]]]] = {}
+        for key, weights in fresh.items():
+            doc_id = self.docs[key]['id']
+            for term, weight in weights.items():
+                name = self.shard_of(term, lows)
+                additions.setdefault(name, {}).setdefault(term, []).append((doc_id, weight))
+        dirty_shards.update(additions)
+
+        owners = {doc['id']: key for key, doc in self.docs.items() if doc['id'] is not None}
+        for name in sorted(dirty_shards & {shard for _, shard in self.shards}):
+            postings = self.read_shard(name) if not rebuild else {}
+            if stale_ids:
+                postings = {term: [p for p in items if p[0] not in stale_ids] for term, items in postings.items()}
+            for term, items in additions.get(name, {}).items():
+                postings.setdefault(term, []).extend(items)
+            self.rewrite_shard(name, postings, owners)
+
+        # 变化的文章在拆分之后重新确定所在的分片
+        lows = [low for low, _ in self.shards]
+        for key, weights in fresh.items():
+            self.docs[key]['shards'] = sorted({self.shard_of(term, lows) for term in weights})
+
+        records = {doc['id']: doc['record'] for doc in self.docs.values() if doc['id'] is not None}
+        for chunk in sorted(dirty_chunks):
+            start = chunk * DOC_CHUNK
+            rows = []
+            for doc_id in range(start, start + DOC_CHUNK):
+                record = records.get(doc_id)
+                rows.append([record['slug'], record['title'], record['date']] if record else None)
+            while rows and rows[-1] is None:
+                rows.pop()
+            self.write_file(f"d{chunk}.json", rows)
+        self.write_file('manifest.json', {'version': INDEX_VERSION, 'docs': len(records), 'chunk': DOC_CHUNK,
+                                          'shards': self.shards})
+        if rebuild:
+            self.remove_stale_files(records)
+        self._dirty = True
+        return len(changed) + len(removed)
+
+    def remove_stale_files(self, records: dict[int, dict]) -> None:
+        keep = {f"{name}.json" for _, name in self.shards} | {'manifest.json'}
+        keep |= {f"d{doc_id // DOC_CHUNK}.json" for doc_id in records}
+        for entry in os.scandir(self.output_dir):
+            if entry.name not in keep and re.fullmatch(r'[sd]\d+\.json', entry.name):
+                os.unlink(entry.path)
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(self.state_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'next_shard': self.next_shard, 'shards': self.shards,
+                       'docs': self.docs}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.state_path)
+        self._dirty = False
+
+
+class SearchReader:
+    """按需读取分片并执行查询，与浏览器端 src/lib/search.ts 的逻辑相同（用于命令行试查询和基准测试）"""
+
+    def __init__(self, output_dir: Path = OUTPUT_DIR):
+        self.output_dir = output_dir
+        with open(output_dir / 'manifest.json', 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.lows = [low for low, _ in self.manifest['shards']]
+        self.cache: dict[str, dict[str, str]] = {}
+        self.fetched_bytes = 0
+
+    def fetch(self, name: str):
+        if name not in self.cache:
+            data = (self.output_dir / name).read_bytes()
+            self.fetched_bytes += len(data)
+            self.cache[name] = json.loads(data)
+        return self.cache[name]
+
+    def shard_names(self, term: str, prefix: bool) -> list[str]:
+        start = bisect_right(self.lows, term) - 1
+        end = bisect_left(self.lows, term + '\uffff') if prefix else start + 1
+        return [name for _, name in self.manifest['shards'][start:max(end, start + 1)]]
+
+    def postings(self, term: str, prefix: bool) -> dict[int, int]:
+        """词项（或前缀）-> {文档 id: 权重}，前缀匹配到多个词项时取最大权重"""
+        result: dict[int, int] = {}
+        for name in self.shard_names(term, prefix):
+            shard = self.fetch(f"{name}.json")
+            terms = [t for t in shard if t.startswith(term)] if prefix else ([term] if term in shard else [])
+            for matched in terms:
+                for doc, weight in decode_postings(shard[matched]):
+                    if weight > result.get(doc, 0):
+                        result[doc] = weight
+        return result
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        groups = query_groups(query)
+        if not groups:
+            return []
+        total = self.manifest['docs']
+        scores: Optional[dict[int, float]] = None
+        for term, prefix in sorted(groups, key=lambda group: group[1]):
+            postings = self.postings(term, prefix)
+            idf = math.log(1 + total / max(len(postings), 1))
+            if scores is None:
+                scores = {doc: 0.0 for doc in postings}
+            else:
+                scores = {doc: score for doc, score in scores.items() if doc in postings}
+            for doc in scores:
+                weight = postings[doc]
+                scores[doc] += idf * weight / (weight + SATURATION)
+            if not scores:
+                return []
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        results = []
+        for doc, score in best:
+            row = self.fetch(f"d{doc // self.manifest['chunk']}.json")[doc % self.manifest['chunk']]
+            results.append({'slug': row[0], 'title': row[1], 'date': row[2], 'score': round(score, 3)})
+        return results
+
+
+def refresh(root: Path = PROJECT_ROOT) -> int:
+    """增量更新搜索索引，供其他脚本在改写 blog 后调用。返回变化的文章数"""
+    index = SearchIndex.load(root, root / '.cache' / 'search-index-state.json', root / 'public' / 'search')
+    changed = index.update()
+    index.save()
+    return changed
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='生成站内搜索使用的分片倒排索引')
+    parser.add_argument('--rebuild', action='store_true', help='忽略缓存，全量重建')
+    parser.add_argument('--query', help='在生成的索引上执行一次查询')
+    args = parser.parse_args(argv)
+
+    index = SearchIndex() if args.rebuild else SearchIndex.load()
+    changed = index.update(rebuild=args.rebuild)
+    index.save()
+
+    files = [entry for entry in os.scandir(OUTPUT_DIR) if entry.name.endswith('.json')]
+    indexed = sum(1 for doc in index.docs.values() if doc['id'] is not None)
+    print(f"🔎 {indexed} 篇文章，{len(index.shards)} 个分片，共 {sum(e.stat().st_size for e in files) / 1024:.1f} KB"
+          f"（本次变化 {changed} 篇）")
+
+    if args.query:
+        results = SearchReader().search(args.query)
+        print(f"\n查询「{args.query}」：{len(results)} 条结果")
+        for result in results:
+            print(f"  {result['score']:>7.3f}  {result['date']}  {result['title']}  /blog/{result['slug']}/")
+
+
+if __name__ == '__main__':
+    main()
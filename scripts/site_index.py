@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""站点聚合索引：一次遍历 blog 和 diary，生成标签、归档和日历页面使用的 JSON。
+
+输出 `src/data/site-index.json`，页面直接导入，不必在每次 `astro build` 时遍历全部内容：
+- posts：文章 slug -> 标题、日期、摘要、标签（不含草稿）
+- tags：标签 -> 文章 slug 列表，按文章数降序
+- archive：年 -> 月 -> 文章 slug 列表，均按时间倒序
+- calendar：日期 -> 当天的文章、日记，以及日记的平均心情评分和天气（用于日历热力图）
+
+内容目录通过 content_scanner 递归扫描（支持按 年/月 分片的 diary 目录），只读取每个文件的 front matter；每个文件的解析结果连同 size/mtime 缓存在
+`.cache/site-index-state.json`，再次运行时只重新解析变化过的文件。
+聚合结果与上次相同时不改写输出文件，避免触发 Astro 的重新构建。
+
+使用方法：
+python3 scripts/site_index.py            # 增量更新
+python3 scripts/site_index.py --rebuild  # 忽略缓存，重新解析所有文件
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from content_scanner import iter_content_files
+from git_dates import file_creation_time
+from front_matter import read_front_matter
+from instrumentation import log
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+OUTPUT_PATH = PROJECT_ROOT / 'src' / 'data' / 'site-index.json'
+STATE_PATH = PROJECT_ROOT / '.cache' / 'site-index-state.json'
+INDEX_VERSION = 1
+CONTENT_TYPES = ('blog', 'diary')
+DATE_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d')
+
+
+def content_slug(relative_path: str) -> str:
+    """与 Astro 内容集合的 slug 规则一致：按目录逐段小写，去掉标点，空格换成连字符"""
+    stem = os.path.splitext(relative_path)[0]
+    return '/'.join(re.sub(r'[^\w\- ]', '', part.lower()).replace(' ', '-') for part in stem.split('/'))
+
+
+def parse_date(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    value = value.strip().replace('.', '-').replace('/', '-')
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def read_record(content_type: str, path: Path, stat: os.stat_result, relative_path: Optional[str] = None) -> Optional[dict]:
+    """读取单个文件的 front matter，返回聚合所需的字段；blog 草稿或缺少日期时返回 None
+
+    relative_path 为相对内容目录的路径（子目录中的文章 slug 带有目录前缀），默认为文件名。
+    """
+    fm = read_front_matter(path)
+    if content_type == 'blog':
+        date = parse_date(fm.get('date'))
+        if date is None or fm.get('draft') is True:
+            return None
+        tags = fm.get('tags') or []
+        return {
+            'slug': content_slug(relative_path or path.name),
+            'title': str(fm.get('title') or path.stem),
+            'date': date.strftime('%Y-%m-%d'),
+            'summary': str(fm.get('summary') or ''),
+            'tags': [str(tag) for tag in tags] if isinstance(tags, list) else [str(tags)],
+        }
+
+    # diary 没有 date 字段时使用首次提交的时间（未提交时为文件创建时间）
+    date = parse_date(fm.get('date')) or file_creation_time(path, stat)
+    record = {
+        'title': str(fm.get('title') or path.stem).strip(),
+        'date': date.strftime('%Y-%m-%d'),
+        'time': date.strftime('%H:%M:%S'),
+    }
+    for key in ('rating', 'weather', 'mood'):
+        if fm.get(key) not in (None, ''):
+            record[key] = fm.get(key)
+    return record
+
+
+class SiteIndex:
+    def __init__(self, root: Path = PROJECT_ROOT, state_path: Path = STATE_PATH, output_path: Path = OUTPUT_PATH):
+        self.root = Path(os.path.abspath(root))
+        self.state_path = state_path
+        self.output_path = output_path
+        self.docs: dict[str, dict] = {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, root: Path = PROJECT_ROOT, state_path: Path = STATE_PATH,
+             output_path: Path = OUTPUT_PATH) -> 'SiteIndex':
+        index = cls(root, state_path, output_path)
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        if data.get('version') == INDEX_VERSION:
+            index.docs = data['docs']
+        return index
+
+    def update(self) -> int:
+        """重新解析新增或修改过的文件，移除已删除的文件。返回变化的文件数"""
+        seen = set()
+        changed = 0
+        for content_type in CONTENT_TYPES:
+            content_dir = self.root / 'src' / 'content' / content_type
+            for item in iter_content_files(content_dir):
+                relative_path = item.path.relative_to(content_dir).as_posix()
+                key = f"{content_type}/{relative_path}"
+                seen.add(key)
+                stat = item.stat
+                doc = self.docs.get(key)
+                if doc and doc['size'] == stat.st_size and doc['mtime_ns'] == stat.st_mtime_ns:
+                    continue
+                try:
+                    record = read_record(content_type, item.path, stat, relative_path)
+                except (OSError, UnicodeDecodeError) as e:
+                    log(f"⚠️  读取 {key} 失败：{e}", path=key, error=str(e))
+                    continue
+                self.docs[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'record': record}
+                changed += 1
+
+        for key in [key for key in self.docs if key not in seen]:
+            del self.docs[key]
+            changed += 1
+
+        if changed:
+            self._dirty = True
+        return changed
+
+    def aggregate(self) -> dict:
+        posts = []
+        diaries = []
+        for key, doc in self.docs.items():
+            record = doc['record']
+            if record is None:
+                continue
+            (posts if key.startswith('blog/') else diaries).append(record)
+        posts.sort(key=lambda post: (post['date'], post['slug']), reverse=True)
+        diaries.sort(key=lambda diary: (diary['date'], diary['time'], diary['title']))
+
+        tags: dict[str, list[str]] = {}
+        archive: dict[str, dict[str, list[str]]] = {}
+        calendar: dict[str, dict[str, Any]] = {}
+        for post in posts:
+            for tag in post['tags']:
+                tags.setdefault(tag, []).append(post['slug'])
+            year, month = post['date'][:4], post['date'][:7]
+            archive.setdefault(year, {}).setdefault(month, []).append(post['slug'])
+            day = calendar.setdefault(post['date'], {'blog': [], 'diary': []})
+            day['blog'].append({'title': post['title'], 'slug': post['slug']})
+
+        for diary in diaries:
+            day = calendar.setdefault(diary['date'], {'blog': [], 'diary': []})
+            day['diary'].append({key: value for key, value in diary.items() if key != 'date'})
+
+        for day in calendar.values():
+            ratings = [d['rating'] for d in day['diary'] if isinstance(d.get('rating'), int)]
+            if ratings:
+                day['rating'] = round(sum(ratings) / len(ratings), 1)
+            weathers = [d['weather'] for d in day['diary'] if d.get('weather')]
+            if weathers:
+                day['weather'] = weathers[-1]
+
+        return {
+            'version': INDEX_VERSION,
+            'posts': {post['slug']: {k: v for k, v in post.items() if k != 'slug'} for post in posts},
+            'tags': [
+                {'tag': tag, 'count': len(slugs), 'slugs': slugs}
+                for tag, slugs in sorted(tags.items(), key=lambda item: (-len(item[1]), item[0]))
+            ],
+            'archive': [
+                {
+                    'year': int(year),
+                    'count': sum(len(slugs) for slugs in months.values()),
+                    'months': [{'month': month, 'slugs': slugs} for month, slugs in months.items()],
+                }
+                for year, months in archive.items()
+            ],
+            'calendar': dict(sorted(calendar.items())),
+        }
+
+    def write(self) -> bool:
+        """写出聚合结果，内容与现有文件相同时跳过。返回是否写入"""
+        text = json.dumps(self.aggregate(), ensure_ascii=False, separators=(',', ':')) + '\n'
+        try:
+            if self.output_path.read_text(encoding='utf-8') == text:
+                return False
+        except OSError:
+            pass
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.output_path.with_name(self.output_path.name + '.tmp')
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, self.output_path)
+        return True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(self.state_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'docs': self.docs}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.state_path)
+        self._dirty = False
+
+
+def refresh(root: Path = PROJECT_ROOT) -> bool:
+    """增量更新并写出站点索引，供其他脚本在改写内容后调用。返回输出文件是否变化"""
+    index = SiteIndex.load(root)
+    index.update()
+    written = index.write()
+    index.save()
+    return written
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='生成标签、归档和日历页面使用的站点聚合索引')
+    parser.add_argument('--rebuild', action='store_true', help='忽略缓存，重新解析所有文件')
+    args = parser.parse_args(argv)
+
+    index = SiteIndex() if args.rebuild else SiteIndex.load()
+    changed = index.update()
+    written = index.write()
+    index._dirty = index._dirty or args.rebuild
+    index.save()
+
+    aggregate = index.aggregate()
+    print(f"📚 {len(aggregate['posts'])} 篇文章，{len(aggregate['tags'])} 个标签，"
+          f"{len(aggregate['calendar'])} 天有内容（本次重新解析 {changed} 个文件）")
+    if written:
+        print(f"✅ 已更新 {index.output_path.relative_to(index.root)}")
+    else:
+        print("✅ 站点索引没有变化")
+
+
+if __name__ == '__main__':
+    main()
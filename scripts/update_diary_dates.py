@@ -6,24 +6,25 @@
 1. 在 src/content/diary/ 目录下创建或编辑 .md 文件
 2. 运行：python scripts/update_diary_dates.py
 3. 脚本会自动为缺少 date 字段的文件添加创建时间
+4. 上次运行后未变化的文件会通过处理清单直接跳过，可用 --force 重新检查
+5. 支持按 年/月 分片的子目录（见 scripts/content_scanner.py）
 """
 
-import os
-import re
+import argparse
 from pathlib import Path
-from datetime import datetime
-import locale
 
-# 设置中文时间格式
-locale.setlocale(locale.LC_TIME, 'zh_CN.UTF-8')
+from content_manifest import ContentManifest
+from content_scanner import scan_content
+from git_dates import file_creation_time
+from site_index import refresh as refresh_site_index
+from front_matter import read_front_matter, field_insertion
+from atomic_write import AtomicWriter
 
 
-def get_file_creation_time(file_path):
-    """获取文件创建时间（优先创建时间，回退到修改时间）"""
-    stat = os.stat(file_path)
-    # 优先使用创建时间，如果没有则使用修改时间
-    creation_time = stat.st_birthtime if hasattr(stat, 'st_birthtime') else stat.st_ctime
-    return datetime.fromtimestamp(creation_time)
+def get_file_creation_time(file_path, stat=None):
+    """获取文件创建时间：首次提交到 git 的时间，未提交的文件使用创建时间（回退到 ctime）；
+    stat 为扫描目录时已取得的结果"""
+    return file_creation_time(file_path, stat)
 
 
 def format_datetime(dt):
@@ -31,44 +32,35 @@ def format_datetime(dt):
     return dt.strftime('%Y-%m-%d %H:%M:%S')
 
 
-def update_file_with_date(file_path, date_str):
-    """为文件添加 date 字段到 front matter"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # 检查是否已有 front matter
-    if content.startswith('---'):
-        # 找到 front matter 的结束位置
-        end_match = re.search(r'\n---+\n', content[3:])
-        if end_match:
-            # front matter 已存在，检查是否已有 date 字段
-            front_matter = content[3:end_match.start()]
-            if 'date:' in front_matter:
-                # 已有 date 字段，跳过
-                return False
-
-            # 在 front matter 中插入 date 字段（插在第一行）
-            new_content = content[:3] + '\ndate: "' + date_str + '"' + content[3:end_match.start()] + content[end_match.start():]
-        else:
-            # 格式不正确，跳过
-            return False
+def update_file_with_date(file_path, date_str, writer=None):
+    """为文件添加 date 字段到 front matter（原子改写，正文直接从原文件拷贝）"""
+    # 只读取文件头部检查 front matter
+    fm = read_front_matter(file_path)
+    if fm.has_block and not fm.closed:
+        # 格式不正确，跳过
+        return False
+    if 'date' in fm:
+        # 已有 date 字段，跳过
+        return False
+
+    # 在 front matter 中插入 date 字段（插在第一行）；没有 front matter 则创建新的
+    offset, data = field_insertion(fm, f'date: "{date_str}"')
+    if writer is None:
+        writer = AtomicWriter()
+        writer.insert(file_path, offset, data)
+        writer.flush()
     else:
-        # 没有 front matter，创建新的
-        new_content = f"""---
-date: "{date_str}"
----
-
-{content}"""
-
-    # 写入文件
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(new_content)
+        writer.insert(file_path, offset, data)
 
     return True
 
 
-def main():
+def main(argv=None):
     """主函数"""
+    parser = argparse.ArgumentParser(description='为日记文件添加创建时间')
+    parser.add_argument('--force', action='store_true', help='忽略处理清单，重新检查所有文件')
+    args = parser.parse_args(argv)
+
     # 日记目录路径
     diary_dir = Path(__file__).parent.parent / 'src' / 'content' / 'diary'
 
@@ -76,21 +68,35 @@ def main():
         print(f"❌ 错误：找不到日记目录 {diary_dir}")
         return
 
-    # 扫描所有 markdown 文件
+    # 递归扫描所有 markdown 文件，复用扫描时取得的 stat 结果
+    manifest = ContentManifest.load()
+    writer = AtomicWriter()
     updated_files = []
-    for file_path in diary_dir.iterdir():
-        if file_path.suffix.lower() in ['.md', '.markdown']:
-            # 获取文件的创建时间
-            creation_time = get_file_creation_time(file_path)
-            date_str = format_datetime(creation_time)
-
-            # 尝试更新文件
-            if update_file_with_date(file_path, date_str):
-                updated_files.append({
-                    'name': file_path.name,
-                    'date': date_str,
-                    'path': file_path
-                })
+    for item in scan_content(diary_dir):
+        file_path = item.path
+        if not args.force and manifest.is_unchanged(file_path, item.stat):
+            continue
+
+        # 获取文件的创建时间
+        date_str = format_datetime(get_file_creation_time(file_path, item.stat))
+
+        # 尝试更新文件
+        if update_file_with_date(file_path, date_str, writer):
+            updated_files.append({
+                'name': file_path.name,
+                'date': date_str,
+                'path': file_path
+            })
+        manifest.record(file_path)
+
+    writer.flush()
+    manifest.evict_missing(diary_dir)
+    manifest.save()
+    if updated_files:
+        from catalog import refresh as refresh_catalog
+
+        refresh_site_index()
+        refresh_catalog()
 
     # 输出结果
     if updated_files:
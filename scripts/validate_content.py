@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""front matter 校验：在 `astro build` 之前用 Python 检查内容文件，错误带文件名和行号。
+
+front matter 写错（rating 超出 1–5、blog 的 date 加了引号、缺少 summary/tags 等）原本要等到
+CI 中较慢的 `npx astro build` 才会报错。这里按与 src/content/config.ts 相同的规则检查：
+- blog：与 config.ts 的 zod schema 一致；标量按 YAML（js-yaml）的规则判断类型，
+  例如 `date: "2024-01-02"` 是字符串而不是日期，`title: 2024` 是数字而不是字符串
+- diary：没有内容集合 schema，按 src/pages/diary/index.astro 和 site_index.py 的读取方式检查
+  （date 能否解析、rating 范围、tags 写法）
+- todo：`- [ ]` / `- [x]` 以外的待办写法
+
+每个集合的规则在导入时编译成按字段分派的检查函数，只读取文件开头的 front matter。
+通过检查的文件记入 `.cache/validated-v<版本>.json` 清单（与处理清单相同的 size / mtime / hash 判断），
+再次运行只检查变化过的文件；有问题的文件不记入清单，每次都会重新报告。
+config.ts 中 blog 字段的增删会作为警告报告，提醒同步修改这里的规则。
+
+使用方法：
+python3 scripts/validate_content.py              # 增量检查，有错误时返回非零
+python3 scripts/validate_content.py --all        # 忽略清单，检查全部文件
+python3 scripts/validate_content.py --jobs 4     # 文件较多时用 4 个进程
+python3 scripts/validate_content.py --github     # 输出 GitHub Actions 注解（在 PR 中标出对应的行）
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+from datetime import date as Date
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+from content_manifest import ContentManifest
+from content_scanner import scan_content
+from front_matter import BOM, DELIMITER_RE, KEY_RE, LIST_ITEM_RE, MAX_HEADER_BYTES
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CONTENT_ROOT = PROJECT_ROOT / 'src' / 'content'
+CONFIG_PATH = CONTENT_ROOT / 'config.ts'
+# 规则变化时递增，旧清单随之失效，全部文件重新检查
+SCHEMA_VERSION = 1
+MANIFEST_PATH = PROJECT_ROOT / '.cache' / f'validated-v{SCHEMA_VERSION}.json'
+CONTENT_TYPES = ('blog', 'diary', 'todo')
+# 文件数超过该值时才值得启动进程池
+POOL_MIN_FILES = 2000
+
+# js-yaml 默认 schema 对未加引号标量的类型判断
+NULL_RE = re.compile(r'^(?:~|null|Null|NULL)$')
+BOOL_RE = re.compile(r'^(?:true|True|TRUE|false|False|FALSE)$')
+INT_RE = re.compile(r'^[-+]?(?:0b[01_]+|0x[0-9a-fA-F_]+|0o?[0-7_]+|0|[1-9][0-9_]*)$')
+FLOAT_RE = re.compile(r'^(?:[-+]?(?:[0-9][0-9_]*)(?:\.[0-9_]*)?(?:[eE][-+]?[0-9]+)?'
+                      r'|[-+]?\.[0-9_]+(?:[eE][-+]?[0-9]+)?|[-+]?\.(?:inf|Inf|INF)|\.(?:nan|NaN|NAN))$')
+TIMESTAMP_RE = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})'
+                          r'(?:(?:[Tt]|[ \t]+)\d{1,2}:\d{2}:\d{2}(?:\.\d*)?(?:[ \t]*(?:Z|[-+]\d{1,2}(?::\d{2})?))?)?$')
+# 不加引号时 YAML 无法解析的开头字符
+RESERVED_START = ('@', '`', '%', '&', '*', '!', '|', '>')
+TODO_LINE_RE = re.compile(r'^-\s*\[')
+TODO_ITEM_RE = re.compile(r'^-\s*\[([ x])\]\s*(.+)$')
+CONFIG_FIELD_RE = re.compile(r'^ {4}(\w+):\s*z\.', re.MULTILINE)
+
+
+class Problem(NamedTuple):
+    path: str
+    line: int
+    severity: str  # error / warning
+    message: str
+
+    def format(self, github: bool = False) -> str:
+        if github:
+            return f"::{self.severity} file={self.path},line={self.line}::{self.message}"
+        label = '错误' if self.severity == 'error' else '警告'
+        return f"{self.path}:{self.line}: {label}: {self.message}"
+
+
+class Entry(NamedTuple):
+    """front matter 中的一个键：值为空时 items 是块列表的各项，children 是缩进的下级键"""
+    key: str
+    raw: str
+    line: int
+    items: list[tuple[str, int]]
+    children: list[tuple[str, int]]
+
+
+class Header(NamedTuple):
+    entries: list[Entry]
+    problems: list[tuple[int, str, str]]  # (行号, severity, 信息)
+    found: bool
+    closed: bool
+
+
+def read_header(path: str | Path) -> Header:
+    """逐行读取开头的 front matter（与 front_matter.read_front_matter 相同的边界），保留每个键的行号"""
+    entries: list[Entry] = []
+    problems: list[tuple[int, str, str]] = []
+    with open(path, 'rb') as f:
+        first = f.readline()
+        if not DELIMITER_RE.match(first.removeprefix(BOM)):
+            return Header(entries, problems, False, False)
+        offset = len(first)
+        number = 1
+        current: Optional[Entry] = None
+        while offset <= MAX_HEADER_BYTES:
+            line = f.readline()
+            if not line:
+                break
+            offset += len(line)
+            number += 1
+            if DELIMITER_RE.match(line):
+                return Header(entries, problems, True, True)
+            try:
+                text = line.decode('utf-8').rstrip('\r\n')
+            except UnicodeDecodeError:
+                problems.append((number, 'error', '不是有效的 UTF-8'))
+                continue
+            if not text.strip() or text.lstrip().startswith('#'):
+                continue
+            if text[0] in ' \t':
+                item = LIST_ITEM_RE.match(text)
+                if current is None or current.raw:
+                    problems.append((number, 'error', '缩进的行不属于任何字段'))
+                elif item:
+                    current.items.append((item.group(1), number))
+                else:
+                    current.children.append((text.strip(), number))
+                continue
+            match = KEY_RE.match(text)
+            if not match:
+                problems.append((number, 'error', f"无法解析的行：{text[:40]}"))
+                current = None
+                continue
+            current = Entry(match.group(1), match.group(2) or '', number, [], [])
+            entries.append(current)
+    return Header(entries, problems, True, False)
+
+
+def strip_comment(raw: str) -> str:
+    """去掉未加引号的值后面的 ` #` 注释"""
+    if raw[:1] in ('"', "'"):
+        return raw
+    index = raw.find(' #')
+    return raw[:index].rstrip() if index >= 0 else raw
+
+
+def scalar_type(raw: str) -> tuple[str, Optional[str]]:
+    """返回 (YAML 类型, 错误信息)：null / bool / int / float / date / string / list / map"""
+    raw = strip_comment(raw)
+    if not raw or NULL_RE.match(raw):
+        return 'null', None
+    if raw[0] in ('"', "'"):
+        if len(raw) < 2 or raw[-1] != raw[0]:
+            return 'string', '引号没有闭合（值中含有引号时需要转义）'
+        if raw[0] == '"' and re.search(r'(?<!\\)(?:\\\\)*"', raw[1:-1]):
+            return 'string', '双引号字符串中含有未转义的 "'
+        return 'string', None
+    if raw[0] == '[':
+        return ('list', None) if raw.endswith(']') else ('list', '行内列表没有闭合')
+    if raw[0] == '{':
+        return ('map', None) if raw.endswith('}') else ('map', '行内对象没有闭合')
+    if raw.startswith(RESERVED_START):
+        return 'string', f"以 {raw[0]} 开头的值需要加引号"
+    if ': ' in raw:
+        return 'string', '值中含有 ": "，需要加引号'
+    if BOOL_RE.match(raw):
+        return 'bool', None
+    if INT_RE.match(raw):
+        return 'int', None
+    if FLOAT_RE.match(raw):
+        return 'float', None
+    match = TIMESTAMP_RE.match(raw)
+    if match:
+        try:
+            Date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        except ValueError:
+            return 'date', f"日期不存在：{raw}"
+        return 'date', None
+    return 'string', None
+
+
+def unquote(raw: str) -> str:
+    raw = strip_comment(raw)
+    if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in ('"', "'"):
+        return raw[1:-1]
+    return raw
+
+
+def split_flow_list(raw: str) -> list[str]:
+    """把 `["a", "b"]` 拆成各项的原始文本（引号内的逗号不拆分）"""
+    items, current, quote = [], '', ''
+    for char in raw.strip()[1:-1]:
+        if quote:
+            current += char
+            if char == quote:
+                quote = ''
+        elif char in ('"', "'"):
+            quote = char
+            current += char
+        elif char == ',':
+            items.append(current.strip())
+            current = ''
+        else:
+            current += char
+    if current.strip():
+        items.append(current.strip())
+    return items
+
+
+# 检查函数：(Entry) -> [(行号, severity, 信息)]
+Check = Callable[[Entry], list]
+TYPE_NAMES = {'string': '字符串', 'date': '日期', 'int': '整数', 'float': '数字', 'bool': 'true/false',
+              'null': '空值', 'list': '列表', 'map': '对象'}
+
+
+def scalar_check(expected: str, hint: str = '') -> Check:
+    def check(entry: Entry) -> list:
+        if entry.items or entry.children:
+            return [(entry.line, 'error', f"{entry.key} 应为{TYPE_NAMES[expected]}，不是列表或对象")]
+        kind, error = scalar_type(entry.raw)
+        if error:
+            return [(entry.line, 'error', f"{entry.key}: {error}")]
+        if kind != expected:
+            return [(entry.line, 'error', f"{entry.key} 应为{TYPE_NAMES[expected]}，实际是{TYPE_NAMES[kind]}{hint}")]
+        return []
+    return check
+
+
+def int_range_check(minimum: int, maximum: int) -> Check:
+    base = scalar_check('int')
+
+    def check(entry: Entry) -> list:
+        problems = base(entry)
+        if not problems and not minimum <= int(strip_comment(entry.raw).replace('_', ''), 0) <= maximum:
+            problems.append((entry.line, 'error', f"{entry.key} 应在 {minimum}–{maximum} 之间，实际是 {entry.raw}"))
+        return problems
+    return check
+
+
+def string_list_check(block_list: str = 'ok', strict_items: bool = True) -> Check:
+    """字符串列表：行内 `[...]` 或块列表 `- item`。
+
+    block_list 为块列表写法的 severity（ok 表示允许）；strict_items 为 False 时不检查各项的类型
+    （日记页面读取时去掉引号，`[a, 3]` 中的 3 也当作字符串）。
+    """
+    def check(entry: Entry) -> list:
+        if entry.raw:
+            kind, error = scalar_type(entry.raw)
+            if error or kind != 'list':
+                return [(entry.line, 'error', f"{entry.key}: {error or f'应为列表，实际是{TYPE_NAMES[kind]}'}")]
+            items = [(item, entry.line) for item in split_flow_list(strip_comment(entry.raw))]
+        elif entry.items:
+            if block_list != 'ok':
+                return [(entry.line, block_list, f"{entry.key} 使用了块列表，页面只识别行内列表，"
+                                                 f"请改为 {entry.key}: [\"a\", \"b\"]")]
+            items = entry.items
+        else:
+            return [(entry.line, 'error', f"{entry.key} 应为列表，实际是空值")]
+        problems = []
+        for raw, line in items if strict_items else ():
+            kind, error = scalar_type(raw)
+            if error or kind != 'string':
+                problems.append((line, 'error', f"{entry.key} 中的 {raw}: {error or f'应为字符串，实际是{TYPE_NAMES[kind]}'}"))
+        return problems
+    return check
+
+
+def object_check(required: tuple[str, ...], optional: tuple[str, ...]) -> Check:
+    """嵌套对象（如 cover）：行内 `{...}` 只检查闭合，缩进写法检查下级字段"""
+    def check(entry: Entry) -> list:
+        if entry.raw:
+            kind, error = scalar_type(entry.raw)
+            if error or kind != 'map':
+                return [(entry.line, 'error', f"{entry.key}: {error or f'应为对象，实际是{TYPE_NAMES[kind]}'}")]
+            return []
+        problems = []
+        keys = set()
+        for text, line in entry.children:
+            match = KEY_RE.match(text)
+            if not match or match.group(1) not in required + optional:
+                problems.append((line, 'error', f"{entry.key} 中无法识别的字段：{text[:40]}"))
+                continue
+            keys.add(match.group(1))
+            problems += scalar_check('string')(Entry(f"{entry.key}.{match.group(1)}", match.group(2) or '', line, [], []))
+        problems += [(entry.line, 'error', f"{entry.key} 缺少 {key}") for key in required if key not in keys]
+        return problems
+    return check
+
+
+def diary_date_check(entry: Entry) -> list:
+    from site_index import parse_date
+
+    kind, error = scalar_type(entry.raw)
+    if error:
+        return [(entry.line, 'error', f"date: {error}")]
+    if entry.items or entry.children or parse_date(unquote(entry.raw)) is None:
+        return [(entry.line, 'error', f"date 无法解析：{entry.raw}（应为 \"YYYY-MM-DD HH:MM:SS\"）")]
+    return []
+
+
+def text_check(entry: Entry) -> list:
+    """日记页面按原文读取的字段：只要求是单行文本"""
+    if entry.items or entry.children:
+        return [(entry.line, 'error', f"{entry.key} 应为单行文本")]
+    _, error = scalar_type(entry.raw)
+    return [(entry.line, 'error', f"{entry.key}: {error}")] if error else []
+
+
+class Schema(NamedTuple):
+    fields: dict[str, Check]
+    required: tuple[str, ...]
+
+
+# 与 src/content/config.ts 的 blog schema 保持一致
+BLOG_SCHEMA = Schema(
+    fields={
+        'title': scalar_check('string'),
+        'date': scalar_check('date', '（日期不能加引号）'),
+        'summary': scalar_check('string'),
+        'tags': string_list_check(),
+        'weather': scalar_check('string'),
+        'mood': scalar_check('string'),
+        'rating': int_range_check(1, 5),
+        'updated': scalar_check('date', '（日期不能加引号）'),
+        'draft': scalar_check('bool'),
+        'cover': object_check(('src',), ('alt',)),
+        'canonicalUrl': scalar_check('string'),
+    },
+    required=('title', 'date', 'summary', 'tags'),
+)
+
+# 日记页面用正则读取 front matter，没有必填字段；date 缺失时由 update_diary_dates.py 补上
+DIARY_SCHEMA = Schema(
+    fields={
+        'date': diary_date_check,
+        'title': text_check,
+        'weather': text_check,
+        'mood': text_check,
+        'rating': int_range_check(1, 5),
+        'tags': string_list_check('warning', strict_items=False),
+    },
+    required=(),
+)
+
+SCHEMAS = {'blog': BLOG_SCHEMA, 'diary': DIARY_SCHEMA}
+
+
+def check_header(header: Header, schema: Schema, content_type: str) -> list[tuple[int, str, str]]:
+    if not header.found:
+        return [(1, 'error', '缺少 front matter')] if schema.required else []
+    if not header.closed:
+        return [(1, 'error', 'front matter 没有结束分隔线 ---')]
+    problems = list(header.problems)
+    seen: dict[str, int] = {}
+    for entry in header.entries:
+        if entry.key in seen:
+            problems.append((entry.line, 'error', f"{entry.key} 重复（第 {seen[entry.key]} 行已定义）"))
+            continue
+        seen[entry.key] = entry.line
+        check = schema.fields.get(entry.key)
+        if check is not None:
+            problems += check(entry)
+        elif content_type == 'blog':
+            problems.append((entry.line, 'warning', f"config.ts 中没有 {entry.key} 字段，构建时会被忽略"))
+    problems += [(1, 'error', f"缺少 {key}") for key in schema.required if key not in seen]
+    return problems
+
+
+def check_todo(path: str | Path) -> list[tuple[int, str, str]]:
+    problems = []
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for number, line in enumerate(f, 1):
+            line = line.rstrip('\r\n')
+            if TODO_LINE_RE.match(line) and not TODO_ITEM_RE.match(line):
+                problems.append((number, 'error', f"待办应写成 - [ ] 或 - [x]：{line[:40]}"))
+    return problems
+
+
+def validate_file(job: tuple[str, str]) -> list[tuple[int, str, str]]:
+    """校验单个文件，返回 (行号, severity, 信息)；供进程池调用，参数和返回值都可以 pickle"""
+    content_type, path = job
+    try:
+        if content_type == 'todo':
+            return check_todo(path)
+        return check_header(read_header(path), SCHEMAS[content_type], content_type)
+    except OSError as e:
+        return [(1, 'error', f"无法读取：{e.strerror or e}")]
+
+
+def schema_drift(config_path: Path = CONFIG_PATH) -> list[Problem]:
+    """config.ts 中 blog 的字段与 BLOG_SCHEMA 不一致时返回警告"""
+    try:
+        text = config_path.read_text(encoding='utf-8')
+    except OSError:
+        return []
+    fields = set(CONFIG_FIELD_RE.findall(text))
+    if not fields or fields == set(BLOG_SCHEMA.fields):
+        return []
+    added = ', '.join(sorted(fields - set(BLOG_SCHEMA.fields))) or '无'
+    removed = ', '.join(sorted(set(BLOG_SCHEMA.fields) - fields)) or '无'
+    return [Problem(os.path.relpath(config_path, PROJECT_ROOT), 1, 'warning',
+                    f"blog schema 与 validate_content.py 不一致（新增：{added}；删除：{removed}），请同步校验规则")]
+
+
+def validate(root: Path = PROJECT_ROOT, manifest_path: Optional[Path] = MANIFEST_PATH,
+             jobs: int = 1) -> tuple[list[Problem], int, int]:
+    """校验 root 下的全部内容，返回 (问题列表, 检查的文件数, 跳过的文件数)；manifest_path 为 None 时检查全部文件"""
+    content_root = root / 'src' / 'content'
+    manifest = ContentManifest.load(manifest_path, root) if manifest_path else None
+    pending: list[tuple[str, Path]] = []
+    skipped = 0
+    for content_type in CONTENT_TYPES:
+        for item in scan_content(content_root / content_type):
+            if manifest is not None and manifest.is_unchanged(item.path, item.stat):
+                skipped += 1
+                continue
+            pending.append((content_type, item.path))
+
+    jobs_args = [(content_type, str(path)) for content_type, path in pending]
+    if jobs > 1 and len(pending) >= POOL_MIN_FILES:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(validate_file, jobs_args, chunksize=max(1, len(jobs_args) // (jobs * 4))))
+    else:
+        results = [validate_file(job) for job in jobs_args]
+
+    problems = schema_drift(content_root / 'config.ts')
+    root_prefix = os.path.abspath(root) + os.sep
+    for (_, path), found in zip(pending, results):
+        if not found:
+            # 只记录没有任何问题的文件，有问题的文件下次仍会被检查和报告
+            if manifest is not None:
+                manifest.record(path)
+            continue
+        relative = str(path).removeprefix(root_prefix)
+        problems += [Problem(relative, line, severity, message) for line, severity, message in sorted(found)]
+    if manifest is not None:
+        for content_type in CONTENT_TYPES:
+            manifest.evict_missing(content_root / content_type)
+        manifest.save()
+    return problems, len(pending), skipped
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='按 src/content/config.ts 的规则校验 blog/diary/todo 的 front matter')
+    parser.add_argument('--all', action='store_true', help='忽略清单，检查全部文件')
+    parser.add_argument('--jobs', type=int, default=1, help='校验的进程数（默认 1，文件较多时才会启用进程池）')
+    parser.add_argument('--github', action='store_true', help='输出 GitHub Actions 注解格式')
+    args = parser.parse_args(argv)
+
+    problems, checked, skipped = validate(manifest_path=None if args.all else MANIFEST_PATH, jobs=args.jobs)
+    for problem in problems:
+        print(problem.format(args.github))
+
+    errors = sum(1 for problem in problems if problem.severity == 'error')
+    warnings = len(problems) - errors
+    summary = f"检查了 {checked} 个文件" + (f"，{skipped} 个未变化已跳过" if skipped else '')
+    if errors:
+        print(f"❌ {summary}，发现 {errors} 个错误、{warnings} 个警告", file=sys.stderr)
+        sys.exit(1)
+    print(f"✅ {summary}" + (f"，{warnings} 个警告" if warnings else '，没有发现问题'), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+// 相关文章：由 scripts/related_posts.py 预先计算（slug -> 最相关的文章 slug 列表）
+import data from '../data/related-posts.json';
+import { siteIndex, type IndexedPost } from './siteIndex';
+
+export const relatedPosts = data as Record<string, string[]>;
+
+export function getRelatedPosts(slug: string): (IndexedPost & { slug: string })[] {
+  return (relatedPosts[slug] ?? [])
+    .filter((related) => related in siteIndex.posts)
+    .map((related) => ({ slug: related, ...siteIndex.posts[related] }));
+}
@@ -0,0 +1,154 @@
+// 站内搜索：读取 scripts/search_index.py 生成的分片倒排索引（public/search/），只下载查询用到的分片
+// 分词、前缀匹配和打分与 scripts/search_index.py 的 SearchReader 保持一致
+
+export interface SearchResult {
+  slug: string;
+  title: string;
+  date: string;
+  score: number;
+}
+
+interface Manifest {
+  version: number;
+  docs: number;
+  chunk: number;
+  shards: [string, string][];
+}
+
+const MAX_TERM_LENGTH = 24;
+const SATURATION = 4;
+const TOKEN_RE = /[㐀-䶿一-鿿]+|[a-z0-9]+/g;
+
+// 把查询拆成 [词项, 是否前缀匹配]：末尾的英文单词和单个汉字按前缀匹配
+export function queryGroups(query: string): [string, boolean][] {
+  const text = query.normalize('NFKC').toLowerCase();
+  const matches = [...text.matchAll(TOKEN_RE)];
+  const groups = new Map<string, [string, boolean]>();
+  const add = (term: string, prefix: boolean) => groups.set(`${term}\u0000${prefix}`, [term, prefix]);
+  matches.forEach((match, i) => {
+    const token = match[0];
+    const last = i === matches.length - 1 && match.index! + token.length === text.length;
+    if (token.charCodeAt(0) < 0x80) {
+      if (token.length >= 2) add(token.slice(0, MAX_TERM_LENGTH), last && token.length < MAX_TERM_LENGTH);
+    } else if (token.length === 1) {
+      add(token, true);
+    } else {
+      for (let j = 0; j < token.length - 1; j++) add(token.slice(j, j + 2), false);
+    }
+  });
+  return [...groups.values()];
+}
+
+// base64(varint(文档 id 差值), varint(权重), ...) -> [[文档 id, 权重], ...]
+function decodePostings(encoded: string): [number, number][] {
+  const data = atob(encoded);
+  const values: number[] = [];
+  let value = 0;
+  let shift = 0;
+  for (let i = 0; i < data.length; i++) {
+    const byte = data.charCodeAt(i);
+    value += (byte & 0x7f) * 2 ** shift;
+    if (byte & 0x80) {
+      shift += 7;
+    } else {
+      values.push(value);
+      value = 0;
+      shift = 0;
+    }
+  }
+  const postings: [number, number][] = [];
+  let doc = 0;
+  for (let i = 0; i < values.length; i += 2) {
+    doc += values[i];
+    postings.push([doc, values[i + 1]]);
+  }
+  return postings;
+}
+
+// 第一个下界大于 term 的分片位置
+function upperBound(lows: string[], term: string): number {
+  let lo = 0;
+  let hi = lows.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (lows[mid] <= term) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+export class SearchClient {
+  private manifest?: Promise<Manifest>;
+  private files = new Map<string, Promise<any>>();
+
+  constructor(private readonly baseUrl: string) {}
+
+  private fetchJson(name: string): Promise<any> {
+    let file = this.files.get(name);
+    if (!file) {
+      file = fetch(`${this.baseUrl}${name}`).then((response) => {
+        if (!response.ok) throw new Error(`${name}: ${response.status}`);
+        return response.json();
+      });
+      this.files.set(name, file);
+    }
+    return file;
+  }
+
+  private loadManifest(): Promise<Manifest> {
+    this.manifest ??= this.fetchJson('manifest.json');
+    return this.manifest;
+  }
+
+  private shardNames(manifest: Manifest, term: string, prefix: boolean): string[] {
+    const lows = manifest.shards.map(([low]) => low);
+    const start = upperBound(lows, term) - 1;
+    const end = prefix ? upperBound(lows, `${term}\uffff`) : start + 1;
+    return manifest.shards.slice(start, Math.max(end, start + 1)).map(([, name]) => name);
+  }
+
+  // 词项（或前缀）-> 文档 id -> 权重，前缀匹配到多个词项时取最大权重
+  private async postings(manifest: Manifest, term: string, prefix: boolean): Promise<Map<number, number>> {
+    const result = new Map<number, number>();
+    const shards = await Promise.all(this.shardNames(manifest, term, prefix).map((name) => this.fetchJson(`${name}.json`)));
+    for (const shard of shards as Record<string, string>[]) {
+      const terms = prefix ? Object.keys(shard).filter((t) => t.startsWith(term)) : term in shard ? [term] : [];
+      for (const matched of terms) {
+        for (const [doc, weight] of decodePostings(shard[matched])) {
+          if (weight > (result.get(doc) ?? 0)) result.set(doc, weight);
+        }
+      }
+    }
+    return result;
+  }
+
+  async search(query: string, limit = 20): Promise<SearchResult[]> {
+    const groups = queryGroups(query);
+    if (!groups.length) return [];
+    const manifest = await this.loadManifest();
+    // 所有分片并行下载，精确匹配的词项先参与求交
+    groups.sort((a, b) => Number(a[1]) - Number(b[1]));
+    const postings = await Promise.all(groups.map(([term, prefix]) => this.postings(manifest, term, prefix)));
+
+    let scores: Map<number, number> | undefined;
+    for (const list of postings) {
+      const idf = Math.log(1 + manifest.docs / Math.max(list.size, 1));
+      const next = new Map<number, number>();
+      for (const [doc, score] of scores ?? new Map([...list.keys()].map((doc) => [doc, 0]))) {
+        const weight = list.get(doc);
+        if (weight !== undefined) next.set(doc, score + (idf * weight) / (weight + SATURATION));
+      }
+      scores = next;
+      if (!scores.size) return [];
+    }
+
+    const best = [...scores!.entries()].sort((a, b) => b[1] - a[1] || a[0] - b[0]).slice(0, limit);
+    return Promise.all(
+      best.map(async ([doc, score]) => {
+        const rows = await this.fetchJson(`d${Math.floor(doc / manifest.chunk)}.json`);
+        const [slug, title, date] = rows[doc % manifest.chunk];
+        return { slug, title, date, score };
+      })
+    );
+  }
+}
@@ -0,0 +1,34 @@
+// 站点聚合索引：由 scripts/site_index.py 生成，页面直接读取，无需在构建时遍历全部内容
+import data from '../data/site-index.json';
+
+export interface IndexedPost {
+  title: string;
+  date: string; // YYYY-MM-DD
+  summary: string;
+  tags: string[];
+}
+
+export interface IndexedDiary {
+  title: string;
+  time: string; // HH:MM:SS
+  rating?: number;
+  weather?: string;
+  mood?: string;
+}
+
+export interface CalendarDay {
+  blog: { title: string; slug: string }[];
+  diary: IndexedDiary[];
+  rating?: number; // 当天日记的平均心情评分
+  weather?: string; // 当天最后一篇日记的天气
+}
+
+export interface SiteIndex {
+  version: number;
+  posts: Record<string, IndexedPost>;
+  tags: { tag: string; count: number; slugs: string[] }[];
+  archive: { year: number; count: number; months: { month: string; slugs: string[] }[] }[];
+  calendar: Record<string, CalendarDay>;
+}
+
+export const siteIndex = data as SiteIndex;